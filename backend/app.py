@@ -1,20 +1,34 @@
 # /backend/app.py
 import os
+import asyncio
 import logging
 import logging.config
-from typing import Optional, List
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends
+from typing import Optional, List, Dict, Any
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Query, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response, FileResponse
 from pydantic import BaseModel
 import uvicorn
 from dotenv import load_dotenv
-from llama_index_service import query_engine, sanitize_text
+from llama_index_service import get_query_engine, warm_up_query_engine, query_engine_status, commentary_stats, sanitize_text
 from vector_service import vector_service
+from thumbnails import thumbnail_cache
+from projection import build_projection
+from model_registry import registry
+from concurrency import StageTimeoutError
+from qdrant_client.http.exceptions import UnexpectedResponse
+import metrics
 import json
 import uuid
+import hashlib
+import hmac
+import base64
+import binascii
+import time
 from datetime import datetime
 import io
+import mimetypes
 
 # Load environment variables
 load_dotenv()
@@ -27,7 +41,8 @@ app = FastAPI(
     title="Film Location Similarity Search API",
     description="Advanced AI chatbot with location similarity search capabilities",
     version="3.0.0",
-    docs_url="/docs" if os.getenv("ENABLE_DOCS", "true").lower() == "true" else None
+    docs_url="/docs" if os.getenv("ENABLE_DOCS", "true").lower() == "true" else None,
+    default_response_class=metrics.TimedJSONResponse
 )
 
 # Enhanced CORS configuration
@@ -37,8 +52,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
 
+# Per-stage latency histograms and a Server-Timing header on every response
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.register_collector(
+    metrics.ServiceCollector(vector_service, lambda: {**registry.status(), "query_engine": query_engine_status()})
+)
+
+# "background" loads models after startup so /health answers immediately,
+# "eager" loads them before serving, "lazy" waits for the first request
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "background").lower()
+
+@app.on_event("startup")
+async def warm_up_models():
+    if MODEL_WARMUP == "lazy":
+        return
+    background = MODEL_WARMUP != "eager"
+    registry.warm_up(background=background)
+    warm_up_query_engine(background=background)
+
 class LocationResult(BaseModel):
     id: str
     score: float
@@ -46,6 +80,7 @@ class LocationResult(BaseModel):
     description: str
     image_path: str
     features: List[str]
+    thumbnail_url: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
@@ -56,32 +91,226 @@ class ChatResponse(BaseModel):
     confidence: float = 0.0
     search_type: str = "text"
 
+class BatchSearchQuery(BaseModel):
+    text: Optional[str] = None
+    image: Optional[str] = None  # base64-encoded image bytes
+    limit: int = 5
+    score_threshold: float = 0.6
+    location_filter: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None  # see filters.build_filter
+    text_weight: float = 0.7
+    image_weight: float = 0.3
+    fusion: str = "weighted"
+    hnsw_ef: Optional[int] = None
+    exact: Optional[bool] = None
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+    collapse: Optional[str] = None  # "cluster" or "location"
+    fields: Optional[List[str]] = None  # payload fields to return, [] for only id and score
+    exclude_fields: Optional[List[str]] = None
+    payload: bool = True  # include the raw payload
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchSearchQuery]
+
+class RecommendRequest(BaseModel):
+    positive: List[str] = []  # point IDs of liked photos
+    negative: List[str] = []  # point IDs of disliked photos
+    strategy: str = "average_vector"  # or "best_score"
+    vector: str = "image"  # compare "image" or "text" vectors
+    limit: int = 5
+    score_threshold: Optional[float] = 0.6
+    location_filter: Optional[str] = None
+    filters: Optional[Dict[str, Any]] = None  # see filters.build_filter
+    collapse: Optional[str] = None  # "cluster" or "location"
+
 class HealthResponse(BaseModel):
     status: str
     message: str
     timestamp: str
     version: str
     qdrant_info: dict = {}
+    embedding_batching: dict = {}
+    concurrency: dict = {}
+    cache: dict = {}
+    models: dict = {}
+    rerank: dict = {}
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Enhanced health check endpoint with system status"""
-    qdrant_info = vector_service.get_collection_info()
+    qdrant_info = await vector_service.aget_collection_info()
     
     return HealthResponse(
         status="healthy",
         message="Film Location Similarity Search API is running successfully",
         timestamp=datetime.now().isoformat(),
         version="3.0.0",
-        qdrant_info=qdrant_info
+        qdrant_info=qdrant_info,
+        embedding_batching=vector_service.batching_stats(),
+        concurrency=vector_service.concurrency_stats(),
+        cache={**vector_service.cache_stats(), "commentary": commentary_stats(), "thumbnails": thumbnail_cache.stats()},
+        models={**registry.status(), "query_engine": query_engine_status()},
+        rerank=vector_service.rerank_stats()
     )
 
+GREETINGS = ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening']
+EMPTY_QUERY_RESPONSE = "I'd be happy to help! Please provide a description or upload images of the type of location you're looking for."
+GREETING_RESPONSE = "Hello! 👋 I'm your AI assistant for finding film locations. You can describe the type of location you're looking for (like 'modern kitchen' or 'outdoor driveway') or upload images for visual similarity search. How can I help you find the perfect location today?"
+NO_RESULTS_RESPONSE = "I couldn't find any locations matching your search criteria. Try using different keywords or uploading a reference image to help me understand what you're looking for."
+ERROR_RESPONSE = "I apologize, but I encountered an issue processing your request. Please try rephrasing your question or try again in a moment."
+SOURCES = ["Vector Database", "LLaMA AI Model"]
+
+MAX_CHAT_IMAGES = int(os.getenv("MAX_CHAT_IMAGES", 10))
+MAX_CHAT_IMAGE_BYTES = int(os.getenv("MAX_CHAT_IMAGE_BYTES", 25 * 1024 * 1024))
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 15 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+class UploadBudget:
+    """Bytes left for all uploads of one request, shared by its concurrent reads"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.remaining = total
+
+    def take(self, size: int):
+        self.remaining -= size
+        if self.remaining < 0:
+            raise HTTPException(status_code=413, detail=f"Images exceed {self.total} bytes in total")
+
+async def read_upload(image: UploadFile, limit: int, budget: Optional[UploadBudget] = None) -> bytes:
+    """Read an upload in chunks, stopping with 413 as soon as it exceeds limit (or the shared budget)"""
+    if image.size is not None and image.size > limit:
+        raise HTTPException(status_code=413, detail=f"Image '{image.filename}' exceeds {limit} bytes")
+    data = bytearray()
+    while chunk := await image.read(UPLOAD_CHUNK_BYTES):
+        data += chunk
+        if len(data) > limit:
+            raise HTTPException(status_code=413, detail=f"Image '{image.filename}' exceeds {limit} bytes")
+        if budget is not None:
+            budget.take(len(chunk))
+    return bytes(data)
+
+async def read_images(images: Optional[List[UploadFile]]) -> List[bytes]:
+    """Read every upload concurrently, enforcing MAX_CHAT_IMAGES, MAX_IMAGE_BYTES each and MAX_CHAT_IMAGE_BYTES in total"""
+    if not images:
+        return []
+    if len(images) > MAX_CHAT_IMAGES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_CHAT_IMAGES} images per message")
+    budget = UploadBudget(MAX_CHAT_IMAGE_BYTES)
+    image_data = await asyncio.gather(*(read_upload(image, MAX_IMAGE_BYTES, budget) for image in images))
+    # Empty uploads (e.g. an unused file input) are dropped; order is kept
+    return [data for data in image_data if data]
+
+def canned_reply(clean_query: str, images: List[bytes]) -> Optional[tuple]:
+    """(response, confidence) for empty queries and greetings, which skip search"""
+    if not clean_query and (not images or len(images) == 0):
+        return EMPTY_QUERY_RESPONSE, 0.9
+    if clean_query and any(greeting in clean_query.lower() for greeting in GREETINGS):
+        return GREETING_RESPONSE, 1.0
+    return None
+
+async def search_for_chat(
+    clean_query: str,
+    images: List[bytes],
+    text_weight: float,
+    image_weight: float,
+    fusion: str,
+    collapse: Optional[str] = None,
+    multi_image: str = "mean"
+) -> tuple:
+    """Determine search type, perform similarity search and return (search_type, locations)"""
+    search_results = []
+    search_type = "text"
+    
+    if images:
+        # Image-based or combined search; several images are encoded in one batch
+        if clean_query:
+            # Combined search
+            search_results = await vector_service.asearch_combined(
+                text_query=clean_query,
+                image_data=images,
+                text_weight=text_weight,
+                image_weight=image_weight,
+                fusion=fusion,
+                multi_image=multi_image,
+                limit=5,
+                score_threshold=0.6,
+                collapse=collapse
+            )
+            search_type = "combined"
+        else:
+            # Image-only search
+            search_results = await vector_service.asearch_by_images(
+                images,
+                multi_image=multi_image,
+                fusion=fusion,
+                limit=5,
+                score_threshold=0.6,
+                collapse=collapse
+            )
+            search_type = "image"
+    elif clean_query:
+        # Text-only search
+        search_results = await vector_service.asearch_by_text(
+            text_query=clean_query,
+            limit=5,
+            score_threshold=0.6,
+            collapse=collapse
+        )
+        search_type = "text"
+    
+    # Convert search results to LocationResult objects
+    locations = []
+    for result in search_results:
+        locations.append(LocationResult(
+            id=str(result["id"]),
+            score=result["score"],
+            location=result["location"],
+            description=result["description"],
+            image_path=result["image_path"],
+            features=result["features"],
+            thumbnail_url=thumbnail_url(result["id"], result["image_path"])
+        ))
+    metrics.record_search(search_type, len(locations))
+    return search_type, locations
+
+def summarize_locations(search_type: str, clean_query: str, locations: List[LocationResult], image_count: int = 1) -> str:
+    """Templated summary of the search results"""
+    if not locations:
+        return NO_RESULTS_RESPONSE
+    location_names = [loc.location for loc in locations[:3]]
+    features_found = []
+    for loc in locations[:3]:
+        features_found.extend(loc.features)
+    unique_features = list(set(features_found))
+    uploaded = "uploaded images" if image_count > 1 else "uploaded image"
+    
+    if search_type == "image":
+        return f"Based on your {uploaded}, I found {len(locations)} similar locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
+    elif search_type == "combined":
+        return f"Based on your description '{clean_query}' and {uploaded}, I found {len(locations)} matching locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
+    return f"Based on your search for '{clean_query}', I found {len(locations)} relevant locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
+
+def commentary_prompt(clean_query: str) -> str:
+    return f"Provide information about film locations that match: {clean_query}. Focus on interior design and visual characteristics."
+
+def result_confidence(locations: List[LocationResult]) -> float:
+    """Calculate confidence based on search results"""
+    return min(len(locations) / 5.0, 1.0) if locations else 0.3
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(
     query: str = Form(...),
-    images: Optional[List[UploadFile]] = File(None)
+    images: Optional[List[UploadFile]] = File(None),
+    text_weight: float = Form(0.7),
+    image_weight: float = Form(0.3),
+    fusion: str = Form("weighted"),
+    collapse: Optional[str] = Form(None),
+    multi_image: str = Form("mean")
 ):
     """Enhanced chat endpoint with location similarity search"""
+    image_data = await read_images(images)
     
     try:
         # Generate unique message ID
@@ -91,112 +320,42 @@ async def chat_endpoint(
         # Sanitize input
         clean_query = sanitize_text(query.strip())
         
-        if not clean_query and (not images or len(images) == 0):
-            return ChatResponse(
-                response="I'd be happy to help! Please provide a description or upload images of the type of location you're looking for.",
-                sources=[],
-                locations=[],
-                message_id=message_id,
-                timestamp=timestamp,
-                confidence=0.9,
-                search_type="greeting"
-            )
-        
-        # Handle greetings
-        greetings = ['hello', 'hi', 'hey', 'greetings', 'good morning', 'good afternoon', 'good evening']
-        if clean_query and any(greeting in clean_query.lower() for greeting in greetings):
+        # Handle empty queries and greetings
+        canned = canned_reply(clean_query, image_data)
+        if canned:
             return ChatResponse(
-                response="Hello! 👋 I'm your AI assistant for finding film locations. You can describe the type of location you're looking for (like 'modern kitchen' or 'outdoor driveway') or upload images for visual similarity search. How can I help you find the perfect location today?",
+                response=canned[0],
                 sources=[],
                 locations=[],
                 message_id=message_id,
                 timestamp=timestamp,
-                confidence=1.0,
+                confidence=canned[1],
                 search_type="greeting"
             )
         
-        # Determine search type and perform similarity search
-        search_results = []
-        search_type = "text"
-        
-        if images and len(images) > 0:
-            # Image-based or combined search
-            image_data = await images[0].read()  # Use first image for search
-            
-            if clean_query:
-                # Combined search
-                search_results = vector_service.search_combined(
-                    text_query=clean_query,
-                    image_data=image_data,
-                    limit=5,
-                    score_threshold=0.6
-                )
-                search_type = "combined"
-            else:
-                # Image-only search
-                search_results = vector_service.search_by_image(
-                    image_data=image_data,
-                    limit=5,
-                    score_threshold=0.6
-                )
-                search_type = "image"
-        elif clean_query:
-            # Text-only search
-            search_results = vector_service.search_by_text(
-                text_query=clean_query,
-                limit=5,
-                score_threshold=0.6
-            )
-            search_type = "text"
-        
-        # Convert search results to LocationResult objects
-        locations = []
-        for result in search_results:
-            locations.append(LocationResult(
-                id=str(result["id"]),
-                score=result["score"],
-                location=result["location"],
-                description=result["description"],
-                image_path=result["image_path"],
-                features=result["features"]
-            ))
+        search_type, locations = await search_for_chat(
+            clean_query, image_data, text_weight, image_weight, fusion, collapse, multi_image
+        )
         
         # Generate AI response based on search results
+        ai_response = summarize_locations(search_type, clean_query, locations, len(image_data))
         if locations:
-            location_names = [loc.location for loc in locations[:3]]
-            features_found = []
-            for loc in locations[:3]:
-                features_found.extend(loc.features)
-            unique_features = list(set(features_found))
-            
-            if search_type == "image":
-                ai_response = f"Based on your uploaded image, I found {len(locations)} similar locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
-            elif search_type == "combined":
-                ai_response = f"Based on your description '{clean_query}' and uploaded image, I found {len(locations)} matching locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
-            else:
-                ai_response = f"Based on your search for '{clean_query}', I found {len(locations)} relevant locations: {', '.join(location_names)}. These locations feature {', '.join(unique_features[:5])}."
-            
-            # Also get AI commentary using the original query engine
+            # Also get AI commentary using the original query engine (skipped while it is still loading)
+            query_engine = get_query_engine(block=False)
             if query_engine:
                 try:
-                    enhanced_query = f"Provide information about film locations that match: {clean_query}. Focus on interior design and visual characteristics."
-                    ai_commentary = query_engine.query(enhanced_query)
+                    ai_commentary = await query_engine.aquery(commentary_prompt(clean_query))
                     ai_response += f"\n\n{str(ai_commentary)}"
                 except Exception as e:
                     logger.warning(f"Could not get AI commentary: {e}")
-        else:
-            ai_response = f"I couldn't find any locations matching your search criteria. Try using different keywords or uploading a reference image to help me understand what you're looking for."
-        
-        # Calculate confidence based on search results
-        confidence = min(len(locations) / 5.0, 1.0) if locations else 0.3
         
         result = ChatResponse(
             response=ai_response,
-            sources=["Vector Database", "LLaMA AI Model"],
+            sources=SOURCES,
             locations=locations,
             message_id=message_id,
             timestamp=timestamp,
-            confidence=confidence,
+            confidence=result_confidence(locations),
             search_type=search_type
         )
         
@@ -207,7 +366,7 @@ async def chat_endpoint(
         logger.error(f"Error in chat endpoint: {str(e)}", exc_info=True)
         
         return ChatResponse(
-            response="I apologize, but I encountered an issue processing your request. Please try rephrasing your question or try again in a moment.",
+            response=ERROR_RESPONSE,
             sources=[],
             locations=[],
             message_id=str(uuid.uuid4()),
@@ -216,31 +375,471 @@ async def chat_endpoint(
             search_type="error"
         )
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    query: str = Form(...),
+    images: Optional[List[UploadFile]] = File(None),
+    text_weight: float = Form(0.7),
+    image_weight: float = Form(0.3),
+    fusion: str = Form("weighted"),
+    collapse: Optional[str] = Form(None),
+    multi_image: str = Form("mean")
+):
+    """Streaming chat: locations as soon as the search finishes, then LLM tokens.
+
+    The body is newline-delimited JSON with one event per line:
+    ``locations`` (results and templated summary), zero or more ``token``
+    events with LLM commentary, then ``done`` with confidence and timings.
+    An ``error`` event replaces the remainder if something fails.
+    """
+    started = time.perf_counter()
+    message_id = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    clean_query = sanitize_text(query.strip())
+    image_data = await read_images(images)
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000.0, 1)
+
+    async def events():
+        timings = {}
+        try:
+            canned = canned_reply(clean_query, image_data)
+            if canned:
+                yield _ndjson({
+                    "type": "locations", "message_id": message_id, "timestamp": timestamp,
+                    "search_type": "greeting", "locations": [], "response": canned[0]
+                })
+                yield _ndjson({"type": "done", "confidence": canned[1], "sources": [], "timings": {"total_ms": elapsed_ms()}})
+                return
+
+            search_type, locations = await search_for_chat(
+                clean_query, image_data, text_weight, image_weight, fusion, collapse, multi_image
+            )
+            timings["search_ms"] = elapsed_ms()
+            yield _ndjson({
+                "type": "locations",
+                "message_id": message_id,
+                "timestamp": timestamp,
+                "search_type": search_type,
+                "locations": [location.model_dump() for location in locations],
+                "response": summarize_locations(search_type, clean_query, locations, len(image_data))
+            })
+
+            query_engine = get_query_engine(block=False) if locations else None
+            if query_engine:
+                try:
+                    async for token in query_engine.astream(commentary_prompt(clean_query)):
+                        timings.setdefault("first_token_ms", elapsed_ms())
+                        yield _ndjson({"type": "token", "text": token})
+                    timings["llm_ms"] = round(elapsed_ms() - timings["search_ms"], 1)
+                except Exception as e:
+                    logger.warning(f"Could not stream AI commentary: {e}")
+
+            timings["total_ms"] = elapsed_ms()
+            yield _ndjson({
+                "type": "done",
+                "confidence": result_confidence(locations),
+                "sources": SOURCES,
+                "timings": timings
+            })
+            logger.info(f"Streamed {search_type} search, {len(locations)} results found, timings {timings}")
+        except Exception as e:
+            logger.error(f"Error in chat stream: {str(e)}", exc_info=True)
+            yield _ndjson({"type": "error", "message": ERROR_RESPONSE})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+def parse_search_filters(
+    locations: Optional[List[str]],
+    features_any: Optional[List[str]],
+    features_all: Optional[List[str]],
+    text: Optional[str],
+    lat: Optional[float],
+    lon: Optional[float],
+    radius_m: Optional[float],
+    ranges: Optional[List[str]]
+) -> Optional[Dict[str, Any]]:
+    """Structured filters from query parameters; ranges are "field:min:max" with either bound optional"""
+    filters: Dict[str, Any] = {}
+    if locations:
+        filters["location"] = locations
+    if features_any:
+        filters["features_any"] = features_any
+    if features_all:
+        filters["features_all"] = features_all
+    if text:
+        filters["text"] = text
+    if lat is not None or lon is not None or radius_m is not None:
+        filters["geo"] = {"lat": lat, "lon": lon, "radius_m": radius_m}
+    for spec in ranges or []:
+        parts = spec.split(":")
+        if len(parts) != 3 or not parts[0] or not (parts[1] or parts[2]):
+            raise ValueError(f"Invalid range '{spec}', expected field:min:max")
+        bounds = {}
+        if parts[1]:
+            bounds["gte"] = float(parts[1])
+        if parts[2]:
+            bounds["lte"] = float(parts[2])
+        filters.setdefault("ranges", {})[parts[0]] = bounds
+    return filters or None
+
+# Deepest result a page may reach; Qdrant scores offset + limit points per page
+MAX_SEARCH_DEPTH = int(os.getenv("MAX_SEARCH_DEPTH", 1000))
+# Parameters that only shape or position a page, so a cursor stays valid when they change
+PAGE_PARAMS = {"cursor", "offset", "limit", "fields", "exclude_fields", "payload"}
+
+def search_signature(request: Request) -> str:
+    """Hash of the query parameters that determine the result order"""
+    params = sorted((key, value) for key, value in request.query_params.multi_items() if key not in PAGE_PARAMS)
+    return hashlib.sha256(json.dumps(params).encode("utf-8")).hexdigest()[:16]
+
+def encode_cursor(offset: int, signature: str) -> str:
+    """Opaque cursor for the page starting at offset"""
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset, "query": signature}).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, signature: str) -> int:
+    """Offset from a cursor, which must come from a search with the same parameters"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        offset = int(state["offset"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if state.get("query") != signature:
+        raise ValueError("Cursor belongs to a search with different parameters")
+    return offset
+
 @app.get("/locations/search")
 async def search_locations(
+    request: Request,
     q: str,
     limit: int = 5,
     score_threshold: float = 0.6,
-    location_filter: Optional[str] = None
+    location_filter: Optional[str] = None,
+    location: Optional[List[str]] = Query(None),
+    features_any: Optional[List[str]] = Query(None),
+    features_all: Optional[List[str]] = Query(None),
+    text: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    ranges: Optional[List[str]] = Query(None, alias="range"),
+    hnsw_ef: Optional[int] = None,
+    exact: Optional[bool] = None,
+    rescore: Optional[bool] = None,
+    oversampling: Optional[float] = None,
+    collapse: Optional[str] = None,
+    rerank: Optional[bool] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Query(None),
+    exclude_fields: Optional[List[str]] = Query(None),
+    payload: bool = True
 ):
-    """Direct endpoint for location similarity search"""
+    """Direct endpoint for location similarity search.
+
+    Page with offset, or with the next_cursor of the previous page. fields
+    (payload fields to return, "" for only id and score), exclude_fields and
+    payload=false (omit the raw payload) shrink each result.
+    """
     try:
-        results = vector_service.search_by_text(
+        filters = parse_search_filters(
+            location, features_any, features_all, text, lat, lon, radius_m, ranges
+        )
+        signature = search_signature(request)
+        if cursor:
+            offset = decode_cursor(cursor, signature)
+        if offset + limit > MAX_SEARCH_DEPTH:
+            raise ValueError(f"offset + limit must not exceed {MAX_SEARCH_DEPTH}")
+        timings = {}
+        results = await vector_service.asearch_by_text(
             text_query=q,
             limit=limit,
             score_threshold=score_threshold,
-            location_filter=location_filter
+            location_filter=location_filter,
+            filters=filters,
+            hnsw_ef=hnsw_ef,
+            exact=exact,
+            rescore=rescore,
+            oversampling=oversampling,
+            collapse=collapse,
+            rerank=rerank,
+            timings=timings,
+            offset=offset,
+            projection=build_projection(fields, exclude_fields, payload)
         )
-        return {"results": results, "count": len(results)}
+        metrics.record_search("text", len(results))
+        # Re-ranked or collapsed pages are not in vector order, so they have no next page. A
+        # re-rank that fell back on its budget still counts: continuing with rerank=true would fail
+        rerank_requested = rerank if rerank is not None else vector_service.rerank_enabled
+        pageable = collapse is None and not (rerank_requested and offset == 0)
+        next_offset = offset + len(results)
+        has_next = pageable and len(results) == limit and next_offset < MAX_SEARCH_DEPTH
+        # Results are plain JSON types, so skip jsonable_encoder's per-result copies
+        return metrics.TimedJSONResponse({
+            "results": results,
+            "count": len(results),
+            "offset": offset,
+            "next_cursor": encode_cursor(next_offset, signature) if has_next else None,
+            "timings": timings
+        })
+    except StageTimeoutError as e:
+        logger.error(f"Location search timed out: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in location search: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", 500))
+MAX_BATCH_IMAGE_BYTES = int(os.getenv("MAX_BATCH_IMAGE_BYTES", 100 * 1024 * 1024))
+
+def decode_batch_image(i: int, encoded: str, limit: int) -> bytes:
+    """Decode one base64 image, with 413 past limit bytes (checked before decoding too)"""
+    if len(encoded) // 4 * 3 > limit + 2:
+        raise HTTPException(status_code=413, detail=f"Query {i}: image exceeds {limit} bytes")
+    try:
+        data = base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail=f"Query {i}: image is not valid base64")
+    if len(data) > limit:
+        raise HTTPException(status_code=413, detail=f"Query {i}: image exceeds {limit} bytes")
+    return data
+
+@app.post("/locations/search/batch")
+async def search_locations_batch(request: BatchSearchRequest):
+    """Many text and/or image searches with one batched embed and one Qdrant call"""
+    if not request.queries:
+        return {"results": [], "count": 0}
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    queries = []
+    remaining = MAX_BATCH_IMAGE_BYTES
+    for i, item in enumerate(request.queries):
+        query = item.model_dump(exclude_none=True)
+        query.pop("text", None)
+        query.pop("image", None)
+        query["projection"] = build_projection(query.pop("fields", None), query.pop("exclude_fields", None), query.pop("payload"))
+        if item.text and item.text.strip():
+            query["text"] = item.text.strip()
+        if item.image:
+            try:
+                query["image"] = decode_batch_image(i, item.image, min(MAX_IMAGE_BYTES, remaining))
+            except HTTPException as e:
+                if e.status_code == 413 and remaining < MAX_IMAGE_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Images exceed {MAX_BATCH_IMAGE_BYTES} bytes in total")
+                raise
+            remaining -= len(query["image"])
+        if "text" not in query and "image" not in query:
+            raise HTTPException(status_code=400, detail=f"Query {i}: text or image is required")
+        queries.append(query)
+    try:
+        results = await vector_service.asearch_batch(queries)
+        for query, matches in zip(queries, results):
+            search_type = "combined" if "text" in query and "image" in query else "text" if "text" in query else "image"
+            metrics.record_search(search_type, len(matches))
+        return metrics.TimedJSONResponse({
+            "results": [{"results": matches, "count": len(matches)} for matches in results],
+            "count": len(results)
+        })
+    except StageTimeoutError as e:
+        logger.error(f"Batch location search timed out: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch location search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def parse_point_ids(values: List[str]) -> List[str]:
+    """Validate point IDs (UUIDs, as assigned by ingest.py)"""
+    try:
+        return [str(uuid.UUID(value)) for value in values]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Point IDs must be UUIDs, got {values}")
+
+async def recommend(positive: List[str], negative: List[str], **kwargs) -> dict:
+    """Run a recommend search and map missing points and bad arguments to HTTP errors"""
+    # Outside the try, so a malformed ID stays a 400 instead of the generic 500 below
+    positive, negative = parse_point_ids(positive), parse_point_ids(negative)
+    try:
+        results = await vector_service.arecommend_locations(positive, negative, **kwargs)
+        metrics.record_search("recommend", len(results))
+        return metrics.TimedJSONResponse({"results": results, "count": len(results)})
+    except StageTimeoutError as e:
+        logger.error(f"Recommend search timed out: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except UnexpectedResponse as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail="Example point not found")
+        logger.error(f"Error in recommend search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in recommend search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/locations/{point_id}/similar")
+async def similar_locations(
+    point_id: str,
+    limit: int = 5,
+    score_threshold: float = 0.6,
+    vector: str = "image",
+    location_filter: Optional[str] = None,
+    location: Optional[List[str]] = Query(None),
+    features_any: Optional[List[str]] = Query(None),
+    features_all: Optional[List[str]] = Query(None),
+    text: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    ranges: Optional[List[str]] = Query(None, alias="range"),
+    collapse: Optional[str] = None
+):
+    """More like this: locations similar to a stored photo, using its stored vector"""
+    try:
+        filters = parse_search_filters(
+            location, features_any, features_all, text, lat, lon, radius_m, ranges
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await recommend(
+        [point_id],
+        [],
+        vector=vector,
+        limit=limit,
+        score_threshold=score_threshold,
+        location_filter=location_filter,
+        filters=filters,
+        collapse=collapse
+    )
+
+@app.post("/locations/recommend")
+async def recommend_locations(request: RecommendRequest):
+    """Locations like the positive examples and unlike the negative ones, by point ID"""
+    return await recommend(
+        request.positive,
+        request.negative,
+        strategy=request.strategy,
+        vector=request.vector,
+        limit=request.limit,
+        score_threshold=request.score_threshold,
+        location_filter=request.location_filter,
+        filters=request.filters,
+        collapse=request.collapse
+    )
+
+# Folder the ingested photos live in (the image_dir given to ingest.py);
+# image_path payloads are relative to it
+IMAGE_ROOT = os.getenv("IMAGE_ROOT")
+IMAGE_MAX_AGE = int(os.getenv("IMAGE_MAX_AGE", 86400))
+# Internal location prefix mapped to THUMBNAIL_CACHE_DIR by a reverse proxy such as
+# nginx, which then sends the file itself (with sendfile) instead of the app
+IMAGE_ACCEL_REDIRECT = os.getenv("IMAGE_ACCEL_REDIRECT")
+
+def resolve_image_source(image_path: str) -> str:
+    """Absolute path of a stored image_path, refusing anything outside IMAGE_ROOT"""
+    root = os.path.realpath(IMAGE_ROOT)
+    source = os.path.realpath(os.path.join(root, image_path))
+    if os.path.commonpath([root, source]) != root or not os.path.isfile(source):
+        raise HTTPException(status_code=404, detail=f"Image file for '{image_path}' not found")
+    return source
+
+def thumbnail_url(point_id, image_path: Optional[str]) -> Optional[str]:
+    """Small thumbnail URL for a result, or None when /images cannot serve it"""
+    if not IMAGE_ROOT or not image_path:
+        return None
+    return f"/images/{point_id}?size=small"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+@app.get("/images/{point_id}")
+async def get_image(point_id: str, request: Request, size: str = "medium", format: Optional[str] = None):
+    """Thumbnail of a location photo ("small", "medium", "large" or "original"), WebP when accepted, else JPEG"""
+    point_id = parse_point_ids([point_id])[0]
+    if not IMAGE_ROOT:
+        raise HTTPException(status_code=503, detail="Image serving is not configured, set IMAGE_ROOT")
+    try:
+        image_path = await vector_service.aget_image_path(point_id)
+    except StageTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except UnexpectedResponse as e:
+        if e.status_code == 404:
+            raise HTTPException(status_code=404, detail=str(e))
+        logger.error(f"Error looking up image {point_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if image_path is None:
+        raise HTTPException(status_code=404, detail=f"Location {point_id} not found")
+    source = resolve_image_source(image_path)
+
+    headers = {"Cache-Control": f"public, max-age={IMAGE_MAX_AGE}"}
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+        headers["Vary"] = "Accept"
+    try:
+        if size == "original":
+            etag = f'"{await run_in_threadpool(thumbnail_cache.source_hash, source)}"'
+        else:
+            etag = await run_in_threadpool(thumbnail_cache.etag, source, size, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if size == "original":
+        media_type = mimetypes.guess_type(source)[0] or "application/octet-stream"
+        return FileResponse(source, media_type=media_type, headers=headers)
+    try:
+        with metrics.stage("thumbnail"):
+            thumbnail = await run_in_threadpool(thumbnail_cache.get, source, size, format)
+    except OSError as e:
+        logger.error(f"Error rendering thumbnail for {image_path}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if IMAGE_ACCEL_REDIRECT:
+        redirect = f"{IMAGE_ACCEL_REDIRECT.rstrip('/')}/{thumbnail.relative_path.replace(os.sep, '/')}"
+        return Response(media_type=thumbnail.media_type, headers={**headers, "X-Accel-Redirect": redirect})
+    return FileResponse(thumbnail.path, media_type=thumbnail.media_type, headers=headers)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency, search counts, model readiness and queue depth"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+# Shared secret for maintenance endpoints; they are disabled while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_cache(embeddings: bool = False):
+    """Clear cached search results in every worker, e.g. after the collection was updated externally.
+
+    embeddings=true also clears this worker's query embedding cache.
+    """
+    vector_service.invalidate_caches(embeddings=embeddings)
+    await run_in_threadpool(vector_service.bump_cache_version)
+    return {"status": "ok", "cache": vector_service.cache_stats()}
+
 @app.get("/collections/info")
 async def get_collection_info():
     """Get information about the vector database collection"""
     try:
-        info = vector_service.get_collection_info()
+        info = await vector_service.aget_collection_info()
         return info
     except Exception as e:
         logger.error(f"Error getting collection info: {e}")
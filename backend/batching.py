@@ -0,0 +1,179 @@
+# /backend/batching.py
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class _PendingItem:
+    __slots__ = ("payload", "future", "enqueued_at")
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """Groups concurrent single-item requests into one batched call.
+
+    Items submitted within ``max_wait_ms`` of the first queued item (up to
+    ``max_batch_size``) are passed together to ``batch_fn``, which must
+    return one result per input in the same order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[Optional[_PendingItem]]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._recent_batch_sizes: deque = deque(maxlen=1024)
+        self._recent_wait_ms: deque = deque(maxlen=1024)
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so the worker is started lazily in
+        # whichever process first submits work (e.g. each pre-forked worker)
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+            logger.info(
+                f"MicroBatcher '{self.name}' started (max_batch_size={self.max_batch_size}, "
+                f"max_wait_ms={self.max_wait * 1000.0})"
+            )
+
+    def submit(self, payload: Any) -> Future:
+        """Queue a single item and return a future for its result"""
+        self._ensure_started()
+        item = _PendingItem(payload)
+        self._queue.put(item)
+        return item.future
+
+    def __call__(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and block until its result is ready; for threads, never the event loop"""
+        if _in_event_loop():
+            # Blocking here would stall every other request, so none could join this batch
+            raise RuntimeError(
+                f"MicroBatcher '{self.name}' called synchronously on the event loop; "
+                f"await asyncio.wrap_future(batcher.submit(...)) instead"
+            )
+        return self.submit(payload).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker thread once the queue has been drained"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._pid = None
+
+    def _collect(self, first: _PendingItem) -> List[_PendingItem]:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the sentinel so the outer loop stops after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            # Drop items whose callers gave up (e.g. an async timeout) while queued
+            batch = [item for item in self._collect(first) if item.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                results = self.batch_fn([item.payload for item in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"{self.name} batch function returned {len(results)} results for {len(batch)} inputs"
+                    )
+                for item, result in zip(batch, results):
+                    item.future.set_result(result)
+            except Exception as e:
+                logger.error(f"Error in {self.name} batch of {len(batch)}: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+            self._record(batch, started)
+
+    def _record(self, batch: List[_PendingItem], started: float):
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._recent_batch_sizes.append(len(batch))
+            for item in batch:
+                self._recent_wait_ms.append((started - item.enqueued_at) * 1000.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, batch size and wait time metrics"""
+        with self._stats_lock:
+            sizes = list(self._recent_batch_sizes)
+            waits = sorted(self._recent_wait_ms)
+            batches, items, largest = self._batches, self._items, self._largest_batch
+
+        def percentile(values: List[float], pct: float) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(len(values) * pct))], 3)
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 3) if batches else 0.0,
+            "recent_avg_batch_size": round(sum(sizes) / len(sizes), 3) if sizes else 0.0,
+            "largest_batch": largest,
+            "wait_ms_p50": percentile(waits, 0.50),
+            "wait_ms_p95": percentile(waits, 0.95),
+            "wait_ms_max": round(waits[-1], 3) if waits else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
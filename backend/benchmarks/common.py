@@ -0,0 +1,222 @@
+# /backend/benchmarks/common.py
+import os
+import sys
+import json
+import time
+import math
+import random
+import platform
+import resource
+import subprocess
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Representative location queries shared by the load and micro benchmarks
+TEXT_QUERIES = [
+    "modern kitchen with marble countertops",
+    "industrial loft with exposed brick",
+    "outdoor driveway with mature trees",
+    "bright living room with large windows",
+    "vintage bathroom with clawfoot tub",
+    "rooftop terrace overlooking the city",
+    "minimalist bedroom with wooden floors",
+    "warehouse with high ceilings",
+    "garden with a swimming pool",
+    "office space with glass walls",
+]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of ``values`` (pct in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of a list of latencies in milliseconds"""
+    count = len(latencies_ms)
+    total = sum(latencies_ms)
+    return {
+        "count": count,
+        "mean_ms": round(total / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3) if count else 0.0,
+        "qps": round(count / (total / 1000.0), 1) if total else 0.0,
+    }
+
+
+def time_calls(func: Callable[[Any], Any], inputs: Iterable[Any], warmup: int = 0) -> List[float]:
+    """Call ``func`` once per input and return each call's latency in milliseconds.
+
+    The first ``warmup`` inputs are called but not timed.
+    """
+    latencies = []
+    for i, item in enumerate(inputs):
+        started = time.perf_counter()
+        func(item)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        if i >= warmup:
+            latencies.append(elapsed)
+    return latencies
+
+
+def print_table(rows: Dict[str, Dict[str, Any]], columns: Sequence[str]):
+    """Print one row per benchmark case with the given summary columns"""
+    name_width = max([len("case")] + [len(name) for name in rows])
+    widths = [max(len(column), 10) for column in columns]
+    print("  ".join(["case".ljust(name_width)] + [column.rjust(width) for column, width in zip(columns, widths)]))
+    for name, row in rows.items():
+        cells = [str(row.get(column, "")).rjust(width) for column, width in zip(columns, widths)]
+        print("  ".join([name.ljust(name_width)] + cells))
+
+
+def sample_queries(client, collection: str, using: Optional[str], count: int, noise: float, seed: int) -> List[List[float]]:
+    """Stored vectors with gaussian noise, cycled to ``count`` queries"""
+    points, _ = client.scroll(
+        collection_name=collection,
+        limit=min(count, 1000),
+        with_payload=False,
+        with_vectors=[using] if using else True
+    )
+    if not points:
+        raise ValueError(f"Collection '{collection}' is empty")
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        vector = points[i % len(points)].vector
+        vector = vector[using] if using else vector
+        queries.append([value + rng.gauss(0.0, noise) for value in vector])
+    return queries
+
+
+def vector_name(client, collection: str, preferred: str) -> Optional[str]:
+    """Named vector to query, or None for a collection with a single unnamed vector"""
+    vectors = client.get_collection(collection).config.params.vectors
+    if isinstance(vectors, dict):
+        if preferred not in vectors:
+            raise ValueError(f"Collection '{collection}' has no vector '{preferred}' (has {list(vectors)})")
+        return preferred
+    return None
+
+
+def rss_mb(pid: Optional[int] = None) -> float:
+    """Current resident set size of ``pid`` (default: this process) in MiB"""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    if pid is None or pid == os.getpid():
+        # No /proc (e.g. macOS): fall back to the peak RSS, reported in bytes there
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 1)
+    return 0.0
+
+
+def _proc_status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise OSError(f"{field} missing from /proc/self/status")
+
+
+def peak_memory_mb(func: Callable, inputs: Sequence[Any]) -> Optional[float]:
+    """Median growth of this process's peak RSS while calling func on each input, in MiB.
+
+    Resets the high-water mark through /proc/self/clear_refs before every
+    call, so it needs Linux; returns None elsewhere.
+    """
+    growth = []
+    try:
+        for item in inputs:
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+            before = _proc_status_kb("VmRSS")
+            func(item)
+            growth.append((_proc_status_kb("VmHWM") - before) / 1024.0)
+    except OSError:
+        return None
+    growth.sort()
+    return round(growth[len(growth) // 2], 1)
+
+
+def run_metadata() -> Dict[str, Any]:
+    """Where and on what code a benchmark ran, stored next to its results"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(path: Optional[str], results: Dict[str, Any]):
+    """Write benchmark results as JSON (for benchmarks.compare) and echo the file name"""
+    if not path:
+        return
+    with open(path, "w") as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+
+
+def synthetic_jpegs(count: int, seed: int = 0, size: tuple = (640, 480)) -> List[bytes]:
+    """Distinct, reproducible JPEG photos (smooth colour gradients plus noise)"""
+    import io
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    width, height = size
+    ramp_x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :, None]
+    ramp_y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None, None]
+    images = []
+    for _ in range(count):
+        start, end = rng.uniform(0, 255, 3), rng.uniform(0, 255, 3)
+        pixels = start + (end - start) * (ramp_x + ramp_y) / 2.0 + rng.normal(0, 12, (height, width, 3))
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, format="JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def large_jpegs(count: int, seed: int = 0, size: tuple = (6000, 4000)) -> List[bytes]:
+    """Distinct phone-camera sized JPEGs, upscaled from synthetic_jpegs"""
+    import io
+    from PIL import Image
+    images = []
+    for data in synthetic_jpegs(count, seed):
+        buffer = io.BytesIO()
+        Image.open(io.BytesIO(data)).resize(size, Image.BILINEAR).save(buffer, format="JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def load_images(directory: str, count: int) -> List[bytes]:
+    """Up to ``count`` image files from ``directory``, in name order"""
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+    )[:count]
+    if not names:
+        raise ValueError(f"No images found in {directory}")
+    images = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as image_file:
+            images.append(image_file.read())
+    return images
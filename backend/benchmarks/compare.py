@@ -0,0 +1,76 @@
+# /backend/benchmarks/compare.py
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare base.json candidate.json --threshold 10
+
+Works with the JSON written by benchmarks.load and benchmarks.micro. Exits
+with status 1 when any p50/p95/p99 latency, peak RSS, per-image peak
+memory or response size grows, or throughput drops, by more than
+--threshold percent, so it can gate CI.
+"""
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Tuple
+
+# Metric -> True when higher is better
+METRICS = {
+    "p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True, "errors": False,
+    "peak_mb_per_image": False, "response_bytes": False,
+}
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def compare(base: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> Tuple[List[tuple], List[str]]:
+    """Rows of (case, metric, base, candidate, change %) and the regressions among them"""
+    rows, regressions = [], []
+
+    def check(case: str, metric: str, old, new, higher_is_better: bool):
+        if old is None or new is None:
+            return
+        change = (new - old) / old * 100.0 if old else (0.0 if new == old else float("inf"))
+        rows.append((case, metric, old, new, change))
+        worse = -change if higher_is_better else change
+        if worse > threshold:
+            regressions.append(f"{case} {metric}: {old} -> {new} ({change:+.1f}%)")
+
+    for case, old_row in base.get("results", {}).items():
+        new_row = candidate.get("results", {}).get(case)
+        if new_row is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            check(case, metric, old_row.get(metric), new_row.get(metric), higher_is_better)
+    old_rss, new_rss = base.get("rss_mb") or {}, candidate.get("rss_mb") or {}
+    for key in ("peak", "end"):
+        check("rss", key + "_mb", old_rss.get(key), new_rss.get(key), False)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files")
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent")
+    args = parser.parse_args()
+
+    base, candidate = load(args.base), load(args.candidate)
+    print(f"base: {base.get('meta', {}).get('commit')}  candidate: {candidate.get('meta', {}).get('commit')}")
+    rows, regressions = compare(base, candidate, args.threshold)
+    case_width = max([len("case")] + [len(row[0]) for row in rows])
+    print(f"{'case'.ljust(case_width)}  {'metric':>10}  {'base':>10}  {'candidate':>10}  {'change':>8}")
+    for case, metric, old, new, change in rows:
+        print(f"{case.ljust(case_width)}  {metric:>10}  {old:>10}  {new:>10}  {change:>+7.1f}%")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
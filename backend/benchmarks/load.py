@@ -0,0 +1,248 @@
+# /backend/benchmarks/load.py
+"""HTTP load test for /chat, /locations/search and /health with a reproducible query mix.
+
+Run from backend/. Self-contained run (stub Ollama + backend on embedded Qdrant,
+so ingest into ../qdrant_data with QDRANT_MODE=embedded first):
+
+    python -m benchmarks.load --spawn --concurrency 8 --duration 60 --output base.json
+
+Against a backend that is already running:
+
+    python -m benchmarks.load --url http://localhost:8000 --rate 20 \\
+        --mix search_text=6,chat_text=2,chat_image=1,chat_combined=1,health=1
+
+--concurrency keeps N requests in flight (closed loop); --rate sends at a
+fixed arrival rate (open loop) and measures latency from each request's
+scheduled start, so a stalled server shows up as latency instead of as a
+lower offered load. The scenario sequence is fixed by --seed. Compare two
+result files with python -m benchmarks.compare.
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+import httpx
+from benchmarks.common import (
+    TEXT_QUERIES, summarize, print_table, rss_mb, run_metadata, write_results, synthetic_jpegs, load_images
+)
+from benchmarks.stub_ollama import StubOllama
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCENARIOS = ("search_text", "chat_text", "chat_image", "chat_combined", "health")
+DEFAULT_MIX = "search_text=5,chat_text=2,chat_image=1,chat_combined=1,health=1"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}', expected one of {SCENARIOS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadRun:
+    """Issues the scenario mix against the API and records per-scenario latencies"""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], images: List[bytes], seed: int, warmup: int):
+        self.client = client
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.images = images
+        self.rng = random.Random(seed)
+        self.warmup = warmup
+        self.sent = 0
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.names}
+        self.errors: Dict[str, int] = {name: 0 for name in self.names}
+
+    def _next(self) -> tuple:
+        """Scenario, text and image for the next request; the sequence depends only on the seed"""
+        self.sent += 1
+        name = self.rng.choices(self.names, self.weights)[0]
+        return name, self.rng.choice(TEXT_QUERIES), self.rng.choice(self.images), self.sent <= self.warmup
+
+    async def _send(self, name: str, text: str, image: bytes) -> httpx.Response:
+        if name == "health":
+            return await self.client.get("/health")
+        if name == "search_text":
+            return await self.client.get("/locations/search", params={"q": text, "limit": 5})
+        files = [("images", ("reference.jpg", image, "image/jpeg"))] if name in ("chat_image", "chat_combined") else None
+        return await self.client.post("/chat", data={"query": "" if name == "chat_image" else text}, files=files)
+
+    async def request(self, scheduled: Optional[float] = None):
+        name, text, image, warmup = self._next()
+        started = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            response = await self._send(name, text, image)
+            failed = response.status_code >= 400 or (name.startswith("chat") and response.json().get("search_type") == "error")
+        except (httpx.HTTPError, ValueError) as e:
+            logger.debug(f"{name} request failed: {e}")
+            failed = True
+        if warmup:
+            return
+        if failed:
+            self.errors[name] += 1
+        else:
+            self.latencies[name].append((time.perf_counter() - started) * 1000.0)
+
+    async def closed_loop(self, concurrency: int, deadline: float, total: Optional[int]):
+        async def worker():
+            while time.perf_counter() < deadline and (total is None or self.sent < total + self.warmup):
+                await self.request()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def open_loop(self, rate: float, deadline: float, total: Optional[int]):
+        tasks = []
+        started = time.perf_counter()
+        i = 0
+        while total is None or i < total + self.warmup:
+            scheduled = started + i / rate
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.request(scheduled)))
+            i += 1
+        await asyncio.gather(*tasks)
+
+
+async def sample_rss(pid: Optional[int], samples: List[float], interval: float = 0.5):
+    while True:
+        samples.append(rss_mb(pid))
+        await asyncio.sleep(interval)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float):
+    """Poll /health until the backend answers and the query engine finished loading"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get("/health")
+            if response.status_code == 200:
+                state = response.json().get("models", {}).get("query_engine", {}).get("state")
+                if state in ("ready", "error"):
+                    return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(1.0)
+    raise TimeoutError(f"Backend not ready after {timeout}s")
+
+
+def spawn_backend(port: int, ollama_url: str, qdrant_mode: str) -> subprocess.Popen:
+    """Start uvicorn app:app in a child process, configured for a reproducible run"""
+    env = {
+        **os.environ,
+        "OLLAMA_BASE_URL": ollama_url,
+        "QDRANT_MODE": qdrant_mode,
+        "MODEL_WARMUP": "eager",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+
+
+async def run(args) -> Dict[str, Any]:
+    images = load_images(args.images, 50) if args.images else synthetic_jpegs(20, args.seed)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=httpx.Limits(max_connections=None)) as client:
+        await wait_until_ready(client, args.ready_timeout)
+        load = LoadRun(client, parse_mix(args.mix), images, args.seed, args.warmup)
+        rss_samples: List[float] = []
+        sampler = asyncio.create_task(sample_rss(args.server_pid, rss_samples)) if args.server_pid else None
+        rss_start = rss_mb(args.server_pid) if args.server_pid else None
+        started = time.perf_counter()
+        deadline = started + args.duration
+        if args.rate:
+            await load.open_loop(args.rate, deadline, args.requests)
+        else:
+            await load.closed_loop(args.concurrency, deadline, args.requests)
+        wall = time.perf_counter() - started
+        if sampler:
+            sampler.cancel()
+
+    results = {}
+    for name in load.names:
+        results[name] = {
+            **summarize(load.latencies[name]),
+            "errors": load.errors[name],
+            "rps": round(len(load.latencies[name]) / wall, 2),
+        }
+    everything = [latency for latencies in load.latencies.values() for latency in latencies]
+    results["overall"] = {
+        **summarize(everything),
+        "errors": sum(load.errors.values()),
+        "rps": round(len(everything) / wall, 2),
+    }
+    return {
+        "benchmark": "load",
+        "meta": run_metadata(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("url", "mix", "concurrency", "rate", "duration", "requests", "warmup", "seed", "qdrant_mode", "spawn")
+        },
+        "wall_seconds": round(wall, 2),
+        "results": results,
+        "rss_mb": {
+            "start": rss_start,
+            "peak": max(rss_samples) if rss_samples else None,
+            "end": rss_mb(args.server_pid) if args.server_pid else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend with a fixed query mix")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights, from {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight (closed loop)")
+    parser.add_argument("--rate", type=float, help="Requests per second (open loop); overrides --concurrency")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many measured requests")
+    parser.add_argument("--warmup", type=int, default=20, help="Initial requests excluded from the results")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--images", help="Directory of reference photos (default: synthetic JPEGs)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--ready-timeout", type=float, default=600.0, help="Seconds to wait for the backend to load")
+    parser.add_argument("--server-pid", type=int, help="Backend process to sample RSS from")
+    parser.add_argument("--spawn", action="store_true", help="Start a stub Ollama and the backend for this run")
+    parser.add_argument("--port", type=int, default=8765, help="Backend port with --spawn")
+    parser.add_argument("--qdrant-mode", default="embedded", choices=["embedded", "server"], help="Qdrant mode with --spawn")
+    parser.add_argument("--token-ms", type=float, default=15.0, help="Stub Ollama delay per token")
+    parser.add_argument("--tokens", type=int, default=40, help="Stub Ollama tokens per reply")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    stub = backend = None
+    if args.spawn:
+        stub = StubOllama(port=0, token_ms=args.token_ms, tokens=args.tokens).start()
+        backend = spawn_backend(args.port, stub.base_url, args.qdrant_mode)
+        args.url = f"http://127.0.0.1:{args.port}"
+        args.server_pid = backend.pid
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if backend:
+            backend.terminate()
+            backend.wait(timeout=30)
+        if stub:
+            stub.stop()
+
+    print_table(results["results"], ["count", "errors", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    print(f"server RSS MiB: {results['rss_mb']}")
+    write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
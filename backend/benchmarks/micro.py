@@ -0,0 +1,137 @@
+# /backend/benchmarks/micro.py
+"""Microbenchmarks for the request hot path: sanitize_text, encode_text, encode_image,
+image decode+preprocess, search_similar_locations and result serialization.
+
+Run from backend/:
+
+    python -m benchmarks.micro --iterations 200 --output micro.json
+
+Every iteration uses a distinct input, so the embedding and search caches
+never answer and the numbers reflect the uncached path. The preprocess_image
+case runs the upload decode and CLIP preprocessing on 24 MP JPEGs, and
+preprocess_image_full does the same with a full-resolution decode as the
+baseline; both also report the median peak memory per image.
+search_results searches and renders a 20-result JSON page with full
+payloads, search_results_grid the same page projected to id and score;
+both report the response size. Compare two result files with
+python -m benchmarks.compare.
+"""
+import io
+import time
+import logging
+import argparse
+from typing import Any, Dict
+from text_utils import sanitize_text
+from benchmarks.common import (
+    TEXT_QUERIES, summarize, time_calls, print_table, rss_mb, run_metadata, write_results, synthetic_jpegs, sample_queries, vector_name,
+    large_jpegs, peak_memory_mb
+)
+
+logger = logging.getLogger(__name__)
+
+CASES = (
+    "sanitize_text", "encode_text", "encode_image", "preprocess_image", "preprocess_image_full",
+    "search_similar_locations", "search_results", "search_results_grid"
+)
+# Large photos are slow to generate, so those cases cycle through a small distinct set
+LARGE_IMAGES = 8
+# Results per page in the serialization cases, as in a grid view
+PAGE_SIZE = 20
+
+
+def full_decode_preprocess(service):
+    """Baseline: decode at full resolution, then apply the CLIP transform"""
+    from PIL import Image, ImageOps
+
+    def preprocess(image_data: bytes):
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data))).convert("RGB")
+        return service.clip_preprocess(image).unsqueeze(0)
+    return preprocess
+
+
+def case_inputs(name: str, service, count: int, seed: int) -> tuple:
+    """(function, inputs) for one case; inputs are distinct so no cache is hit"""
+    if name == "sanitize_text":
+        texts = [f"  <b>{TEXT_QUERIES[i % len(TEXT_QUERIES)]}</b> near   street {i}\t!! " for i in range(count)]
+        return sanitize_text, texts
+    if name == "encode_text":
+        texts = [f"{TEXT_QUERIES[i % len(TEXT_QUERIES)]} {i}" for i in range(count)]
+        return service.encode_text, texts
+    if name == "encode_image":
+        return service.encode_image, synthetic_jpegs(count, seed)
+    if name in ("preprocess_image", "preprocess_image_full"):
+        images = large_jpegs(min(count, LARGE_IMAGES), seed)
+        inputs = [images[i % len(images)] for i in range(count)]
+        if name == "preprocess_image_full":
+            return full_decode_preprocess(service), inputs
+        if service.image_preprocessor is None:
+            raise ValueError("FAST_IMAGE_PREPROCESS is off or the CLIP transform is unsupported")
+        return lambda image_data: service.images_to_tensor([service.load_image(image_data)]), inputs
+    if name == "search_similar_locations":
+        from vector_service import TEXT_VECTOR
+        using = vector_name(service.client, service.collection_name, TEXT_VECTOR)
+        vectors = sample_queries(service.client, service.collection_name, using, count, 0.05, seed)
+        return lambda vector: service.search_similar_locations(vector, limit=5, score_threshold=0.0, using=using), vectors
+    if name in ("search_results", "search_results_grid"):
+        from vector_service import TEXT_VECTOR
+        from projection import Projection, FULL_PROJECTION
+        from metrics import TimedJSONResponse
+        projection = Projection(fields=(), raw_payload=False) if name == "search_results_grid" else FULL_PROJECTION
+        using = vector_name(service.client, service.collection_name, TEXT_VECTOR)
+        vectors = sample_queries(service.client, service.collection_name, using, count, 0.05, seed)
+
+        def search_and_render(vector) -> bytes:
+            results = service.search_similar_locations(
+                vector, limit=PAGE_SIZE, score_threshold=0.0, using=using, projection=projection
+            )
+            return TimedJSONResponse({"results": results, "count": len(results)}).body
+        return search_and_render, vectors
+    raise ValueError(f"Unknown case '{name}', expected one of {CASES}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the search hot path")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    rss_start = rss_mb()
+    from vector_service import vector_service
+    from model_registry import registry
+    registry.warm_up(background=False)
+    rss_loaded = rss_mb()
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in [case.strip() for case in args.cases.split(",") if case.strip()]:
+        # sanitize_text takes microseconds, so it gets more calls for stable percentiles
+        count = args.iterations * (10 if name == "sanitize_text" else 1)
+        try:
+            func, inputs = case_inputs(name, vector_service, count + args.warmup, args.seed)
+        except Exception as e:
+            logger.warning(f"Skipping {name}: {e}")
+            continue
+        started = time.perf_counter()
+        latencies = time_calls(func, inputs, warmup=args.warmup)
+        results[name] = {**summarize(latencies), "seconds": round(time.perf_counter() - started, 2)}
+        if name.startswith("preprocess_image"):
+            results[name]["peak_mb_per_image"] = peak_memory_mb(func, inputs[:LARGE_IMAGES])
+        if name.startswith("search_results"):
+            results[name]["response_bytes"] = len(func(inputs[0]))
+
+    print_table(results, ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "qps", "peak_mb_per_image", "response_bytes"])
+    rss = {"start": rss_start, "models_loaded": rss_loaded, "end": rss_mb()}
+    print(f"RSS MiB: {rss}")
+    write_results(args.output, {
+        "benchmark": "micro",
+        "meta": run_metadata(),
+        "config": {"iterations": args.iterations, "warmup": args.warmup, "seed": args.seed},
+        "results": results,
+        "rss_mb": rss,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# /backend/benchmarks/qdrant_modes.py
+"""Search latency of embedded (in-process) Qdrant vs. the Qdrant server on the same data.
+
+Run from backend/ with the server up:
+
+    python -m benchmarks.qdrant_modes --queries 500 --copy-from server
+
+Query vectors are sampled from the stored points (with a little noise), so
+no embedding model is loaded and only the search itself is timed.
+"""
+import os
+import logging
+import argparse
+from dotenv import load_dotenv
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+from benchmarks.common import sample_queries, vector_name, summarize, time_calls, print_table
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "qdrant_data")
+
+
+def copy_collection(source: QdrantClient, target: QdrantClient, collection: str, batch_size: int = 256):
+    """Create ``collection`` in target with the source's schema and copy every point"""
+    params = source.get_collection(collection).config.params
+    target.create_collection(
+        collection_name=collection,
+        vectors_config=params.vectors,
+        sparse_vectors_config=params.sparse_vectors
+    )
+    offset = None
+    copied = 0
+    while True:
+        points, offset = source.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        if points:
+            target.upsert(
+                collection_name=collection,
+                points=[PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points],
+                wait=True
+            )
+            copied += len(points)
+        if offset is None:
+            break
+    logger.info(f"Copied {copied} points into '{collection}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedded and server Qdrant search latency")
+    parser.add_argument("--collection", default=os.getenv("QDRANT_COLLECTION_NAME", "film_locations"))
+    parser.add_argument("--path", default=os.getenv("QDRANT_PATH", DEFAULT_PATH), help="Embedded storage directory")
+    parser.add_argument("--host", default=os.getenv("QDRANT_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("QDRANT_PORT", 6333)))
+    parser.add_argument("--vector", default="text", help="Named vector to query")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--copy-from",
+        choices=["server", "embedded"],
+        help="Copy the collection from this side when the other side does not have it yet"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    api_key = os.getenv("QDRANT_API_KEY")
+    clients = {
+        "server": QdrantClient(host=args.host, port=args.port, api_key=api_key if api_key else None),
+        "embedded": QdrantClient(path=args.path),
+    }
+    if args.copy_from:
+        target = "embedded" if args.copy_from == "server" else "server"
+        if not clients[target].collection_exists(args.collection):
+            copy_collection(clients[args.copy_from], clients[target], args.collection)
+
+    counts = {mode: client.count(args.collection, exact=True).count for mode, client in clients.items()}
+    if counts["server"] != counts["embedded"]:
+        logger.warning(f"Point counts differ between modes: {counts}; latencies are not directly comparable")
+
+    source = clients[args.copy_from or "server"]
+    using = vector_name(source, args.collection, args.vector)
+    queries = sample_queries(source, args.collection, using, args.queries + args.warmup, args.noise, args.seed)
+
+    rows = {}
+    top_ids = {}
+    for mode, client in clients.items():
+        def search(vector, client=client):
+            return client.query_points(
+                collection_name=args.collection,
+                query=vector,
+                using=using,
+                limit=args.limit,
+                with_payload=True
+            )
+        rows[mode] = {**summarize(time_calls(search, queries, warmup=args.warmup)), "points": counts[mode]}
+        top_ids[mode] = [[p.id for p in search(vector).points] for vector in queries[args.warmup:args.warmup + 50]]
+
+    agreement = sum(
+        len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(top_ids["server"], top_ids["embedded"])
+    ) / max(len(top_ids["server"]), 1)
+    print_table(rows, ["points", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "qps"])
+    print(f"top-{args.limit} overlap between modes: {agreement:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# /backend/benchmarks/recall.py
+"""Recall vs. latency for HNSW ef, quantization rescoring and oversampling.
+
+Run from backend/ against the live collection:
+
+    python -m benchmarks.recall --ef 16,32,64,128 --oversampling 1,2,4
+
+or against a synthetic collection built with the current HNSW_*, QUANTIZATION
+and VECTORS_ON_DISK settings, to see how they hold up at catalogue scale:
+
+    QUANTIZATION=scalar python -m benchmarks.recall --synthetic 1000000 --dim 512
+
+Ground truth for every query is an exact (brute-force) search, so recall@k
+is the fraction of the true top-k returned by each approximate setting.
+"""
+import time
+import logging
+import argparse
+import itertools
+from typing import List, Optional
+import numpy as np
+from qdrant_client.models import (
+    CollectionStatus, PointStruct, VectorParams, Distance, SearchParams, QuantizationSearchParams
+)
+from vector_service import vector_service, TEXT_VECTOR
+from benchmarks.common import sample_queries, vector_name, summarize, time_calls, print_table
+
+logger = logging.getLogger(__name__)
+
+
+def parse_list(value: str, cast) -> List:
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def build_synthetic(name: str, count: int, dim: int, clusters: int, seed: int, batch_size: int = 1000):
+    """(Re)create ``name`` with the service's tuning and fill it with clustered unit vectors"""
+    client = vector_service.client
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config={TEXT_VECTOR: VectorParams(size=dim, distance=Distance.COSINE, on_disk=vector_service.vectors_on_disk)},
+        hnsw_config=vector_service.hnsw_config(),
+        quantization_config=vector_service.quantization_config()
+    )
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        size = min(batch_size, count - offset)
+        vectors = centers[rng.integers(0, clusters, size)] + 0.5 * rng.normal(size=(size, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=offset + i, vector={TEXT_VECTOR: vector.tolist()})
+                for i, vector in enumerate(vectors)
+            ],
+            wait=False
+        )
+    logger.info(f"Uploaded {count} synthetic points in {time.perf_counter() - started:.1f}s; waiting for indexing")
+    while client.get_collection(name).status != CollectionStatus.GREEN:
+        time.sleep(2)
+    logger.info(f"Collection '{name}' indexed after {time.perf_counter() - started:.1f}s")
+
+
+def recall_at_k(found: List[List], truth: List[List]) -> float:
+    return sum(len(set(f) & set(t)) / max(len(t), 1) for f, t in zip(found, truth)) / max(len(truth), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs. latency for search-time HNSW and quantization settings")
+    parser.add_argument("--collection", default=vector_service.collection_name)
+    parser.add_argument("--vector", default=TEXT_VECTOR)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=10, help="k for recall@k")
+    parser.add_argument("--ef", default="16,32,64,128,256", help="Comma-separated hnsw_ef values")
+    parser.add_argument("--oversampling", default="1,2,4", help="Comma-separated oversampling factors")
+    parser.add_argument("--no-rescore", action="store_true", help="Also measure without rescoring")
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--synthetic", type=int, help="Build a synthetic collection with this many points")
+    parser.add_argument("--dim", type=int, default=512, help="Dimension of synthetic vectors")
+    parser.add_argument("--clusters", type=int, default=256, help="Clusters in the synthetic data")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    client = vector_service.client
+    collection = args.collection
+    if args.synthetic:
+        collection = f"{args.collection}_synthetic"
+        build_synthetic(collection, args.synthetic, args.dim, args.clusters, args.seed)
+
+    info = client.get_collection(collection)
+    print(f"collection={collection} points={info.points_count} "
+          f"hnsw={info.config.hnsw_config} quantization={info.config.quantization_config}")
+
+    using = vector_name(client, collection, args.vector)
+    queries = sample_queries(client, collection, using, args.queries + args.warmup, args.noise, args.seed)
+    measured = queries[args.warmup:]
+
+    def searcher(params):
+        def search(vector):
+            return client.query_points(
+                collection_name=collection,
+                query=vector,
+                using=using,
+                limit=args.limit,
+                search_params=params
+            ).points
+        return search
+
+    # Ground truth is fp32 brute force: exact alone would still score quantized vectors
+    exact = searcher(SearchParams(exact=True, quantization=QuantizationSearchParams(ignore=True)))
+    truth = [[point.id for point in exact(vector)] for vector in measured]
+    rows = {"exact": {**summarize(time_calls(exact, queries, warmup=args.warmup)), "recall": 1.0}}
+
+    quantized = info.config.quantization_config is not None
+    rescore_options = [True, False] if args.no_rescore else [True]
+    oversampling_options: List[Optional[float]] = parse_list(args.oversampling, float) if quantized else [None]
+    for ef, rescore, oversampling in itertools.product(parse_list(args.ef, int), rescore_options, oversampling_options):
+        params = vector_service.search_params(
+            hnsw_ef=ef,
+            exact=False,
+            rescore=rescore if quantized else None,
+            oversampling=oversampling
+        )
+        search = searcher(params)
+        latencies = time_calls(search, queries, warmup=args.warmup)
+        found = [[point.id for point in search(vector)] for vector in measured]
+        name = f"ef={ef}" + (f" os={oversampling:g} rescore={'on' if rescore else 'off'}" if quantized else "")
+        rows[name] = {**summarize(latencies), "recall": round(recall_at_k(found, truth), 4)}
+
+    print_table(rows, ["recall", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "qps"])
+
+
+if __name__ == "__main__":
+    main()
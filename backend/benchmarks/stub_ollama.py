@@ -0,0 +1,141 @@
+# /backend/benchmarks/stub_ollama.py
+"""Minimal stand-in for the Ollama HTTP API, so load tests measure the backend rather than the LLM.
+
+    python -m benchmarks.stub_ollama --port 11435 --token-ms 15 --tokens 40
+
+then start the backend with OLLAMA_BASE_URL=http://localhost:11435. Replies
+are fixed text delivered at a steady token rate, streamed or not, so every
+run sees the same LLM latency.
+"""
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+REPLY_WORDS = (
+    "These locations share natural light, open floor plans and neutral finishes, "
+    "which suit daytime interior scenes and allow flexible camera placement. "
+).split()
+
+
+class StubOllama:
+    """Threaded HTTP server answering /api/chat, /api/generate, /api/show and /api/tags"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11435, token_ms: float = 15.0, tokens: int = 40, model: str = "llama3"):
+        self.token_delay = token_ms / 1000.0
+        self.tokens = tokens
+        self.model = model
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _reply_tokens(self):
+        return [REPLY_WORDS[i % len(REPLY_WORDS)] + " " for i in range(self.tokens)]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # one line per request would dominate the benchmark output
+
+            def _send_json(self, body: dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, body: dict):
+                data = (json.dumps(body) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": stub.model, "model": stub.model}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/show":
+                    self._send_json({"modelfile": "", "parameters": "", "template": "", "model_info": {"llama.context_length": 8192}})
+                    return
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self.send_error(404)
+                    return
+                chat = self.path == "/api/chat"
+
+                def message(text: str, done: bool) -> dict:
+                    body = {"model": stub.model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+                    if chat:
+                        body["message"] = {"role": "assistant", "content": text}
+                    else:
+                        body["response"] = text
+                    if done:
+                        body.update(done_reason="stop", prompt_eval_count=0, eval_count=stub.tokens)
+                    return body
+
+                tokens = stub._reply_tokens()
+                if not request.get("stream", True):
+                    time.sleep(stub.token_delay * len(tokens))
+                    self._send_json(message("".join(tokens), True))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for token in tokens:
+                    time.sleep(stub.token_delay)
+                    self._chunk(message(token, False))
+                self._chunk(message("", True))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def start(self) -> "StubOllama":
+        """Serve in a daemon thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub Ollama listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fixed-latency stand-in for the Ollama API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-ms", type=float, default=15.0, help="Delay per generated token")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens per reply")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stub = StubOllama(args.host, args.port, args.token_ms, args.tokens)
+    logger.info(f"Stub Ollama listening on {stub.base_url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
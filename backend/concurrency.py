@@ -0,0 +1,104 @@
+# /backend/concurrency.py
+import os
+import time
+import asyncio
+import logging
+import contextlib
+from typing import Any, Awaitable, Dict, Optional
+from metrics import stage, observe
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimeoutError(Exception):
+    """Raised when a pipeline stage does not finish within its time budget"""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"{stage} stage timed out after {timeout:.1f}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class StageLimiter:
+    """Caps concurrency and wall-clock time for one async pipeline stage.
+
+    The timeout covers both the wait for a free slot and the work itself, so
+    a saturated stage fails fast instead of queueing requests indefinitely.
+    Each call is recorded as the ``name`` stage in the latency metrics,
+    including the time spent waiting for a slot.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, timeout: Optional[float] = None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._active = 0
+
+    @classmethod
+    def from_env(cls, name: str, default_concurrency: int, default_timeout: float) -> "StageLimiter":
+        """Build a limiter from <NAME>_CONCURRENCY and <NAME>_TIMEOUT variables"""
+        prefix = name.upper()
+        timeout = float(os.getenv(f"{prefix}_TIMEOUT", default_timeout))
+        return cls(
+            name,
+            int(os.getenv(f"{prefix}_CONCURRENCY", default_concurrency)),
+            timeout if timeout > 0 else None,
+        )
+
+    async def _guarded(self, awaitable: Awaitable) -> Any:
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            # Timed out before getting a slot; the work was never started
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        try:
+            return await awaitable
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    async def run(self, awaitable: Awaitable) -> Any:
+        """Await the given coroutine or future inside this stage's limits"""
+        try:
+            with stage(self.name):
+                return await asyncio.wait_for(self._guarded(awaitable), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stage '{self.name}' timed out after {self.timeout}s")
+            raise StageTimeoutError(self.name, self.timeout)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold a slot for a block of work; only the wait for the slot is timed out"""
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stage '{self.name}' timed out waiting for a slot after {self.timeout}s")
+            raise StageTimeoutError(self.name, self.timeout)
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+            observe(self.name, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current slot usage for this stage"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "waiting": self._waiting,
+            "timeout": self.timeout,
+        }
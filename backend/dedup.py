@@ -0,0 +1,223 @@
+# /backend/dedup.py
+"""Near-duplicate photo detection over the Qdrant collection.
+
+Usage:
+    python dedup.py [--threshold 0.95] [--neighbors 10] [--dry-run]
+
+Every point's stored CLIP image vector (computed by ``encode_image`` at
+ingestion) is used as a query against the collection's HNSW index, so the
+self-join costs one approximate k-NN search per photo instead of comparing
+all pairs. Photos linked by a similarity above the threshold are merged into
+clusters with union-find, and each photo in a cluster of two or more gets
+``cluster_id`` and ``cluster_size`` in its payload. Searches with
+``collapse="cluster"`` then return one hit per cluster.
+"""
+import os
+import time
+import logging
+import logging.config
+import argparse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from qdrant_client.models import (
+    QueryRequest, SetPayload, SetPayloadOperation, DeletePayload, DeletePayloadOperation
+)
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_FIELDS = ["cluster_id", "cluster_size"]
+
+
+class UnionFind:
+    """Disjoint sets over point IDs with path halving and union by size"""
+
+    def __init__(self):
+        self.parent: Dict[Any, Any] = {}
+        self.size: Dict[Any, int] = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def groups(self) -> Dict[Any, List[Any]]:
+        groups: Dict[Any, List[Any]] = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return groups
+
+
+class DedupJob:
+    """Clusters near-duplicate photos with an approximate nearest-neighbour self-join"""
+
+    def __init__(
+        self,
+        service=None,
+        threshold: float = 0.95,
+        neighbors: int = 10,
+        batch_size: int = 256,
+        hnsw_ef: Optional[int] = None,
+        update_batch_size: int = 500,
+    ):
+        self._service = service
+        self.threshold = threshold
+        self.neighbors = neighbors
+        self.batch_size = batch_size
+        self.hnsw_ef = hnsw_ef
+        self.update_batch_size = update_batch_size
+
+    @property
+    def service(self):
+        if self._service is None:
+            from vector_service import vector_service
+            self._service = vector_service
+        return self._service
+
+    def _scan(self) -> Iterator[List[Any]]:
+        """Pages of points with their image vector and current cluster fields"""
+        from vector_service import IMAGE_VECTOR
+        offset = None
+        while True:
+            points, offset = self.service.client.scroll(
+                collection_name=self.service.collection_name,
+                limit=self.batch_size,
+                offset=offset,
+                with_payload=CLUSTER_FIELDS,
+                with_vectors=[IMAGE_VECTOR]
+            )
+            if points:
+                yield points
+            if offset is None:
+                break
+
+    def _neighbor_requests(self, points: List[Any]) -> List[QueryRequest]:
+        from vector_service import IMAGE_VECTOR
+        params = self.service.search_params(hnsw_ef=self.hnsw_ef)
+        return [
+            QueryRequest(
+                query=point.vector[IMAGE_VECTOR],
+                using=IMAGE_VECTOR,
+                params=params,
+                limit=self.neighbors + 1,  # the point itself is its own nearest neighbour
+                score_threshold=self.threshold,
+                with_payload=False
+            )
+            for point in points
+        ]
+
+    def find_clusters(self) -> Tuple[UnionFind, Dict[Any, Dict[str, Any]]]:
+        """Self-join the collection; returns the clusters and each point's current cluster fields"""
+        clusters = UnionFind()
+        current: Dict[Any, Dict[str, Any]] = {}
+        started = time.perf_counter()
+        scanned = edges = 0
+        for points in self._scan():
+            responses = self.service.client.query_batch_points(
+                collection_name=self.service.collection_name,
+                requests=self._neighbor_requests(points)
+            )
+            for point, response in zip(points, responses):
+                clusters.add(point.id)
+                current[point.id] = point.payload or {}
+                for neighbor in response.points:
+                    if neighbor.id == point.id:
+                        continue
+                    clusters.add(neighbor.id)
+                    if clusters.union(point.id, neighbor.id):
+                        edges += 1
+            scanned += len(points)
+            logger.info(f"Scanned {scanned} points ({scanned / (time.perf_counter() - started):.1f}/s), {edges} merges")
+        return clusters, current
+
+    def _planned_updates(self, clusters: UnionFind, current: Dict[Any, Dict[str, Any]]) -> Tuple[list, int, int]:
+        """Payload operations for points whose cluster fields change"""
+        operations = []
+        clustered = duplicate_clusters = 0
+        for members in clusters.groups().values():
+            if len(members) < 2:
+                # A former duplicate that is now unique loses its cluster fields
+                stale = [point_id for point_id in members if current.get(point_id, {}).get("cluster_id")]
+                if stale:
+                    operations.append(DeletePayloadOperation(delete_payload=DeletePayload(keys=CLUSTER_FIELDS, points=stale)))
+                continue
+            duplicate_clusters += 1
+            clustered += len(members)
+            # Smallest member ID: stable across runs as long as the cluster keeps that photo
+            payload = {"cluster_id": str(min(str(point_id) for point_id in members)), "cluster_size": len(members)}
+            changed = [
+                point_id for point_id in members
+                if {key: current.get(point_id, {}).get(key) for key in CLUSTER_FIELDS} != payload
+            ]
+            if changed:
+                operations.append(SetPayloadOperation(set_payload=SetPayload(payload=payload, points=changed)))
+        return operations, duplicate_clusters, clustered
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Find clusters and write the changed cluster fields; returns a summary"""
+        started = time.perf_counter()
+        clusters, current = self.find_clusters()
+        operations, duplicate_clusters, clustered = self._planned_updates(clusters, current)
+        summary = {
+            "points": len(current),
+            "duplicate_clusters": duplicate_clusters,
+            "clustered_points": clustered,
+            "payload_updates": len(operations),
+        }
+        if not dry_run and operations:
+            for start in range(0, len(operations), self.update_batch_size):
+                self.service.client.batch_update_points(
+                    collection_name=self.service.collection_name,
+                    update_operations=operations[start:start + self.update_batch_size]
+                )
+            self.service.notify_collection_updated()
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        logger.info(f"Dedup {'dry run ' if dry_run else ''}finished: {summary}")
+        return summary
+
+
+def find_near_duplicates(image_data: bytes, threshold: float = 0.95, limit: int = 10, service=None) -> List[Dict[str, Any]]:
+    """Stored photos whose CLIP similarity to ``image_data`` is at least ``threshold``"""
+    if service is None:
+        from vector_service import vector_service as service
+    return service.search_by_image(image_data, limit=limit, score_threshold=threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate photos in the Qdrant collection")
+    parser.add_argument("--threshold", type=float, default=0.95, help="Minimum CLIP cosine similarity for duplicates")
+    parser.add_argument("--neighbors", type=int, default=10, help="Nearest neighbours checked per photo")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll page and query batch")
+    parser.add_argument("--hnsw-ef", type=int, help="HNSW ef for the neighbour searches (higher = better recall)")
+    parser.add_argument("--dry-run", action="store_true", help="Report clusters without writing payloads")
+    args = parser.parse_args()
+
+    logging.config.fileConfig(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "logging.conf"),
+        disable_existing_loggers=False
+    )
+    DedupJob(
+        threshold=args.threshold,
+        neighbors=args.neighbors,
+        batch_size=args.batch_size,
+        hnsw_ef=args.hnsw_ef,
+    ).run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+# /backend/encoders.py
+"""CPU inference backends for the text (BGE) and image (CLIP) encoders.
+
+Backends, selected per deployment with TEXT_ENCODER_BACKEND and
+IMAGE_ENCODER_BACKEND:
+
+    torch       fp32 PyTorch (reference)
+    torch-int8  PyTorch with dynamic int8 quantization of Linear layers
+    onnx        ONNX Runtime, exported from the torch model on first use
+    onnx-int8   ONNX Runtime with dynamically int8-quantized weights
+
+Every backend returns L2-normalized float32 embeddings. Check a backend
+against fp32 before rolling it out:
+
+    python encoders.py parity --images /path/to/photos
+    python encoders.py export        # pre-build ONNX files for deployment
+"""
+import os
+import re
+import copy
+import time
+import logging
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+from model_registry import registry, TEXT_MODEL_NAME, CLIP_MODEL_NAME, CLIP_PRETRAINED
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+ENCODER_CACHE_DIR = os.getenv(
+    "ENCODER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "encoders")
+)
+ONNX_OPSET = 17
+
+
+def _l2_normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return (embeddings / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _onnx_path(model_name: str, kind: str, quantized: bool) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(ENCODER_CACHE_DIR, slug, f"{kind}{'-int8' if quantized else ''}.onnx")
+
+
+def _onnx_session(path: str):
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    num_threads = os.getenv("TORCH_NUM_THREADS")
+    if num_threads:
+        options.intra_op_num_threads = int(num_threads)
+    return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+
+def _quantize_onnx(source: str, target: str):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+
+
+def _quantize_torch(module: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization in place; pass a module nothing else shares (see ModelRegistry.take)"""
+    return torch.ao.quantization.quantize_dynamic(
+        module.cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+class TextEncoderBackend:
+    name = "base"
+    dimension: int
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ImageEncoderBackend:
+    name = "base"
+    dimension: int
+
+    def encode(self, pixel_values: torch.Tensor) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TorchTextBackend(TextEncoderBackend):
+    def __init__(self, model, name: str = "torch"):
+        self.model = model
+        self.name = name
+        self.dimension = model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts, batch_size=len(texts), normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+class TorchImageBackend(ImageEncoderBackend):
+    def __init__(self, visual, device: str, name: str = "torch"):
+        # Only the image tower, so a quantized backend does not keep the fp32 text tower alive
+        self.model = visual
+        self.device = device
+        self.name = name
+        self.dimension = visual.output_dim
+
+    def encode(self, pixel_values: torch.Tensor) -> np.ndarray:
+        with torch.no_grad():
+            features = self.model(pixel_values.to(self.device))
+            features = features / features.norm(dim=-1, keepdim=True)
+        return features.cpu().numpy().astype(np.float32)
+
+
+class _TextExportWrapper(torch.nn.Module):
+    """Transformer + pooling + normalize, matching the SentenceTransformer pipeline"""
+
+    def __init__(self, transformer, pooling_mode: str):
+        super().__init__()
+        self.transformer = transformer
+        self.pooling_mode = pooling_mode
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        hidden = self.transformer(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        ).last_hidden_state
+        if self.pooling_mode == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask.unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return torch.nn.functional.normalize(pooled, dim=-1)
+
+
+class _ImageExportWrapper(torch.nn.Module):
+    def __init__(self, clip_model):
+        super().__init__()
+        self.clip_model = clip_model
+
+    def forward(self, pixel_values):
+        return torch.nn.functional.normalize(self.clip_model.encode_image(pixel_values), dim=-1)
+
+
+def export_text_onnx(quantized: bool = False) -> str:
+    """Export the BGE encoder to ONNX (once) and return the file path"""
+    path = _onnx_path(TEXT_MODEL_NAME, "text", quantized)
+    if os.path.exists(path):
+        return path
+    fp32_path = _onnx_path(TEXT_MODEL_NAME, "text", False)
+    if not os.path.exists(fp32_path):
+        model = registry.get("text")
+        os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+        wrapper = _TextExportWrapper(copy.deepcopy(model[0].auto_model).cpu().eval(), model[1].get_pooling_mode_str())
+        dummy = model.tokenizer(["export"], return_tensors="pt", padding=True)
+        token_type_ids = dummy.get("token_type_ids", torch.zeros_like(dummy["input_ids"]))
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper,
+                (dummy["input_ids"], dummy["attention_mask"], token_type_ids),
+                fp32_path,
+                input_names=["input_ids", "attention_mask", "token_type_ids"],
+                output_names=["embeddings"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "token_type_ids": {0: "batch", 1: "sequence"},
+                    "embeddings": {0: "batch"},
+                },
+                opset_version=ONNX_OPSET,
+            )
+        logger.info(f"Exported text encoder to {fp32_path}")
+    if quantized:
+        _quantize_onnx(fp32_path, path)
+        logger.info(f"Quantized text encoder to {path}")
+    return path
+
+
+def export_image_onnx(quantized: bool = False) -> str:
+    """Export the CLIP image tower to ONNX (once) and return the file path"""
+    path = _onnx_path(f"{CLIP_MODEL_NAME}-{CLIP_PRETRAINED}", "image", quantized)
+    if os.path.exists(path):
+        return path
+    fp32_path = _onnx_path(f"{CLIP_MODEL_NAME}-{CLIP_PRETRAINED}", "image", False)
+    if not os.path.exists(fp32_path):
+        clip_model = registry.get("clip")[0]
+        os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+        image_size = clip_model.visual.image_size
+        image_size = image_size if isinstance(image_size, (tuple, list)) else (image_size, image_size)
+        with torch.no_grad():
+            torch.onnx.export(
+                _ImageExportWrapper(copy.deepcopy(clip_model).cpu().eval()),
+                (torch.zeros(1, 3, *image_size),),
+                fp32_path,
+                input_names=["pixel_values"],
+                output_names=["embeddings"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "embeddings": {0: "batch"}},
+                opset_version=ONNX_OPSET,
+            )
+        logger.info(f"Exported image encoder to {fp32_path}")
+    if quantized:
+        _quantize_onnx(fp32_path, path)
+        logger.info(f"Quantized image encoder to {path}")
+    return path
+
+
+class OnnxTextBackend(TextEncoderBackend):
+    def __init__(self, quantized: bool = False):
+        from transformers import AutoTokenizer
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.session = _onnx_session(export_text_onnx(quantized))
+        self.tokenizer = AutoTokenizer.from_pretrained(TEXT_MODEL_NAME)
+        self.max_length = min(self.tokenizer.model_max_length, 512)
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+        # From the graph rather than a probe inference, which would run in the pre-fork master
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        tokens = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        if "token_type_ids" not in tokens:
+            tokens["token_type_ids"] = np.zeros_like(tokens["input_ids"])
+        feeds = {name: tokens[name].astype(np.int64) for name in self.input_names}
+        return _l2_normalize(self.session.run(None, feeds)[0])
+
+
+class OnnxImageBackend(ImageEncoderBackend):
+    def __init__(self, quantized: bool = False):
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.session = _onnx_session(export_image_onnx(quantized))
+        self.input_name = self.session.get_inputs()[0].name
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, pixel_values: torch.Tensor) -> np.ndarray:
+        feeds = {self.input_name: pixel_values.cpu().numpy().astype(np.float32)}
+        return _l2_normalize(self.session.run(None, feeds)[0])
+
+
+def create_text_backend(name: str) -> TextEncoderBackend:
+    if name == "torch":
+        return TorchTextBackend(registry.get("text"))
+    if name == "torch-int8":
+        return TorchTextBackend(_quantize_torch(registry.take("text")), name="torch-int8")
+    if name in ("onnx", "onnx-int8"):
+        return OnnxTextBackend(quantized=name == "onnx-int8")
+    raise ValueError(f"Unknown text encoder backend '{name}', expected one of {BACKENDS}")
+
+
+def create_image_backend(name: str) -> ImageEncoderBackend:
+    if name == "torch":
+        return TorchImageBackend(registry.get("clip")[0].visual, registry.device)
+    if name == "torch-int8":
+        return TorchImageBackend(_quantize_torch(registry.take("clip")[0].visual), "cpu", name="torch-int8")
+    if name in ("onnx", "onnx-int8"):
+        return OnnxImageBackend(quantized=name == "onnx-int8")
+    raise ValueError(f"Unknown image encoder backend '{name}', expected one of {BACKENDS}")
+
+
+def _cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    cosines = np.sum(_l2_normalize(reference) * _l2_normalize(candidate), axis=-1)
+    return {
+        "mean_cosine": round(float(cosines.mean()), 6),
+        "min_cosine": round(float(cosines.min()), 6),
+        "p05_cosine": round(float(np.percentile(cosines, 5)), 6),
+    }
+
+
+def _timed(encode, batch, repeats: int) -> tuple:
+    encode(batch)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        output = encode(batch)
+    return output, (time.perf_counter() - started) / repeats
+
+
+def parity_report(
+    texts: List[str],
+    pixel_values: torch.Tensor,
+    backends: Optional[List[str]] = None,
+    repeats: int = 3,
+) -> Dict[str, Any]:
+    """Cosine drift and per-item latency of each backend against torch fp32"""
+    backends = backends or list(BACKENDS)
+    report: Dict[str, Any] = {"text": {}, "image": {}, "samples": {"texts": len(texts), "images": len(pixel_values)}}
+    reference_text, text_seconds = _timed(create_text_backend("torch").encode, texts, repeats)
+    reference_image, image_seconds = _timed(create_image_backend("torch").encode, pixel_values, repeats)
+
+    for name in backends:
+        for kind, factory, batch, reference, reference_seconds in (
+            ("text", create_text_backend, texts, reference_text, text_seconds),
+            ("image", create_image_backend, pixel_values, reference_image, image_seconds),
+        ):
+            try:
+                output, seconds = _timed(factory(name).encode, batch, repeats)
+            except Exception as e:
+                report[kind][name] = {"error": str(e)}
+                continue
+            report[kind][name] = {
+                **_cosine_drift(reference, output),
+                "ms_per_item": round(seconds * 1000.0 / len(batch), 3),
+                "speedup_vs_torch": round(reference_seconds / seconds, 2) if seconds else None,
+            }
+    return report
+
+
+def _load_parity_samples(image_dir: Optional[str], text_file: Optional[str], limit: int):
+    from PIL import Image
+    from vector_service import vector_service
+
+    if text_file:
+        with open(text_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()][:limit]
+    else:
+        sample_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_data")
+        texts = []
+        for name in sorted(os.listdir(sample_dir)):
+            with open(os.path.join(sample_dir, name), encoding="utf-8") as f:
+                texts.extend(sentence.strip() for sentence in f.read().split(".") if sentence.strip())
+        texts = texts[:limit]
+
+    images = []
+    if image_dir:
+        from ingest import discover_images
+        for relative_path in list(discover_images(image_dir))[:limit]:
+            images.append(Image.open(os.path.join(image_dir, relative_path)).convert("RGB"))
+    else:
+        logger.warning("No --images given; measuring image drift on synthetic noise images")
+        rng = np.random.default_rng(0)
+        images = [Image.fromarray(rng.integers(0, 255, (256, 256, 3), dtype=np.uint8)) for _ in range(8)]
+    pixel_values = torch.stack([vector_service.preprocess_image(image) for image in images])
+    return texts, pixel_values
+
+
+def main():
+    import json
+    import logging.config
+
+    parser = argparse.ArgumentParser(description="Export encoder backends and check their parity with fp32")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Build ONNX (and int8) files for deployment")
+    export_parser.add_argument("--no-int8", action="store_true")
+    parity_parser = subparsers.add_parser("parity", help="Report cosine drift of each backend against fp32")
+    parity_parser.add_argument("--images", help="Folder of sample photos")
+    parity_parser.add_argument("--texts", help="Text file with one sample query per line")
+    parity_parser.add_argument("--limit", type=int, default=64)
+    parity_parser.add_argument("--backends", nargs="+", choices=BACKENDS)
+    parity_parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    logging.config.fileConfig(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "logging.conf"),
+        disable_existing_loggers=False
+    )
+    if args.command == "export":
+        for quantized in (False,) if args.no_int8 else (False, True):
+            print(export_text_onnx(quantized))
+            print(export_image_onnx(quantized))
+        return
+
+    texts, pixel_values = _load_parity_samples(args.images, args.texts, args.limit)
+    report = parity_report(texts, pixel_values, backends=args.backends)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# /backend/filters.py
+import os
+import json
+from typing import Any, Dict, Optional
+from qdrant_client.models import (
+    Filter, FieldCondition, MatchValue, MatchAny, MatchText, GeoRadius, GeoPoint, Range, PayloadSchemaType
+)
+
+# Payload fields with special types: a {"lat", "lon"} point and numeric attributes
+GEO_FIELD = os.getenv("PAYLOAD_GEO_FIELD", "coordinates")
+NUMERIC_FIELDS = [
+    field.strip()
+    for field in os.getenv("PAYLOAD_NUMERIC_FIELDS", "ceiling_height,floor_area").split(",")
+    if field.strip()
+]
+
+# Payload indexes created on the collection; Qdrant uses them to pre-filter during HNSW traversal
+PAYLOAD_INDEXES = {
+    "location": PayloadSchemaType.KEYWORD,
+    "features": PayloadSchemaType.KEYWORD,
+    "cluster_id": PayloadSchemaType.KEYWORD,
+    "description": PayloadSchemaType.TEXT,
+    GEO_FIELD: PayloadSchemaType.GEO,
+    **{field: PayloadSchemaType.FLOAT for field in NUMERIC_FIELDS},
+}
+
+FILTER_KEYS = ("location", "features_any", "features_all", "text", "geo", "ranges")
+RANGE_BOUNDS = ("gt", "gte", "lt", "lte")
+
+
+def build_filter(location_filter: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Optional[Filter]:
+    """Qdrant filter from the legacy location string and/or a structured filter.
+
+    ``filters`` keys, all optional and combined with AND:
+      location      one location name, or a list matching any of them
+      features_any  list; at least one feature must be present
+      features_all  list; every feature must be present
+      text          words that must all appear in the description
+      geo           {"lat", "lon", "radius_m"}
+      ranges        {field: {"gte"/"gt"/"lte"/"lt": number}} over NUMERIC_FIELDS
+    """
+    conditions = []
+    if location_filter:
+        conditions.append(FieldCondition(key="location", match=MatchValue(value=location_filter)))
+    filters = filters or {}
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown filter keys {sorted(unknown)}, expected any of {FILTER_KEYS}")
+
+    location = filters.get("location")
+    if location:
+        match = MatchValue(value=location) if isinstance(location, str) else MatchAny(any=list(location))
+        conditions.append(FieldCondition(key="location", match=match))
+    if filters.get("features_any"):
+        conditions.append(FieldCondition(key="features", match=MatchAny(any=list(filters["features_any"]))))
+    for feature in filters.get("features_all") or []:
+        conditions.append(FieldCondition(key="features", match=MatchValue(value=feature)))
+    if filters.get("text"):
+        conditions.append(FieldCondition(key="description", match=MatchText(text=filters["text"])))
+
+    geo = filters.get("geo")
+    if geo:
+        try:
+            center = GeoPoint(lat=float(geo["lat"]), lon=float(geo["lon"]))
+            radius = float(geo["radius_m"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("geo filter needs numeric lat, lon and radius_m")
+        conditions.append(FieldCondition(key=GEO_FIELD, geo_radius=GeoRadius(center=center, radius=radius)))
+
+    ranges = filters.get("ranges") or {}
+    if not isinstance(ranges, dict):
+        raise ValueError("ranges filter must map field names to bounds")
+    for field, bounds in ranges.items():
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Range filter on '{field}' is not supported, expected one of {NUMERIC_FIELDS}")
+        if not isinstance(bounds, dict) or not bounds or set(bounds) - set(RANGE_BOUNDS):
+            raise ValueError(f"Range on '{field}' must be an object with any of {RANGE_BOUNDS}")
+        try:
+            values = {bound: float(value) for bound, value in bounds.items()}
+        except (TypeError, ValueError):
+            raise ValueError(f"Range bounds on '{field}' must be numbers, got {bounds}")
+        conditions.append(FieldCondition(key=field, range=Range(**values)))
+
+    return Filter(must=conditions) if conditions else None
+
+
+def filter_cache_key(filters: Optional[Dict[str, Any]]) -> Optional[str]:
+    return json.dumps(filters, sort_keys=True, default=str) if filters else None
+
+
+def normalize_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce metadata into indexable types: lat/lon into a geo point, numeric strings into floats"""
+    lat_key = next((key for key in ("lat", "latitude") if payload.get(key) not in (None, "")), None)
+    lon_key = next((key for key in ("lon", "lng", "longitude") if payload.get(key) not in (None, "")), None)
+    if lat_key and lon_key and GEO_FIELD not in payload:
+        payload[GEO_FIELD] = {"lat": float(payload.pop(lat_key)), "lon": float(payload.pop(lon_key))}
+    for field in NUMERIC_FIELDS:
+        value = payload.get(field)
+        if isinstance(value, str):
+            try:
+                payload[field] = float(value) if value.strip() else None
+            except ValueError:
+                pass  # left as-is; the numeric index simply skips it
+    return payload
@@ -0,0 +1,28 @@
+# /backend/gunicorn.conf.py
+# Multi-worker deployment that shares model weights between workers:
+#   gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', 8000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# Import the app (and load the models) once in the master; forked workers then
+# share the weight pages copy-on-write instead of each holding their own copy.
+preload_app = True
+raw_env = ["MODEL_WARMUP=lazy"]
+
+
+def on_starting(server):
+    # Load weights only: inference threads started here would not survive the fork
+    from model_registry import registry
+
+    registry.prepare_for_fork()
+
+
+def post_fork(server, worker):
+    # The query engine embeds documents while it builds, so each worker builds it itself
+    from llama_index_service import warm_up_query_engine
+
+    warm_up_query_engine(background=True)
@@ -0,0 +1,76 @@
+# /backend/imaging.py
+import io
+import logging
+from typing import List, Optional, Sequence, Union
+import numpy as np
+import torch
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+class ImagePreprocessor:
+    """CLIP preprocessing with reduced-size JPEG decoding and batched normalization.
+
+    JPEGs are decoded with libjpeg DCT scaling (``Image.draft``) at the
+    smallest 1/2, 1/4 or 1/8 scale that still covers the model input, so a
+    24 MP photo never exists in memory at full size. EXIF orientation is
+    applied, then the shortest-side bicubic resize and centre crop match the
+    open_clip eval transform; conversion to float and normalization run once
+    over the whole batch.
+    """
+
+    def __init__(self, image_size: int, mean: Sequence[float], std: Sequence[float]):
+        self.image_size = image_size
+        self.mean = torch.tensor(mean, dtype=torch.float32).view(1, 3, 1, 1)
+        self.std = torch.tensor(std, dtype=torch.float32).view(1, 3, 1, 1)
+
+    @classmethod
+    def from_transform(cls, transform) -> Optional["ImagePreprocessor"]:
+        """Read size, mean and std from a torchvision eval transform; None for any other shape"""
+        resize = crop = mean = std = None
+        for step in getattr(transform, "transforms", []):
+            name = type(step).__name__
+            if name == "Resize":
+                resize = step.size
+            elif name == "CenterCrop":
+                crop = step.size
+            elif name == "Normalize":
+                mean, std = step.mean, step.std
+        if isinstance(resize, (list, tuple)) and len(resize) == 1:
+            resize = resize[0]
+        crop = tuple(crop) if isinstance(crop, (list, tuple)) else (crop, crop)
+        if not isinstance(resize, int) or crop != (resize, resize) or mean is None:
+            logger.warning(f"Unsupported image transform {transform}, using it as-is")
+            return None
+        return cls(resize, mean, std)
+
+    def decode(self, image_data: Union[bytes, Image.Image]) -> Image.Image:
+        """Upright RGB image, decoded no larger than needed for the model input"""
+        if isinstance(image_data, Image.Image):
+            image = image_data
+        else:
+            image = Image.open(io.BytesIO(image_data))
+            # No-op for formats other than JPEG; the result is never smaller than requested
+            image.draft("RGB", (self.image_size, self.image_size))
+        return ImageOps.exif_transpose(image).convert("RGB")
+
+    def resize_crop(self, image: Image.Image) -> np.ndarray:
+        """Shortest side to image_size (bicubic), centre crop; uint8 HxWx3"""
+        width, height = image.size
+        size = self.image_size
+        # Same output size and crop offsets as torchvision Resize(int) + CenterCrop
+        if width <= height:
+            new_size = (size, int(size * height / width))
+        else:
+            new_size = (int(size * width / height), size)
+        if new_size != image.size:
+            image = image.resize(new_size, Image.BICUBIC)
+        left = int(round((new_size[0] - size) / 2.0))
+        top = int(round((new_size[1] - size) / 2.0))
+        return np.asarray(image.crop((left, top, left + size, top + size)), dtype=np.uint8)
+
+    def to_tensor(self, arrays: List[np.ndarray]) -> torch.Tensor:
+        """Normalized NCHW float batch from resize_crop outputs"""
+        batch = torch.from_numpy(np.stack(arrays)).permute(0, 3, 1, 2).float().div_(255.0)
+        return batch.sub_(self.mean).div_(self.std)
@@ -0,0 +1,406 @@
+# /backend/ingest.py
+"""Bulk ingestion of location photos into the Qdrant collection.
+
+Usage:
+    python ingest.py <image_dir> [--metadata metadata.jsonl] [--batch-size 64] [--full] [--thumbnails]
+
+By default only photos that were added or changed since the last run are
+embedded (tracked by a manifest of content hashes next to the collection),
+and points for deleted photos are removed.
+
+Metadata may be a .json list, .jsonl or .csv file with one record per image:
+``image`` (path relative to image_dir), ``location``, ``description`` and
+``features`` (list, or ``;``-separated string in CSV). Any extra fields are
+stored in the payload as-is, except ``lat``/``lon`` (stored as a geo point)
+and numeric attributes such as ``ceiling_height`` (coerced to numbers) so
+they can be indexed. Images without a record are ingested with the parent
+folder name as ``location``.
+"""
+import os
+import csv
+import json
+import time
+import uuid
+import logging
+import logging.config
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from manifest import Manifest, manifest_path_for
+from filters import normalize_payload
+from dedup import CLUSTER_FIELDS
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+METADATA_FILENAMES = ("metadata.jsonl", "metadata.json", "metadata.csv")
+
+# Fixed namespace so the same relative image path always maps to the same point ID
+POINT_ID_NAMESPACE = uuid.UUID("6f1c0a52-3e2b-4d8e-9a57-2b7f9d4c1e10")
+
+
+def point_id_for(relative_path: str) -> str:
+    """Deterministic point ID for an image path relative to the ingest root"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, relative_path.replace(os.sep, "/")))
+
+
+@dataclass
+class IngestItem:
+    relative_path: str
+    absolute_path: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def point_id(self) -> str:
+        return point_id_for(self.relative_path)
+
+
+def load_metadata(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    """Read per-image metadata keyed by relative image path"""
+    if not path:
+        return {}
+    records: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            records = [json.loads(line) for line in f if line.strip()]
+        elif path.endswith(".json"):
+            records = json.load(f)
+        elif path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                features = row.get("features") or ""
+                row["features"] = [feat.strip() for feat in features.split(";") if feat.strip()]
+                records.append(row)
+        else:
+            raise ValueError(f"Unsupported metadata format: {path}")
+
+    metadata = {}
+    for record in records:
+        image = record.pop("image", None) or record.pop("image_path", None)
+        if not image:
+            logger.warning(f"Skipping metadata record without an image path: {record}")
+            continue
+        metadata[image.replace(os.sep, "/")] = record
+    return metadata
+
+
+def discover_images(image_dir: str) -> Iterator[str]:
+    """Yield image paths relative to image_dir in a stable order"""
+    for root, dirs, files in os.walk(image_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.relpath(os.path.join(root, name), image_dir).replace(os.sep, "/")
+
+
+def build_payload(relative_path: str, record: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Payload in the shape search_similar_locations expects"""
+    record = dict(record or {})
+    parent = os.path.dirname(relative_path)
+    payload = {
+        "location": record.pop("location", None) or (os.path.basename(parent) if parent else "Unknown"),
+        "description": record.pop("description", ""),
+        "features": record.pop("features", []) or [],
+        "image_path": relative_path,
+    }
+    payload.update(record)
+    return normalize_payload(payload)
+
+
+class Checkpoint:
+    """Append-only log of relative paths whose points have been upserted"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Set[str]:
+        if not self.path or not os.path.exists(self.path):
+            return set()
+        with open(self.path, encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def record(self, relative_paths: Iterable[str]):
+        if not self.path:
+            return
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(f"{p}\n" for p in relative_paths)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class IngestionPipeline:
+    """Decode, embed and upsert a folder of location photos in batches"""
+
+    def __init__(
+        self,
+        service,
+        image_dir: str,
+        metadata_path: Optional[str] = None,
+        batch_size: int = 64,
+        upsert_batch_size: int = 256,
+        decode_workers: int = os.cpu_count() or 4,
+        upsert_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+    ):
+        self._service = service
+        self.image_dir = image_dir
+        self.metadata_path = metadata_path or self._find_metadata(image_dir)
+        self.batch_size = batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.decode_workers = decode_workers
+        self.upsert_workers = upsert_workers
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.manifest = Manifest(manifest_path) if manifest_path else None
+
+    @property
+    def service(self):
+        # Resolved on first use so a no-op sync never loads the embedding models
+        if self._service is None:
+            from vector_service import vector_service
+            self._service = vector_service
+        return self._service
+
+    @staticmethod
+    def _find_metadata(image_dir: str) -> Optional[str]:
+        for name in METADATA_FILENAMES:
+            path = os.path.join(image_dir, name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def discover(self) -> List[IngestItem]:
+        """List every image under image_dir with its payload"""
+        metadata = load_metadata(self.metadata_path)
+        return [
+            IngestItem(
+                relative_path=relative_path,
+                absolute_path=os.path.join(self.image_dir, relative_path),
+                payload=build_payload(relative_path, metadata.get(relative_path)),
+            )
+            for relative_path in discover_images(self.image_dir)
+        ]
+
+    def _decode(self, item: IngestItem):
+        """Read and preprocess one image; returns None if it cannot be decoded"""
+        try:
+            with open(item.absolute_path, "rb") as f:
+                return self.service.preprocess_image(f.read())
+        except Exception as e:
+            logger.warning(f"Skipping {item.relative_path}: {e}")
+            return None
+
+    def run(self, items: Optional[List[IngestItem]] = None, resume: bool = True) -> Dict[str, Any]:
+        """Embed and upsert items (all discovered images by default)"""
+        self.service.ensure_collection()
+        if items is None:
+            items = self.discover()
+        if resume:
+            done = self.checkpoint.load()
+            if done:
+                logger.info(f"Resuming: {len(done)} images already ingested")
+            items = [item for item in items if item.relative_path not in done]
+        else:
+            self.checkpoint.reset()
+
+        stats = self._embed_and_upsert(items, self.checkpoint.record)
+        self.service.notify_collection_updated()
+        logger.info(f"Ingestion finished: {stats}")
+        return stats
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """Bring the collection in line with image_dir using the manifest.
+
+        Only added or changed photos are embedded, payload-only changes are
+        written without re-embedding, and points for removed photos are
+        deleted. The manifest is saved as batches land, so an interrupted
+        sync picks up where it stopped. full=True re-embeds every photo.
+        """
+        if self.manifest is None:
+            raise ValueError("sync() requires a manifest_path")
+
+        items = self.discover()
+        by_path = {item.relative_path: item for item in items}
+        # Diff against the existing manifest even for a full sync, so deleted photos still lose their points
+        diff, fresh = self.manifest.diff(
+            {item.relative_path: item.absolute_path for item in items},
+            {item.relative_path: item.payload for item in items},
+        )
+        if full:
+            diff.changed += diff.metadata_changed + diff.unchanged
+            diff.metadata_changed, diff.unchanged = [], []
+        logger.info(f"Manifest diff for {self.image_dir}: {diff.summary()}")
+        if diff.is_empty:
+            self.manifest.save()
+            return {"total": 0, "embedded": 0, "upserted": 0, "skipped": 0, **diff.summary()}
+
+        self.service.ensure_collection()
+        if diff.removed:
+            removed_ids = [
+                self.manifest.entries[key].get("point_id") or point_id_for(key) for key in diff.removed
+            ]
+            self.service.delete_points(removed_ids)
+            for key in diff.removed:
+                self.manifest.remove(key)
+        if diff.metadata_changed:
+            # The new payload replaces the old one (so removed metadata keys go away),
+            # but the cluster fields written by dedup.py are not metadata and carry over
+            clusters = self.service.get_payloads(
+                [by_path[key].point_id for key in diff.metadata_changed], CLUSTER_FIELDS
+            )
+            for key in diff.metadata_changed:
+                item = by_path[key]
+                self.service.overwrite_payload(item.point_id, {**item.payload, **clusters.get(item.point_id, {})})
+                self.manifest.update(key, fresh[key])
+
+        def commit(paths: List[str]):
+            for key in paths:
+                self.manifest.update(key, {**fresh[key], "point_id": by_path[key].point_id})
+            self.manifest.save(min_interval=10.0)
+
+        stats = self._embed_and_upsert([by_path[key] for key in diff.to_embed], commit)
+        self.manifest.save()
+        self.service.notify_collection_updated()
+        stats.update(diff.summary())
+        logger.info(f"Sync finished: {stats}")
+        return stats
+
+    def _embed_and_upsert(
+        self,
+        items: List[IngestItem],
+        on_upserted: Callable[[List[str]], None],
+    ) -> Dict[str, Any]:
+        stats = {"total": len(items), "embedded": 0, "upserted": 0, "skipped": 0}
+        if not items:
+            logger.info("Nothing to ingest")
+            return stats
+
+        started = time.perf_counter()
+        pending_points = []
+        pending_paths: List[str] = []
+        in_flight: List[Future] = []
+        stats_lock = threading.Lock()
+
+        def upsert(points, paths):
+            self.service.upsert_points(points)
+            on_upserted(paths)
+            with stats_lock:
+                stats["upserted"] += len(points)
+
+        def flush(force: bool = False):
+            nonlocal pending_points, pending_paths
+            while pending_points and (force or len(pending_points) >= self.upsert_batch_size):
+                points = pending_points[:self.upsert_batch_size]
+                paths = pending_paths[:self.upsert_batch_size]
+                pending_points = pending_points[self.upsert_batch_size:]
+                pending_paths = pending_paths[self.upsert_batch_size:]
+                # Bound the number of outstanding upserts so memory stays flat
+                while len(in_flight) >= self.upsert_workers * 2:
+                    in_flight.pop(0).result()
+                in_flight.append(upsert_pool.submit(upsert, points, paths))
+
+        with ThreadPoolExecutor(self.decode_workers, thread_name_prefix="decode") as decode_pool, \
+                ThreadPoolExecutor(self.upsert_workers, thread_name_prefix="upsert") as upsert_pool:
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                tensors = list(decode_pool.map(self._decode, batch))
+                decoded = [(item, tensor) for item, tensor in zip(batch, tensors) if tensor is not None]
+                stats["skipped"] += len(batch) - len(decoded)
+                if decoded:
+                    vectors = self.service.point_vectors(
+                        [tensor for _, tensor in decoded],
+                        [item.payload for item, _ in decoded]
+                    )
+                    for (item, _), point_vectors in zip(decoded, vectors):
+                        pending_points.append(self.service.build_point(item.point_id, point_vectors, item.payload))
+                        pending_paths.append(item.relative_path)
+                    stats["embedded"] += len(decoded)
+                flush()
+
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Ingested {stats['embedded']}/{stats['total']} images "
+                    f"({stats['embedded'] / elapsed:.1f} images/sec)"
+                )
+            flush(force=True)
+            for future in in_flight:
+                future.result()
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 2)
+        stats["images_per_sec"] = round(stats["embedded"] / elapsed, 2) if elapsed else 0.0
+        return stats
+
+
+def pregenerate_thumbnails(image_dir: str, workers: int = os.cpu_count() or 4) -> Dict[str, int]:
+    """Render every thumbnail size and format for the photos under image_dir (already cached ones are skipped)"""
+    from thumbnails import thumbnail_cache
+    stats = {"images": 0, "failed": 0}
+
+    def render(relative_path: str):
+        try:
+            thumbnail_cache.pregenerate(os.path.join(image_dir, relative_path))
+            return True
+        except Exception as e:
+            logger.warning(f"Skipping thumbnails for {relative_path}: {e}")
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers, thread_name_prefix="thumbnail") as pool:
+        for ok in pool.map(render, discover_images(image_dir)):
+            stats["images" if ok else "failed"] += 1
+    logger.info(f"Thumbnails ready for {stats['images']} images in {time.perf_counter() - started:.1f}s ({stats['failed']} failed)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest location photos into Qdrant")
+    parser.add_argument("image_dir", help="Folder containing location photos")
+    parser.add_argument("--metadata", help="Metadata file (.json, .jsonl or .csv); defaults to image_dir/metadata.*")
+    parser.add_argument("--batch-size", type=int, default=64, help="Images per embedding forward pass")
+    parser.add_argument("--upsert-batch-size", type=int, default=256, help="Points per upsert call")
+    parser.add_argument("--decode-workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--upsert-workers", type=int, default=4, help="Parallel upsert calls")
+    parser.add_argument("--manifest", help="Manifest file (default: MANIFEST_DIR/<collection>.json)")
+    parser.add_argument("--full", action="store_true", help="Re-embed everything and rebuild the manifest")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Ingest every image without tracking changes (checkpoint-based resume only)")
+    parser.add_argument("--checkpoint", help="Checkpoint file for --no-manifest (default: image_dir/.ingest_checkpoint)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and reset the checkpoint")
+    parser.add_argument("--thumbnails", action="store_true",
+                        help="Also pre-generate the thumbnails served by /images (set IMAGE_ROOT to image_dir for the API)")
+    args = parser.parse_args()
+
+    logging.config.fileConfig(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "logging.conf"),
+        disable_existing_loggers=False
+    )
+    collection_name = os.getenv("QDRANT_COLLECTION_NAME", "film_locations")
+
+    pipeline = IngestionPipeline(
+        None,
+        args.image_dir,
+        metadata_path=args.metadata,
+        batch_size=args.batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        decode_workers=args.decode_workers,
+        upsert_workers=args.upsert_workers,
+        checkpoint_path=args.checkpoint or os.path.join(args.image_dir, ".ingest_checkpoint"),
+        manifest_path=None if args.no_manifest else (args.manifest or manifest_path_for(collection_name)),
+    )
+    if args.no_manifest:
+        pipeline.run(resume=not args.no_resume)
+    else:
+        pipeline.sync(full=args.full)
+    if args.thumbnails:
+        pregenerate_thumbnails(args.image_dir, workers=args.decode_workers)
+
+
+if __name__ == "__main__":
+    main()
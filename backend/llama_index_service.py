@@ -4,48 +4,33 @@ from llama_index.core import (
     VectorStoreIndex,
     SimpleDirectoryReader,
     Settings,
-    StorageContext
+    StorageContext,
+    load_index_from_storage
 )
 from llama_index.llms.ollama import Ollama
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.postprocessor import MetadataReplacementPostProcessor
 from llama_index.core.node_parser import SemanticSplitterNodeParser
+from llama_index.core.schema import QueryBundle
 import os
-import re
+import json
+import time
+import asyncio
 import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+from concurrency import StageLimiter, StageTimeoutError
+from cache import TTLCache
+from text_utils import EMOJI_PATTERN, sanitize_text
+from manifest import Manifest, manifest_path_for
+from model_registry import registry, TEXT_MODEL_NAME
 
-logger = logging.getLogger(__name__)
-
-# Enhanced Emoji Filter Pattern
-EMOJI_PATTERN = re.compile(
-    "["
-    u"\U0001F600-\U0001F64F"  # emoticons
-    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-    u"\U0001F680-\U0001F6FF"  # transport & map symbols
-    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-    u"\U00002500-\U00002BEF"  # chinese symbols
-    u"\U00002702-\U000027B0"
-    u"\U000024C2-\U0001F251"
-    u"\U0001f926-\U0001f937"
-    u"\U00010000-\U0010ffff"
-    u"\u2640-\u2642"
-    u"\u2600-\u2B55"
-    u"\u200d"
-    u"\u23cf"
-    u"\u23e9"
-    u"\u231a"
-    u"\ufe0f"
-    u"\u3030"
-    "]+", flags=re.UNICODE
-)
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn workers, so only one process uses the store
+    fcntl = None
 
-def sanitize_text(text: str) -> str:
-    """Remove emojis and normalize text for processing"""
-    if not text:
-        return ""
-    cleaned = EMOJI_PATTERN.sub('', text)
-    cleaned = ' '.join(cleaned.split())
-    return cleaned.strip()
+logger = logging.getLogger(__name__)
 
 # Enhanced system prompt for film location assistance
 SYSTEM_PROMPT = (
@@ -63,31 +48,70 @@ def build_prompt(user_input: str) -> str:
         f"<s>[INST] <<SYS>>\n{SYSTEM_PROMPT}\n<</SYS>>\n\n{user_input} [/INST]"
     )
 
+EMBED_MODEL_NAME = TEXT_MODEL_NAME
+INDEX_PERSIST_DIR = os.getenv(
+    "INDEX_PERSIST_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "llama_index")
+)
+
+# Anything that changes how nodes are split or embedded invalidates a persisted index
+INDEX_CONFIG = {
+    "embed_model": EMBED_MODEL_NAME,
+    "buffer_size": 2,
+    "breakpoint_percentile_threshold": 95,
+}
+
+class SharedTextEmbedding(BaseEmbedding):
+    """LlamaIndex embedding backed by the registry's text encoder backend.
+
+    Reuses the BGE encoder already loaded for vector search instead of
+    loading a second copy, and defers loading until the first embed call.
+    """
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SharedTextEmbedding"
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return registry.get("text_encoder").encode(texts).tolist()
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._encode([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        # Off the event loop: the encoder runs a blocking forward pass
+        return await asyncio.to_thread(self._get_query_embedding, query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts)
+
 # Advanced Embedding Setup
-try:
-    Settings.embed_model = HuggingFaceEmbedding(
-        model_name="BAAI/bge-small-en-v1.5",
-        embed_batch_size=16,
-    )
-    logger.info("Embedding model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load embedding model: {e}")
-    raise
+Settings.embed_model = SharedTextEmbedding(model_name=EMBED_MODEL_NAME, embed_batch_size=16)
 
 class AdvancedIndexer:
-    def __init__(self, data_dir: str = "sample_data"):
+    def __init__(self, data_dir: str = "sample_data", persist_dir: str = None):
         self.data_dir = data_dir
+        self.persist_dir = persist_dir
         self._ensure_sample_data()
+        # Keep the manifest with the persisted index so the two never disagree
+        self.manifest = Manifest(
+            os.path.join(persist_dir, "manifest.json") if persist_dir
+            else manifest_path_for(f"llama_index_{os.path.basename(os.path.abspath(data_dir))}")
+        )
         try:
             self.llm = Ollama(
                 model="llama3", 
+                base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
                 temperature=0.3, 
                 top_k=50,
                 request_timeout=60.0
             )
             self.node_parser = SemanticSplitterNodeParser(
-                buffer_size=2,
-                breakpoint_percentile_threshold=95,
+                buffer_size=INDEX_CONFIG["buffer_size"],
+                breakpoint_percentile_threshold=INDEX_CONFIG["breakpoint_percentile_threshold"],
                 embed_model=Settings.embed_model
             )
             logger.info("LLM and node parser initialized successfully")
@@ -132,12 +156,36 @@ class AdvancedIndexer:
                 with open(path, "w", encoding="utf-8") as f:
                     f.write(sanitize_text(content.strip()))
 
+    def _source_files(self) -> dict:
+        """Map each document filename in data_dir to its path"""
+        return {
+            name: os.path.join(self.data_dir, name)
+            for name in sorted(os.listdir(self.data_dir))
+            if not name.startswith(".") and os.path.isfile(os.path.join(self.data_dir, name))
+        }
+
+    def _load_documents(self, paths):
+        # filename_as_id gives stable ref_doc_ids so changed files can be replaced in place
+        return SimpleDirectoryReader(
+            input_files=paths,
+            filename_as_id=True,
+            file_metadata=lambda x: {"filename": os.path.basename(x)}
+        ).load_data()
+
+    def _record_documents(self, fresh: dict, documents):
+        """Store manifest entries, including the ref_doc_ids produced per file"""
+        doc_ids = {}
+        for document in documents:
+            doc_ids.setdefault(document.metadata["filename"], []).append(document.doc_id)
+        for name, ids in doc_ids.items():
+            self.manifest.update(name, {**fresh[name], "doc_ids": ids})
+
     def build_index(self):
         try:
-            documents = SimpleDirectoryReader(
-                self.data_dir,
-                file_metadata=lambda x: {"filename": os.path.basename(x)}
-            ).load_data()
+            sources = self._source_files()
+            self.manifest.clear()
+            _, fresh = self.manifest.diff(sources)
+            documents = self._load_documents(list(sources.values()))
             
             if not documents:
                 raise ValueError("No documents found to index")
@@ -150,6 +198,7 @@ class AdvancedIndexer:
                 storage_context=storage_context,
                 show_progress=True
             )
+            self._record_documents(fresh, documents)
             
             logger.info(f"Index built successfully with {len(nodes)} nodes")
             return index
@@ -158,32 +207,313 @@ class AdvancedIndexer:
             logger.error(f"Failed to build index: {e}")
             raise
 
-# Initialize the enhanced indexer and query engine
-try:
-    indexer = AdvancedIndexer()
-    index = indexer.build_index()
-    
-    class ChatQueryEngine:
-        def __init__(self, base_engine):
-            self.base_engine = base_engine
+    def update_index(self, index) -> bool:
+        """Re-embed only added or changed documents and drop removed ones.
+
+        Returns True if the index was modified.
+        """
+        try:
+            sources = self._source_files()
+            diff, fresh = self.manifest.diff(sources)
+            if diff.is_empty:
+                logger.info("Index is up to date with the source documents")
+                return False
+            
+            for name in diff.removed + diff.changed:
+                for doc_id in self.manifest.entries[name].get("doc_ids", []):
+                    index.delete_ref_doc(doc_id, delete_from_docstore=True)
+                self.manifest.remove(name)
             
-        def query(self, user_input):
-            prompt = build_prompt(user_input)
-            return self.base_engine.query(prompt)
-    
-    query_engine = ChatQueryEngine(
-        index.as_query_engine(
-            llm=indexer.llm,
-            similarity_top_k=3,
-            response_mode="compact",
-            node_postprocessors=[
-                MetadataReplacementPostProcessor(target_metadata_key="filename")
-            ]
+            documents = self._load_documents([sources[name] for name in diff.to_embed]) if diff.to_embed else []
+            if documents:
+                index.insert_nodes(self.node_parser.get_nodes_from_documents(documents))
+            self._record_documents(fresh, documents)
+            
+            logger.info(f"Index updated incrementally: {diff.summary()}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to update index: {e}")
+            raise
+
+    def _persisted_config_matches(self) -> bool:
+        config_path = os.path.join(self.persist_dir, "index_config.json")
+        if not os.path.exists(os.path.join(self.persist_dir, "docstore.json")) or not os.path.exists(config_path):
+            return False
+        with open(config_path, encoding="utf-8") as f:
+            return json.load(f) == INDEX_CONFIG
+
+    def _persist(self, index):
+        """Write the index, then its config and manifest, to persist_dir"""
+        index.storage_context.persist(persist_dir=self.persist_dir)
+        with open(os.path.join(self.persist_dir, "index_config.json"), "w", encoding="utf-8") as f:
+            json.dump(INDEX_CONFIG, f)
+        self.manifest.save()
+
+    def load_or_build_index(self):
+        """Load the persisted index, re-embedding only documents that changed.
+
+        Falls back to a full build when nothing is persisted yet or the
+        splitter/embedding configuration differs from the persisted one.
+        Holds an exclusive lock on persist_dir throughout, so of several
+        processes (e.g. gunicorn workers) one builds and persists while
+        the others wait and then load what it wrote.
+        """
+        if not self.persist_dir:
+            return self.build_index()
+        os.makedirs(self.persist_dir, exist_ok=True)
+        with open(os.path.join(self.persist_dir, ".build.lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Re-read under the lock: another process may have just rebuilt the index
+            self.manifest.load()
+            return self._load_or_build_locked()
+
+    def _load_or_build_locked(self):
+        try:
+            if self.manifest.entries and self._persisted_config_matches():
+                storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
+                index = load_index_from_storage(storage_context)
+                logger.info(f"Loaded persisted index from {self.persist_dir}")
+                if self.update_index(index):
+                    self._persist(index)
+                else:
+                    self.manifest.save()
+                return index
+        except Exception as e:
+            logger.warning(f"Could not load persisted index, rebuilding: {e}")
+        
+        index = self.build_index()
+        self._persist(index)
+        return index
+
+class _LeaderAborted(Exception):
+    """The in-flight call being waited on stopped without an answer (e.g. its stream was closed)"""
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used in commentary cache keys"""
+    return " ".join(text.lower().split())
+
+class ChatQueryEngine:
+    """LLM commentary with a response cache and single-flight deduplication.
+
+    Answers are cached per normalized query and retrieved node IDs, so an
+    updated index never serves a stale answer, and concurrent identical
+    requests share one in-flight generation instead of each calling Ollama.
+    """
+
+    def __init__(self, base_engine, streaming_engine=None):
+        self.base_engine = base_engine
+        self.streaming_engine = streaming_engine
+        self.limiter = StageLimiter.from_env("llm", default_concurrency=2, default_timeout=60.0)
+        self.cache = TTLCache(
+            maxsize=int(os.getenv("COMMENTARY_CACHE_SIZE", 512)),
+            ttl=float(os.getenv("COMMENTARY_CACHE_TTL", 3600))
         )
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        
+    def query(self, user_input):
+        prompt = build_prompt(user_input)
+        return self.base_engine.query(prompt)
+
+    async def _retrieve(self, user_input) -> tuple:
+        """Query bundle, retrieved nodes and commentary cache key"""
+        query_bundle = QueryBundle(build_prompt(user_input))
+        nodes = await asyncio.to_thread(self.base_engine.retrieve, query_bundle)
+        key = (normalize_query(user_input), tuple(node.node.node_id for node in nodes))
+        return query_bundle, nodes, key
+
+    async def _shared(self, key: tuple) -> Optional[str]:
+        """Cached answer, or the answer of an identical in-flight call; None when this caller must generate"""
+        while True:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            future = self._inflight.get(key)
+            if future is None:
+                return None
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderAborted:
+                continue  # the caller generating it went away; look again, possibly taking over
+
+    def _lead(self, key: tuple) -> asyncio.Future:
+        # Called right after _shared returned None, with no await in between,
+        # so exactly one caller per key becomes the leader
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def _finish(self, key: tuple, future: asyncio.Future, text: Optional[str] = None, error: Optional[BaseException] = None):
+        self._inflight.pop(key, None)
+        if error is None:
+            self.cache.set(key, text)
+            future.set_result(text)
+            return
+        # Followers retry after a cancelled or closed leader; real failures are shared
+        aborted = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+        future.set_exception(_LeaderAborted() if aborted else error)
+        future.exception()  # mark retrieved: without followers nobody else awaits it
+
+    async def aquery(self, user_input) -> str:
+        """Commentary text bounded by LLM_CONCURRENCY and LLM_TIMEOUT; cached and coalesced per query"""
+        query_bundle, nodes, key = await self._retrieve(user_input)
+        shared = await self._shared(key)
+        if shared is not None:
+            return shared
+        future = self._lead(key)
+        try:
+            text = str(await self.limiter.run(self.base_engine.asynthesize(query_bundle, nodes)))
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, text)
+        return text
+
+    async def astream(self, user_input) -> AsyncIterator[str]:
+        """Yield LLM tokens as they are generated, within the same limits as aquery.
+
+        A cached or coalesced answer is yielded as a single chunk. A
+        generated stream is cached once it completes.
+        """
+        if self.streaming_engine is None:
+            yield await self.aquery(user_input)
+            return
+
+        query_bundle, nodes, key = await self._retrieve(user_input)
+        shared = await self._shared(key)
+        if shared is not None:
+            yield shared
+            return
+        future = self._lead(key)
+        tokens = []
+        try:
+            async for token in self._stream_tokens(query_bundle, nodes):
+                tokens.append(token)
+                yield token
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, "".join(tokens))
+
+    async def _stream_tokens(self, query_bundle, nodes) -> AsyncIterator[str]:
+        """Run the synchronous streaming synthesis in a worker thread that hands
+        tokens to the event loop; closing the generator stops the worker at
+        the next token.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # event loop already closed
+
+        def produce():
+            try:
+                response = self.streaming_engine.synthesize(query_bundle, nodes)
+                for token in response.response_gen:
+                    if stop.is_set():
+                        break
+                    put(token)
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        async with self.limiter.slot():
+            deadline = loop.time() + self.limiter.timeout if self.limiter.timeout else None
+            threading.Thread(target=produce, name="llm-stream", daemon=True).start()
+            try:
+                while True:
+                    remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"LLM stream timed out after {self.limiter.timeout}s")
+                        raise StageTimeoutError(self.limiter.name, self.limiter.timeout)
+                    if item is done:
+                        return
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+
+    def stats(self) -> dict:
+        """Commentary cache counters, in-flight generations and coalesced requests"""
+        return {**self.cache.stats(), "in_flight": len(self._inflight), "coalesced": self.coalesced}
+
+def _build_query_engine() -> ChatQueryEngine:
+    indexer = AdvancedIndexer(persist_dir=INDEX_PERSIST_DIR)
+    index = indexer.load_or_build_index()
+    engine_kwargs = dict(
+        llm=indexer.llm,
+        similarity_top_k=3,
+        response_mode="compact",
+        node_postprocessors=[
+            MetadataReplacementPostProcessor(target_metadata_key="filename")
+        ]
+    )
+    return ChatQueryEngine(
+        index.as_query_engine(**engine_kwargs),
+        index.as_query_engine(streaming=True, **engine_kwargs)
     )
-    
-    logger.info("Enhanced query engine initialized successfully")
-    
-except Exception as e:
-    logger.error(f"Failed to initialize query engine: {e}")
-    query_engine = None
+
+# The query engine is built on first use (or by warm_up_query_engine) rather
+# than at import time, so importing this module is cheap.
+_query_engine = None
+_query_engine_lock = threading.Lock()
+_query_engine_status = {"state": "not_loaded"}
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+def get_query_engine(block: bool = True):
+    """Return the query engine, or None if it failed to initialize.
+
+    With block=False this never builds or waits: until the engine is ready
+    it starts the build in a background thread and returns None, so an
+    async caller can take its degraded path instead of stalling the loop.
+    """
+    global _query_engine, _query_engine_status
+    if _query_engine is not None or _query_engine_status["state"] == "error":
+        return _query_engine
+    if not block:
+        warm_up_query_engine(background=True)
+        return None
+    with _query_engine_lock:
+        if _query_engine is None and _query_engine_status["state"] != "error":
+            _query_engine_status = {"state": "loading"}
+            started = time.perf_counter()
+            try:
+                _query_engine = _build_query_engine()
+                _query_engine_status = {"state": "ready", "load_seconds": round(time.perf_counter() - started, 2)}
+                logger.info("Enhanced query engine initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize query engine: {e}")
+                _query_engine_status = {"state": "error", "error": str(e)}
+        return _query_engine
+
+def warm_up_query_engine(background: bool = True):
+    """Build the query engine now, or in a daemon thread (at most one at a time)"""
+    global _warmup_thread
+    if not background:
+        get_query_engine()
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _warmup_thread = threading.Thread(target=get_query_engine, name="query-engine-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+def query_engine_status() -> dict:
+    return dict(_query_engine_status)
+
+def commentary_stats() -> dict:
+    """Commentary cache and single-flight counters; empty until the query engine is built"""
+    return _query_engine.stats() if _query_engine is not None else {}
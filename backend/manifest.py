@@ -0,0 +1,171 @@
+# /backend/manifest.py
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = os.getenv(
+    "MANIFEST_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "manifests")
+)
+
+
+def manifest_path_for(name: str) -> str:
+    """Default manifest location for a collection or index name"""
+    return os.path.join(MANIFEST_DIR, f"{name}.json")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def payload_hash(payload: Optional[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(payload or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestDiff:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    metadata_changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def to_embed(self) -> List[str]:
+        return self.added + self.changed
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.metadata_changed or self.removed)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "metadata_changed": len(self.metadata_changed),
+            "removed": len(self.removed),
+            "unchanged": len(self.unchanged),
+        }
+
+
+class Manifest:
+    """Content hash and mtime per source file, used to skip unchanged items.
+
+    Files whose size and mtime match the stored entry are not re-hashed, so
+    an unchanged tree is diffed with one ``stat`` per file.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_saved = 0.0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.entries = {}
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("entries", {}) if data.get("version") == self.VERSION else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            self.entries = {}
+
+    def save(self, min_interval: float = 0.0):
+        """Atomically write the manifest; skipped if saved within min_interval seconds"""
+        with self._lock:
+            now = time.monotonic()
+            if min_interval and now - self._last_saved < min_interval:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Unique temp file, so concurrent savers (e.g. two ingest runs) never publish each other's partial writes
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"version": self.VERSION, "entries": self.entries}, f)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._last_saved = now
+
+    def fingerprint(self) -> str:
+        """Stable hash over every entry's content hash"""
+        with self._lock:
+            digest = hashlib.sha256()
+            for key in sorted(self.entries):
+                digest.update(key.encode("utf-8"))
+                digest.update(self.entries[key].get("hash", "").encode("utf-8"))
+                digest.update(self.entries[key].get("payload_hash", "").encode("utf-8"))
+            return digest.hexdigest()
+
+    def diff(
+        self,
+        sources: Dict[str, str],
+        payloads: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Tuple[ManifestDiff, Dict[str, Dict[str, Any]]]:
+        """Compare ``{key: absolute_path}`` against the manifest.
+
+        Returns the diff and the fresh entries for every current source,
+        which the caller commits with ``update`` once the items are stored.
+        """
+        diff = ManifestDiff()
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for key, path in sources.items():
+            stat = os.stat(path)
+            old = self.entries.get(key)
+            entry = {"mtime": stat.st_mtime, "size": stat.st_size}
+            if payloads is not None:
+                entry["payload_hash"] = payload_hash(payloads.get(key))
+
+            if old and old.get("size") == stat.st_size and old.get("mtime") == stat.st_mtime:
+                entry["hash"] = old["hash"]
+            else:
+                entry["hash"] = file_sha256(path)
+            fresh[key] = {**(old or {}), **entry}
+
+            if old is None:
+                diff.added.append(key)
+            elif old.get("hash") != entry["hash"]:
+                diff.changed.append(key)
+            elif payloads is not None and old.get("payload_hash") != entry["payload_hash"]:
+                diff.metadata_changed.append(key)
+            else:
+                diff.unchanged.append(key)
+                if old.get("mtime") != stat.st_mtime:
+                    # Touched but identical content: remember the new mtime
+                    self.update(key, fresh[key])
+
+        diff.removed = [key for key in self.entries if key not in sources]
+        return diff, fresh
+
+    def update(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self.entries[key] = entry
+
+    def remove(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries = {}
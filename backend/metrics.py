@@ -0,0 +1,164 @@
+# /backend/metrics.py
+import os
+import time
+import contextlib
+import contextvars
+from typing import Any, Callable, Dict, List, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from fastapi.responses import JSONResponse
+
+# With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR (an empty directory)
+# so /metrics aggregates the counters and histograms of every worker
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "photo_search_stage_seconds",
+    "Time spent in each request pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "photo_search_request_seconds",
+    "HTTP request latency up to the response headers",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS
+)
+SEARCHES = Counter("photo_search_searches_total", "Similarity searches by type", ["search_type"])
+SEARCH_RESULTS = Histogram(
+    "photo_search_results",
+    "Locations returned per search",
+    ["search_type"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+# Per-request stage durations for the Server-Timing header; set by MetricsMiddleware
+_trace: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("stage_trace", default=None)
+_stage_histograms: Dict[str, Any] = {}
+_collectors: List[Any] = []
+
+
+def observe(stage_name: str, seconds: float):
+    """Record a stage duration in the histogram and the current request's trace"""
+    histogram = _stage_histograms.get(stage_name)
+    if histogram is None:
+        histogram = _stage_histograms.setdefault(stage_name, STAGE_SECONDS.labels(stage_name))
+    histogram.observe(seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage_name] = trace.get(stage_name, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def stage(stage_name: str):
+    """Time a block as one pipeline stage (decode, preprocess, encode, search, llm, serialize)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - started)
+
+
+def record_search(search_type: str, result_count: int):
+    SEARCHES.labels(search_type).inc()
+    SEARCH_RESULTS.labels(search_type).observe(result_count)
+
+
+def server_timing(trace: Dict[str, float]) -> str:
+    """Server-Timing header value; stages can overlap (e.g. concurrent text and image encodes)"""
+    return ", ".join(f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in trace.items())
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its rendering time as the serialize stage"""
+
+    def render(self, content: Any) -> bytes:
+        with stage("serialize"):
+            return super().render(content)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and adds a Server-Timing header built from its stage trace.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so the only per-request cost is
+    a context variable and a few histogram observations.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace: Dict[str, float] = {}
+        token = _trace.set(trace)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                trace["app"] = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(trace).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
+            # Route template rather than the raw path keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(trace.get("app", time.perf_counter() - started))
+
+
+class ServiceCollector:
+    """Gauges read at scrape time (model readiness, queue depth), so requests never pay for them"""
+
+    def __init__(self, service, model_status: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.service = service
+        self.model_status = model_status
+
+    def collect(self):
+        ready = GaugeMetricFamily("photo_search_model_ready", "1 when the model is loaded", labels=["model"])
+        for name, status in self.model_status().items():
+            ready.add_metric([name], 1.0 if status.get("state") == "ready" else 0.0)
+        yield ready
+
+        queue_depth = GaugeMetricFamily(
+            "photo_search_queue_depth", "Requests waiting in an encoder batch queue or for a stage slot", labels=["queue"]
+        )
+        active = GaugeMetricFamily("photo_search_stage_active", "Requests holding a stage slot", labels=["stage"])
+        batching = self.service.batching_stats()
+        for name in ("text", "image"):
+            if batching.get("enabled"):
+                queue_depth.add_metric([f"{name}_batcher"], batching[name]["queue_depth"])
+        for name, stats in self.service.concurrency_stats().items():
+            queue_depth.add_metric([name], stats["waiting"])
+            active.add_metric([name], stats["active"])
+        yield queue_depth
+        yield active
+
+
+def register_collector(collector):
+    """Add a scrape-time collector; in multiprocess mode it reports the worker that serves the scrape"""
+    _collectors.append(collector)
+    if not MULTIPROC_DIR:
+        REGISTRY.register(collector)
+
+
+def render() -> bytes:
+    """Prometheus text exposition for /metrics"""
+    if not MULTIPROC_DIR:
+        return generate_latest(REGISTRY)
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return generate_latest(registry)
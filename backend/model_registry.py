@@ -0,0 +1,178 @@
+# /backend/model_registry.py
+import os
+import gc
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+TEXT_MODEL_NAME = os.getenv("TEXT_MODEL_NAME", "BAAI/bge-small-en-v1.5")
+CLIP_MODEL_NAME = os.getenv("CLIP_MODEL_NAME", "ViT-B-32")
+CLIP_PRETRAINED = os.getenv("CLIP_PRETRAINED", "openai")
+TEXT_ENCODER_BACKEND = os.getenv("TEXT_ENCODER_BACKEND", "torch")
+IMAGE_ENCODER_BACKEND = os.getenv("IMAGE_ENCODER_BACKEND", "torch")
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+
+
+class ModelRegistry:
+    """Process-wide, lazily loaded models shared by every service module.
+
+    Each model is loaded at most once, on first use or by ``warm_up``.
+    ``status`` never blocks, so health checks can report readiness while
+    models are still loading in the background.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._warm: List[str] = []
+        self._device: Optional[str] = None
+
+    def register(self, name: str, loader: Callable[[], Any], warm: bool = True):
+        """Add a model; warm=False keeps it out of warm_up (loaded only on demand)"""
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        self._status[name] = {"state": "not_loaded"}
+        if warm:
+            self._warm.append(name)
+
+    @property
+    def device(self) -> str:
+        if self._device is None:
+            import torch
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+            num_threads = os.getenv("TORCH_NUM_THREADS")
+            if num_threads:
+                torch.set_num_threads(int(num_threads))
+        return self._device
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            self._status[name] = {"state": "loading"}
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = {"state": "error", "error": str(e)}
+                logger.error(f"Failed to load model '{name}': {e}")
+                raise
+            self._models[name] = model
+            self._status[name] = {"state": "ready", "load_seconds": round(time.perf_counter() - started, 2)}
+            logger.info(f"Model '{name}' loaded in {self._status[name]['load_seconds']}s")
+            return model
+
+    def take(self, name: str) -> Any:
+        """Hand a model over to the caller and drop it from the registry.
+
+        For callers that transform the model in place (e.g. quantize it), so
+        the original is not kept cached alongside; a later ``get`` loads it again.
+        """
+        with self._locks[name]:
+            model = self._models.pop(name, None)
+            self._status[name] = {"state": "not_loaded"}
+        return model if model is not None else self._loaders[name]()
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._models
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(status) for name, status in self._status.items()}
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Load models now, or in a daemon thread when background=True"""
+        names = list(names or self._warm)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # already logged and reflected in status()
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def prepare_for_fork(self):
+        """Load every model in the parent so forked workers share the pages.
+
+        ``gc.freeze`` moves the loaded objects out of the collector's view,
+        so the children's GC passes do not touch (and copy) those pages.
+        """
+        self.warm_up(background=False)
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Models preloaded for fork: {list(self._models)}")
+
+
+def _load_text_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(TEXT_MODEL_NAME, device=registry.device)
+
+
+def _load_clip():
+    import open_clip
+    model, _, preprocess = open_clip.create_model_and_transforms(
+        CLIP_MODEL_NAME,
+        pretrained=CLIP_PRETRAINED,
+        device=registry.device
+    )
+    model.eval()
+    return model, preprocess, open_clip.get_tokenizer(CLIP_MODEL_NAME)
+
+
+def _load_clip_preprocess():
+    import open_clip
+    if registry.is_ready("clip"):
+        return registry.get("clip")[1]
+    # Build the eval transform from config so non-torch backends never load the weights
+    model_cfg = open_clip.get_model_config(CLIP_MODEL_NAME)
+    pretrained_cfg = open_clip.get_pretrained_cfg(CLIP_MODEL_NAME, CLIP_PRETRAINED) or {}
+    return open_clip.image_transform(
+        model_cfg["vision_cfg"]["image_size"],
+        is_train=False,
+        mean=pretrained_cfg.get("mean"),
+        std=pretrained_cfg.get("std")
+    )
+
+
+def _load_reranker():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANK_MODEL_NAME, max_length=256, device=registry.device)
+
+
+def _load_text_encoder():
+    from encoders import create_text_backend
+    return create_text_backend(TEXT_ENCODER_BACKEND)
+
+
+def _load_image_encoder():
+    from encoders import create_image_backend
+    return create_image_backend(IMAGE_ENCODER_BACKEND)
+
+
+registry = ModelRegistry()
+# Raw torch models: loaded only when a torch backend, ONNX export or CLIP text needs them
+registry.register("text", _load_text_model, warm=False)
+registry.register("clip", _load_clip, warm=False)
+registry.register("clip_preprocess", _load_clip_preprocess)
+registry.register("text_encoder", _load_text_encoder)
+registry.register("image_encoder", _load_image_encoder)
+# Cross-encoder for re-ranking: preloaded only when re-ranking is on by default
+registry.register("reranker", _load_reranker, warm=RERANK_ENABLED)
@@ -0,0 +1,86 @@
+# /backend/projection.py
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from qdrant_client.models import PayloadSelectorExclude
+
+# Payload fields copied to the top level of every result, with their defaults
+RESULT_FIELDS = {
+    "location": "Unknown",
+    "description": "",
+    "image_path": "",
+    "features": [],
+    "cluster_id": None,
+}
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which payload fields a search fetches from Qdrant and returns per result.
+
+    ``fields`` lists the payload fields to return at the top level of each
+    result (None means RESULT_FIELDS, an empty tuple only ID and score);
+    ``exclude`` drops fields from that set; ``raw_payload`` also returns the
+    fetched payload itself as ``payload``. Hashable, so it is part of the
+    search cache key.
+    """
+
+    fields: Optional[Tuple[str, ...]] = None
+    exclude: Tuple[str, ...] = ()
+    raw_payload: bool = True
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields is None and not self.exclude and self.raw_payload
+
+    def result_fields(self) -> List[str]:
+        names = self.fields if self.fields is not None else RESULT_FIELDS
+        return [name for name in names if name not in self.exclude]
+
+    def with_fields(self, names: Iterable[str]) -> "Projection":
+        """The same projection, also returning ``names`` (e.g. the text a re-ranker reads)"""
+        names = [name for name in names if name not in self.result_fields()]
+        if not names:
+            return self
+        fields = None if self.fields is None else self.fields + tuple(names)
+        return replace(self, fields=fields, exclude=tuple(name for name in self.exclude if name not in names))
+
+    def selector(self, required: Iterable[str] = ()) -> Union[bool, List[str], PayloadSelectorExclude]:
+        """Qdrant with_payload value: only the fields this projection returns, plus ``required``
+        (fields the search itself reads, such as the collapse key)"""
+        required = [name for name in required if name]
+        if self.raw_payload and self.fields is None:
+            exclude = [name for name in self.exclude if name not in required]
+            return PayloadSelectorExclude(exclude=exclude) if exclude else True
+        include = list(dict.fromkeys(self.result_fields() + required))
+        return include if include else False
+
+    def format(self, points) -> List[Dict[str, Any]]:
+        """One result dict per scored point; the payload is referenced, not copied"""
+        names = self.result_fields()
+        results = []
+        for point in points:
+            payload = point.payload or {}
+            result = {"id": point.id, "score": point.score}
+            if self.raw_payload:
+                result["payload"] = payload
+            for name in names:
+                result[name] = payload.get(name, RESULT_FIELDS.get(name))
+            results.append(result)
+        return results
+
+
+FULL_PROJECTION = Projection()
+
+
+def build_projection(
+    fields: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    payload: bool = True
+) -> Projection:
+    """Projection from API parameters; ``fields`` entries may also be comma-separated"""
+    def split(values: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+        if values is None:
+            return None
+        return tuple(dict.fromkeys(name.strip() for value in values for name in value.split(",") if name.strip()))
+
+    return Projection(fields=split(fields), exclude=split(exclude) or (), raw_payload=payload)
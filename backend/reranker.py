@@ -0,0 +1,142 @@
+# /backend/reranker.py
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Reranker:
+    """Cross-encoder re-scoring of search candidates within a per-request time budget.
+
+    Candidates are scored in batches on a small dedicated pool. If the budget
+    runs out (including while the model is still loading), the request gets
+    the vector order instead and the scoring is abandoned at the next batch.
+    """
+
+    def __init__(
+        self,
+        model_getter: Callable[[], Any],
+        text_fn: Callable[[Dict[str, Any]], str],
+        candidates: int = 20,
+        budget_ms: float = 150.0,
+        batch_size: int = 32,
+        workers: int = 2,
+    ):
+        self.model_getter = model_getter
+        self.text_fn = text_fn
+        self.candidates = candidates
+        self.budget = budget_ms / 1000.0
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rerank")
+        self._stats_lock = threading.Lock()
+        self._recent_ms = deque(maxlen=1000)
+        self._requests = 0
+        self._fallbacks = 0
+
+    def candidate_limit(self, limit: int) -> int:
+        """How many vector results to fetch for a request that returns ``limit``"""
+        return max(self.candidates, limit)
+
+    def _score(self, query: str, texts: List[str], deadline: float) -> Optional[List[float]]:
+        model = self.model_getter()
+        scores: List[float] = []
+        for start in range(0, len(texts), self.batch_size):
+            if time.monotonic() >= deadline:
+                return None
+            pairs = [(query, text) for text in texts[start:start + self.batch_size]]
+            scores.extend(float(score) for score in model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False))
+        return scores
+
+    def _submit(self, query: str, results: List[Dict[str, Any]]):
+        # Results without the raw payload carry the text fields at the top level
+        texts = [self.text_fn(result.get("payload") or result) for result in results]
+        return self._executor.submit(self._score, query, texts, time.monotonic() + self.budget)
+
+    def _finish(
+        self,
+        results: List[Dict[str, Any]],
+        scores: Optional[List[float]],
+        limit: int,
+        started: float,
+        timings: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._stats_lock:
+            self._requests += 1
+            self._recent_ms.append(elapsed_ms)
+            if scores is None:
+                self._fallbacks += 1
+        if timings is not None:
+            timings["rerank_ms"] = round(elapsed_ms, 3)
+            timings["rerank_applied"] = scores is not None
+            timings["rerank_candidates"] = len(results)
+        if scores is None:
+            return results[:limit]
+        ranked = sorted(zip(scores, results), key=lambda pair: pair[0], reverse=True)
+        return [{**result, "rerank_score": score} for score, result in ranked[:limit]]
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        limit: int,
+        timings: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Top ``limit`` results by cross-encoder score, or by vector score if over budget"""
+        if len(results) < 2:
+            return results[:limit]
+        started = time.perf_counter()
+        try:
+            scores = self._submit(query, results).result(timeout=self.budget)
+        except FuturesTimeout:
+            scores = None
+        except Exception as e:
+            logger.warning(f"Re-ranking failed, keeping vector order: {e}")
+            scores = None
+        return self._finish(results, scores, limit, started, timings)
+
+    async def arerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        limit: int,
+        timings: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of rerank"""
+        if len(results) < 2:
+            return results[:limit]
+        started = time.perf_counter()
+        try:
+            scores = await asyncio.wait_for(asyncio.wrap_future(self._submit(query, results)), self.budget)
+        except asyncio.TimeoutError:
+            scores = None
+        except Exception as e:
+            logger.warning(f"Re-ranking failed, keeping vector order: {e}")
+            scores = None
+        return self._finish(results, scores, limit, started, timings)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request count, fallback rate and recent latency percentiles"""
+        with self._stats_lock:
+            recent = sorted(self._recent_ms)
+            requests, fallbacks = self._requests, self._fallbacks
+
+        def percentile(values: List[float], pct: float) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(len(values) * pct))], 3)
+
+        return {
+            "candidates": self.candidates,
+            "budget_ms": self.budget * 1000.0,
+            "requests": requests,
+            "fallbacks": fallbacks,
+            "latency_ms_p50": percentile(recent, 0.50),
+            "latency_ms_p95": percentile(recent, 0.95),
+            "latency_ms_p99": percentile(recent, 0.99),
+        }
@@ -0,0 +1,69 @@
+# /backend/sparse.py
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List
+from qdrant_client.models import SparseVector
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or that the this to with "
+    "show me find looking i we want need some any".split()
+)
+
+
+class SparseEncoder:
+    """Hashed BM25 term weights for a Qdrant sparse vector.
+
+    Documents get BM25 term-frequency saturation and length normalisation;
+    the IDF factor is applied by Qdrant (``Modifier.IDF`` on the sparse
+    vector), so stored weights stay valid as the catalogue grows. Adjacent
+    word pairs are indexed as well, so "pendant lighting" ranks documents
+    with the phrase above ones that mention both words apart.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_length: float = 24.0, bigrams: bool = True):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+        self.bigrams = bigrams
+
+    @staticmethod
+    def _normalize(token: str) -> str:
+        # Light plural folding so "countertops" matches "countertop"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            return token[:-1]
+        return token
+
+    def terms(self, text: str) -> List[str]:
+        words = [
+            self._normalize(token)
+            for token in TOKEN_PATTERN.findall((text or "").lower())
+            if token not in STOPWORDS
+        ]
+        if self.bigrams:
+            words += [f"{first} {second}" for first, second in zip(words, words[1:])]
+        return words
+
+    @staticmethod
+    def _term_id(term: str) -> int:
+        return zlib.crc32(term.encode("utf-8")) & 0x7FFFFFFF
+
+    @staticmethod
+    def _to_vector(weights: Dict[int, float]) -> SparseVector:
+        indices = sorted(weights)
+        return SparseVector(indices=indices, values=[weights[index] for index in indices])
+
+    def encode_document(self, text: str) -> SparseVector:
+        """BM25 term weights (without IDF) for stored text"""
+        terms = self.terms(text)
+        length_norm = 1 - self.b + self.b * len(terms) / self.avg_doc_length
+        weights: Dict[int, float] = {}
+        for term, tf in Counter(terms).items():
+            index = self._term_id(term)
+            weights[index] = weights.get(index, 0.0) + tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return self._to_vector(weights)
+
+    def encode_query(self, text: str) -> SparseVector:
+        """One unit weight per distinct query term; Qdrant multiplies in the IDF"""
+        return self._to_vector({self._term_id(term): 1.0 for term in set(self.terms(text))})
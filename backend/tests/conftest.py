@@ -0,0 +1,10 @@
+# /backend/tests/conftest.py
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The backend modules import each other as top-level modules and read
+# logging.conf relative to the working directory, as when run from backend/
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
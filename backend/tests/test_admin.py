@@ -0,0 +1,22 @@
+# /backend/tests/test_admin.py
+import pytest
+
+app = pytest.importorskip("app")
+
+from fastapi import HTTPException
+
+
+def test_admin_endpoints_are_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", None)
+    with pytest.raises(HTTPException) as error:
+        app.require_admin("anything")
+    assert error.value.status_code == 403
+
+
+def test_admin_token_must_match(monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", "secret")
+    for token in (None, "wrong"):
+        with pytest.raises(HTTPException) as error:
+            app.require_admin(token)
+        assert error.value.status_code == 401
+    app.require_admin("secret")
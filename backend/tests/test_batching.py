@@ -0,0 +1,89 @@
+# /backend/tests/test_batching.py
+import asyncio
+import threading
+import pytest
+from batching import MicroBatcher
+
+
+def recording_batcher(**kwargs):
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    return MicroBatcher("test", batch_fn, **kwargs), sizes
+
+
+def test_full_batch_flushes_before_the_deadline():
+    batcher, sizes = recording_batcher(max_batch_size=4, max_wait_ms=10_000)
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [future.result(timeout=2) for future in futures] == [0, 2, 4, 6]
+    assert sizes == [4]
+    batcher.close()
+
+
+def test_partial_batch_flushes_after_max_wait():
+    batcher, sizes = recording_batcher(max_batch_size=32, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in range(3)]
+    assert [future.result(timeout=2) for future in futures] == [0, 2, 4]
+    assert sizes == [3]
+    batcher.close()
+
+
+def test_batches_never_exceed_max_batch_size():
+    batcher, sizes = recording_batcher(max_batch_size=3, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(7)]
+    assert [future.result(timeout=2) for future in futures] == [i * 2 for i in range(7)]
+    assert sizes == [3, 3, 1]
+    stats = batcher.stats()
+    assert stats["batches"] == 3
+    assert stats["items"] == 7
+    assert stats["largest_batch"] == 3
+    batcher.close()
+
+
+def test_batch_errors_reach_every_caller():
+    def batch_fn(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher("test", batch_fn, max_wait_ms=1)
+    futures = [batcher.submit(i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failed"):
+            future.result(timeout=2)
+    batcher.close()
+
+
+def test_result_count_mismatch_is_an_error():
+    batcher = MicroBatcher("test", lambda items: items[:-1], max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="returned 0 results for 1 inputs"):
+        batcher(1, timeout=2)
+    batcher.close()
+
+
+def test_blocking_call_works_from_threads():
+    batcher, _ = recording_batcher(max_wait_ms=1)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(batcher(i, timeout=2))) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [0, 2, 4, 6, 8]
+    batcher.close()
+
+
+def test_blocking_call_is_refused_on_the_event_loop():
+    batcher, _ = recording_batcher(max_wait_ms=1)
+
+    async def call_blocking():
+        return batcher(1)
+
+    async def call_async():
+        return await asyncio.wrap_future(batcher.submit(1))
+
+    with pytest.raises(RuntimeError, match="event loop"):
+        asyncio.run(call_blocking())
+    assert asyncio.run(call_async()) == 2
+    batcher.close()
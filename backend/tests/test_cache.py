@@ -0,0 +1,65 @@
+# /backend/tests/test_cache.py
+import cache
+from cache import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = TTLCache(maxsize=10, ttl=5)
+    ttl_cache.set("key", "value")
+    now[0] += 4.9
+    assert ttl_cache.get("key") == "value"
+    now[0] += 0.1
+    assert ttl_cache.get("key", "missing") == "missing"
+    assert len(ttl_cache) == 0
+    assert (ttl_cache.hits, ttl_cache.misses) == (1, 1)
+
+
+def test_zero_ttl_never_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = TTLCache(maxsize=10, ttl=0)
+    ttl_cache.set("key", "value")
+    now[0] += 10 ** 9
+    assert ttl_cache.get("key") == "value"
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = TTLCache(maxsize=2, ttl=None)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.get("a") == 1  # "b" is now the least recently used
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+    assert ttl_cache.evictions == 1
+
+
+def test_overwrite_refreshes_recency():
+    ttl_cache = TTLCache(maxsize=2, ttl=None)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.set("a", 10)
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("a") == 10
+    assert ttl_cache.get("b") is None
+
+
+def test_disabled_cache_stores_nothing():
+    ttl_cache = TTLCache(maxsize=0)
+    ttl_cache.set("a", 1)
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.stats()["size"] == 0
+
+
+def test_stats_hit_rate():
+    ttl_cache = TTLCache(maxsize=4)
+    ttl_cache.set("a", 1)
+    ttl_cache.get("a")
+    ttl_cache.get("b")
+    stats = ttl_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
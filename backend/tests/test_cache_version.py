@@ -0,0 +1,55 @@
+# /backend/tests/test_cache_version.py
+import pytest
+
+pytest.importorskip("qdrant_client")
+pytest.importorskip("torch")
+
+import vector_service as module
+
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """Two service instances on one embedded store, standing in for two processes"""
+    monkeypatch.setenv("QDRANT_MODE", "embedded")
+    monkeypatch.setenv("QDRANT_PATH", str(tmp_path / "writer"))
+    writer = module.VectorSearchService()
+    monkeypatch.setenv("QDRANT_PATH", str(tmp_path / "reader"))
+    reader = module.VectorSearchService()
+    reader.client = writer.client
+    return writer, reader
+
+
+def test_write_in_one_process_invalidates_the_others(services):
+    writer, reader = services
+    reader._refresh_cache_version()
+    assert reader.cache_version() is None
+    key = reader._search_cache_key([0.1, 0.2], "params")
+    reader.search_cache.set(key, ["stale"])
+
+    writer.notify_collection_updated()
+    reader._refresh_cache_version()
+    assert reader.cache_version() == writer.cache_version() is not None
+    assert reader._search_cache_key([0.1, 0.2], "params") != key
+    assert len(reader.search_cache) == 0
+
+
+def test_every_write_publishes_a_new_version(services):
+    writer, _ = services
+    writer.bump_cache_version()
+    first = writer.cache_version()
+    writer.bump_cache_version()
+    assert writer.cache_version() != first
+
+
+def test_unreadable_version_keeps_the_last_one(services, monkeypatch):
+    writer, reader = services
+    writer.bump_cache_version()
+    reader._refresh_cache_version()
+    known = reader.cache_version()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("qdrant down")
+
+    monkeypatch.setattr(reader.client, "retrieve", fail)
+    reader._refresh_cache_version()
+    assert reader.cache_version() == known
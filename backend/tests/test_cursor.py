@@ -0,0 +1,38 @@
+# /backend/tests/test_cursor.py
+import pytest
+
+app = pytest.importorskip("app")
+
+from starlette.requests import Request
+
+
+def make_request(query_string: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/locations/search", "query_string": query_string.encode()})
+
+
+def test_cursor_round_trip():
+    cursor = app.encode_cursor(40, "abc")
+    assert app.decode_cursor(cursor, "abc") == 40
+
+
+def test_cursor_from_another_search_is_rejected():
+    cursor = app.encode_cursor(40, "abc")
+    with pytest.raises(ValueError, match="different parameters"):
+        app.decode_cursor(cursor, "xyz")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24=", app.base64.urlsafe_b64encode(b'{"query": "abc"}').decode()])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        app.decode_cursor(cursor, "abc")
+
+
+def test_signature_ignores_page_parameters():
+    first = make_request("q=loft&score_threshold=0.5&limit=10")
+    later = make_request("score_threshold=0.5&q=loft&limit=20&cursor=x&fields=location&payload=false")
+    assert app.search_signature(first) == app.search_signature(later)
+
+
+def test_signature_changes_with_the_query():
+    assert app.search_signature(make_request("q=loft")) != app.search_signature(make_request("q=barn"))
+    assert app.search_signature(make_request("q=loft")) != app.search_signature(make_request("q=loft&rerank=true"))
@@ -0,0 +1,64 @@
+# /backend/tests/test_dedup.py
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.models import DeletePayloadOperation, SetPayloadOperation
+from dedup import CLUSTER_FIELDS, DedupJob, UnionFind
+
+
+def test_union_find_merges_transitively():
+    clusters = UnionFind()
+    for item in "abcde":
+        clusters.add(item)
+    assert clusters.union("a", "b")
+    assert clusters.union("b", "c")
+    assert not clusters.union("a", "c")  # already connected
+    groups = sorted(sorted(members) for members in clusters.groups().values())
+    assert groups == [["a", "b", "c"], ["d"], ["e"]]
+    assert clusters.size[clusters.find("a")] == 3
+
+
+def test_union_find_add_is_idempotent():
+    clusters = UnionFind()
+    clusters.add("a")
+    clusters.add("b")
+    clusters.union("a", "b")
+    clusters.add("b")
+    assert clusters.find("a") == clusters.find("b")
+
+
+def test_planned_updates_only_touch_changed_points():
+    clusters = UnionFind()
+    for item in ("p1", "p2", "p3", "stale", "unique"):
+        clusters.add(item)
+    clusters.union("p2", "p1")
+    clusters.union("p1", "p3")
+    current = {
+        "p1": {"cluster_id": "p1", "cluster_size": 3},  # already up to date
+        "p2": {"cluster_id": "p2", "cluster_size": 2},
+        "p3": {},
+        "stale": {"cluster_id": "old", "cluster_size": 2},
+        "unique": {},
+    }
+    operations, duplicate_clusters, clustered = DedupJob()._planned_updates(clusters, current)
+    assert (duplicate_clusters, clustered) == (1, 3)
+
+    sets = [op.set_payload for op in operations if isinstance(op, SetPayloadOperation)]
+    deletes = [op.delete_payload for op in operations if isinstance(op, DeletePayloadOperation)]
+    assert len(sets) == 1
+    assert sets[0].payload == {"cluster_id": "p1", "cluster_size": 3}
+    assert sorted(sets[0].points) == ["p2", "p3"]
+    assert len(deletes) == 1
+    assert deletes[0].points == ["stale"]
+    assert deletes[0].keys == CLUSTER_FIELDS
+
+
+def test_planned_updates_are_empty_when_nothing_changed():
+    clusters = UnionFind()
+    clusters.add("a")
+    clusters.add("b")
+    clusters.union("a", "b")
+    current = {point_id: {"cluster_id": "a", "cluster_size": 2} for point_id in ("a", "b")}
+    operations, _, _ = DedupJob()._planned_updates(clusters, current)
+    assert operations == []
@@ -0,0 +1,73 @@
+# /backend/tests/test_filters.py
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.models import MatchAny, MatchText, MatchValue
+from filters import GEO_FIELD, NUMERIC_FIELDS, build_filter, filter_cache_key, normalize_payload
+
+
+def test_no_conditions_means_no_filter():
+    assert build_filter() is None
+    assert build_filter(None, {}) is None
+
+
+def test_location_and_features():
+    search_filter = build_filter("Studio A", {
+        "location": ["Loft", "Barn"],
+        "features_any": ["pool", "garden"],
+        "features_all": ["parking", "stairs"],
+        "text": "brick wall",
+    })
+    matches = [(condition.key, condition.match) for condition in search_filter.must]
+    assert matches == [
+        ("location", MatchValue(value="Studio A")),
+        ("location", MatchAny(any=["Loft", "Barn"])),
+        ("features", MatchAny(any=["pool", "garden"])),
+        ("features", MatchValue(value="parking")),
+        ("features", MatchValue(value="stairs")),
+        ("description", MatchText(text="brick wall")),
+    ]
+
+
+def test_geo_and_range_conditions():
+    field = NUMERIC_FIELDS[0]
+    search_filter = build_filter(filters={
+        "geo": {"lat": "51.5", "lon": -0.12, "radius_m": 500},
+        "ranges": {field: {"gte": "3", "lt": 5}},
+    })
+    geo, numeric = search_filter.must
+    assert geo.key == GEO_FIELD
+    assert (geo.geo_radius.center.lat, geo.geo_radius.radius) == (51.5, 500.0)
+    assert numeric.key == field
+    assert (numeric.range.gte, numeric.range.lt) == (3.0, 5.0)
+
+
+@pytest.mark.parametrize("filters", [
+    {"colour": "red"},
+    {"geo": {"lat": 1, "lon": 2}},
+    {"ranges": {"unknown_field": {"gte": 1}}},
+    {"ranges": {NUMERIC_FIELDS[0]: {"between": 1}}},
+    {"ranges": {NUMERIC_FIELDS[0]: {}}},
+    {"ranges": {NUMERIC_FIELDS[0]: 5}},
+    {"ranges": {NUMERIC_FIELDS[0]: {"gt": "abc"}}},
+    {"ranges": {NUMERIC_FIELDS[0]: {"gte": None}}},
+    {"ranges": [NUMERIC_FIELDS[0]]},
+])
+def test_invalid_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        build_filter(filters=filters)
+
+
+def test_cache_key_ignores_key_order():
+    assert filter_cache_key({"a": 1, "b": [1, 2]}) == filter_cache_key({"b": [1, 2], "a": 1})
+    assert filter_cache_key({"a": 1}) != filter_cache_key({"a": 2})
+    assert filter_cache_key(None) is None
+    assert filter_cache_key({}) is None
+
+
+def test_normalize_payload_builds_geo_point_and_numbers():
+    field = NUMERIC_FIELDS[0]
+    payload = normalize_payload({"latitude": "51.5", "lng": "-0.1", field: "3.5"})
+    assert payload == {GEO_FIELD: {"lat": 51.5, "lon": -0.1}, field: 3.5}
+    assert normalize_payload({field: "tall"})[field] == "tall"
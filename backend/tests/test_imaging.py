@@ -0,0 +1,60 @@
+# /backend/tests/test_imaging.py
+import io
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("PIL")
+open_clip = pytest.importorskip("open_clip")
+
+from PIL import Image
+from imaging import ImagePreprocessor
+
+MEAN = (0.48145466, 0.4578275, 0.40821073)
+STD = (0.26862954, 0.26130258, 0.27577711)
+
+
+@pytest.fixture(scope="module")
+def transform():
+    return open_clip.image_transform(224, is_train=False, mean=MEAN, std=STD)
+
+
+def encoded(size, fmt):
+    pixels = np.random.default_rng(0).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_from_transform_reads_size_and_normalization(transform):
+    preprocessor = ImagePreprocessor.from_transform(transform)
+    assert preprocessor.image_size == 224
+    assert torch.allclose(preprocessor.mean.flatten(), torch.tensor(MEAN))
+    assert ImagePreprocessor.from_transform(object()) is None
+
+
+@pytest.mark.parametrize("size", [(640, 480), (300, 517), (224, 224), (100, 80)])
+def test_matches_clip_preprocess(transform, size):
+    data = encoded(size, "PNG")  # PNG: no reduced-size decode, so both see the same pixels
+    preprocessor = ImagePreprocessor.from_transform(transform)
+    expected = transform(Image.open(io.BytesIO(data))).unsqueeze(0)
+    actual = preprocessor.to_tensor([preprocessor.resize_crop(preprocessor.decode(data))])
+    assert actual.shape == expected.shape == (1, 3, 224, 224)
+    assert torch.allclose(actual, expected, atol=1e-5)
+
+
+def test_reduced_size_decode_still_covers_the_input(transform):
+    preprocessor = ImagePreprocessor.from_transform(transform)
+    image = preprocessor.decode(encoded((2400, 1800), "JPEG"))
+    assert min(image.size) >= 224
+    assert image.size[0] < 2400
+    assert preprocessor.resize_crop(image).shape == (224, 224, 3)
+
+
+def test_exif_orientation_is_applied(transform):
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees
+    Image.new("RGB", (400, 200)).save(buffer, format="JPEG", exif=exif)
+    image = ImagePreprocessor.from_transform(transform).decode(buffer.getvalue())
+    assert image.size[0] < image.size[1]
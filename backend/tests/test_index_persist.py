@@ -0,0 +1,52 @@
+# /backend/tests/test_index_persist.py
+import threading
+import time
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+import llama_index_service as service
+from manifest import Manifest
+
+
+def indexer(persist_dir):
+    # Skip __init__, which connects the LLM and node parser
+    instance = service.AdvancedIndexer.__new__(service.AdvancedIndexer)
+    instance.persist_dir = str(persist_dir)
+    instance.manifest = Manifest(str(persist_dir / "manifest.json"))
+    return instance
+
+
+@pytest.mark.skipif(service.fcntl is None, reason="needs fcntl")
+def test_only_one_process_builds_at_a_time(tmp_path, monkeypatch):
+    active, overlaps, builds = [], [], []
+
+    def load_or_build(self):
+        active.append(self)
+        overlaps.append(len(active))
+        time.sleep(0.05)
+        builds.append(self)
+        active.remove(self)
+        return "index"
+
+    monkeypatch.setattr(service.AdvancedIndexer, "_load_or_build_locked", load_or_build)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(indexer(tmp_path).load_or_build_index()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert results == ["index"] * 4
+    assert len(builds) == 4
+    assert max(overlaps) == 1
+
+
+def test_manifest_is_reread_under_the_lock(tmp_path, monkeypatch):
+    first, second = indexer(tmp_path), indexer(tmp_path)
+    first.manifest.update("doc.txt", {"hash": "abc"})
+    first.manifest.save()
+    monkeypatch.setattr(service.AdvancedIndexer, "_load_or_build_locked", lambda self: dict(self.manifest.entries))
+    assert second.load_or_build_index() == {"doc.txt": {"hash": "abc"}}
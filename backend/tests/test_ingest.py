@@ -0,0 +1,84 @@
+# /backend/tests/test_ingest.py
+import json
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from ingest import IngestionPipeline, point_id_for
+from manifest import Manifest
+
+
+class FakeService:
+    def __init__(self):
+        self.deleted = []
+
+    def ensure_collection(self):
+        pass
+
+    def delete_points(self, point_ids):
+        self.deleted.extend(point_ids)
+
+    def get_payloads(self, point_ids, fields):
+        return {}
+
+    def overwrite_payload(self, point_id, payload):
+        pass
+
+    def notify_collection_updated(self):
+        pass
+
+
+def pipeline(tmp_path, service, monkeypatch):
+    embedded = []
+
+    def embed_and_upsert(self, items, on_upserted):
+        embedded.extend(item.relative_path for item in items)
+        on_upserted([item.relative_path for item in items])
+        return {"total": len(items), "embedded": len(items), "upserted": len(items), "skipped": 0}
+
+    monkeypatch.setattr(IngestionPipeline, "_embed_and_upsert", embed_and_upsert)
+    instance = IngestionPipeline(
+        service, str(tmp_path / "photos"), manifest_path=str(tmp_path / "manifest.json")
+    )
+    return instance, embedded
+
+
+@pytest.fixture
+def photos(tmp_path):
+    directory = tmp_path / "photos" / "loft"
+    directory.mkdir(parents=True)
+    for name in ("a.jpg", "b.jpg"):
+        (directory / name).write_bytes(name.encode())
+    return directory
+
+
+def test_sync_embeds_only_new_photos(tmp_path, photos, monkeypatch):
+    instance, embedded = pipeline(tmp_path, FakeService(), monkeypatch)
+    instance.sync()
+    assert sorted(embedded) == ["loft/a.jpg", "loft/b.jpg"]
+    embedded.clear()
+    assert instance.sync()["total"] == 0
+    assert embedded == []
+
+
+def test_full_sync_re_embeds_and_still_deletes_removed_photos(tmp_path, photos, monkeypatch):
+    service = FakeService()
+    instance, embedded = pipeline(tmp_path, service, monkeypatch)
+    instance.sync()
+    (photos / "b.jpg").unlink()
+    embedded.clear()
+
+    stats = instance.sync(full=True)
+    assert embedded == ["loft/a.jpg"]
+    assert service.deleted == [point_id_for("loft/b.jpg")]
+    assert stats["removed"] == 1
+    assert list(Manifest(str(tmp_path / "manifest.json")).entries) == ["loft/a.jpg"]
+
+
+def test_manifest_save_leaves_no_temp_files(tmp_path):
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    manifest.update("a.jpg", {"hash": "abc"})
+    manifest.save()
+    manifest.save()
+    assert [path.name for path in tmp_path.iterdir()] == ["manifest.json"]
+    assert json.loads((tmp_path / "manifest.json").read_text())["entries"] == {"a.jpg": {"hash": "abc"}}
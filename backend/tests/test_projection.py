@@ -0,0 +1,58 @@
+# /backend/tests/test_projection.py
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from qdrant_client.models import PayloadSelectorExclude
+from projection import FULL_PROJECTION, RESULT_FIELDS, Projection, build_projection
+
+
+def point(point_id, score, payload):
+    return SimpleNamespace(id=point_id, score=score, payload=payload)
+
+
+def test_full_projection_fetches_the_whole_payload():
+    assert FULL_PROJECTION.is_full
+    assert FULL_PROJECTION.selector() is True
+    assert FULL_PROJECTION.result_fields() == list(RESULT_FIELDS)
+
+
+def test_excluded_fields_are_not_fetched_unless_required():
+    projection = Projection(exclude=("description", "cluster_id"))
+    selector = projection.selector(required=["cluster_id"])
+    assert isinstance(selector, PayloadSelectorExclude)
+    assert selector.exclude == ["description"]
+
+
+def test_field_list_fetches_only_those_fields():
+    projection = Projection(fields=("location",), raw_payload=False)
+    assert projection.selector() == ["location"]
+    assert projection.selector(required=["cluster_id", None]) == ["location", "cluster_id"]
+    assert Projection(fields=(), raw_payload=False).selector() is False
+
+
+def test_format_fills_defaults_and_respects_raw_payload():
+    projection = Projection(fields=("location", "features"), raw_payload=False)
+    results = projection.format([point("a", 0.9, {"location": "Loft"}), point("b", 0.8, None)])
+    assert results == [
+        {"id": "a", "score": 0.9, "location": "Loft", "features": []},
+        {"id": "b", "score": 0.8, "location": "Unknown", "features": []},
+    ]
+    payload = {"location": "Loft", "extra": 1}
+    assert FULL_PROJECTION.format([point("a", 0.9, payload)])[0]["payload"] is payload
+
+
+def test_with_fields_adds_missing_fields_only():
+    projection = Projection(fields=("location",), exclude=("description",))
+    widened = projection.with_fields(["description", "location"])
+    assert widened.fields == ("location", "description")
+    assert widened.exclude == ()
+    assert FULL_PROJECTION.with_fields(["description"]) is FULL_PROJECTION
+
+
+def test_build_projection_splits_comma_separated_fields():
+    projection = build_projection(["location, features", "location"], ["cluster_id"], payload=False)
+    assert projection == Projection(fields=("location", "features"), exclude=("cluster_id",), raw_payload=False)
+    assert build_projection() == FULL_PROJECTION
+    assert build_projection([""]).fields == ()
@@ -0,0 +1,43 @@
+# /backend/tests/test_query_engine.py
+import threading
+import pytest
+
+pytest.importorskip("llama_index.core")
+
+import llama_index_service as service
+
+
+@pytest.fixture
+def fresh_engine(monkeypatch):
+    monkeypatch.setattr(service, "_query_engine", None)
+    monkeypatch.setattr(service, "_query_engine_status", {"state": "not_loaded"})
+    monkeypatch.setattr(service, "_warmup_thread", None)
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(threading.current_thread().name)
+        release.wait(timeout=5)
+        return "engine"
+
+    monkeypatch.setattr(service, "_build_query_engine", build)
+    return release, builds
+
+
+def test_non_blocking_get_builds_in_the_background(fresh_engine):
+    release, builds = fresh_engine
+    assert service.get_query_engine(block=False) is None
+    assert service.get_query_engine(block=False) is None  # no second build while one is running
+    thread = service._warmup_thread
+    release.set()
+    thread.join(timeout=5)
+    assert builds == ["query-engine-warmup"]
+    assert service.get_query_engine(block=False) == "engine"
+    assert service.query_engine_status()["state"] == "ready"
+
+
+def test_blocking_get_builds_inline(fresh_engine):
+    release, builds = fresh_engine
+    release.set()
+    assert service.get_query_engine() == "engine"
+    assert builds == [threading.current_thread().name]
@@ -0,0 +1,36 @@
+# /backend/tests/test_recommend.py
+import asyncio
+import uuid
+import pytest
+
+app = pytest.importorskip("app")
+
+from fastapi import HTTPException
+
+
+def test_malformed_point_id_is_a_client_error(monkeypatch):
+    calls = []
+
+    async def arecommend_locations(*args, **kwargs):
+        calls.append(args)
+        return []
+
+    monkeypatch.setattr(app.vector_service, "arecommend_locations", arecommend_locations)
+    for positive, negative in ((["not-a-uuid"], []), ([str(uuid.uuid4())], ["42"])):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(app.recommend(positive, negative))
+        assert error.value.status_code == 400
+    assert calls == []
+
+
+def test_point_ids_are_normalized(monkeypatch):
+    point_id = uuid.uuid4()
+    seen = []
+
+    async def arecommend_locations(positive, negative, **kwargs):
+        seen.append((positive, negative))
+        return []
+
+    monkeypatch.setattr(app.vector_service, "arecommend_locations", arecommend_locations)
+    asyncio.run(app.recommend([str(point_id).upper()], []))
+    assert seen == [([str(point_id)], [])]
@@ -0,0 +1,49 @@
+# /backend/tests/test_sparse.py
+import zlib
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from sparse import SparseEncoder
+
+
+def test_terms_drop_stopwords_fold_plurals_and_add_bigrams():
+    encoder = SparseEncoder()
+    assert encoder.terms("Show me the kitchen countertops") == ["kitchen", "countertop", "kitchen countertop"]
+    assert encoder.terms("glass class") == ["glass", "class", "glass class"]
+    assert SparseEncoder(bigrams=False).terms("pendant lighting") == ["pendant", "lighting"]
+    assert encoder.terms(None) == []
+
+
+def test_tokens_keep_inner_apostrophes_and_hyphens():
+    assert SparseEncoder(bigrams=False).terms("Mid-century rock'n'roll room") == ["mid-century", "rock'n'roll", "room"]
+
+
+def test_term_ids_are_stable_non_negative_hashes():
+    term_id = SparseEncoder._term_id("kitchen")
+    assert term_id == zlib.crc32(b"kitchen") & 0x7FFFFFFF
+    assert 0 <= term_id < 2 ** 31
+
+
+def test_query_has_one_unit_weight_per_distinct_term():
+    vector = SparseEncoder(bigrams=False).encode_query("loft loft kitchen")
+    assert vector.indices == sorted(vector.indices)
+    assert len(vector.indices) == 2
+    assert vector.values == [1.0, 1.0]
+
+
+def test_document_weights_saturate_with_term_frequency():
+    encoder = SparseEncoder(bigrams=False)
+    loft = encoder._term_id("loft")
+    once = encoder.encode_document("loft kitchen garden")
+    thrice = encoder.encode_document("loft loft loft")
+    weight = lambda vector: vector.values[vector.indices.index(loft)]
+    assert weight(once) < weight(thrice) < encoder.k1 + 1
+
+
+def test_longer_documents_weigh_terms_less():
+    encoder = SparseEncoder(bigrams=False)
+    loft = encoder._term_id("loft")
+    short = encoder.encode_document("loft")
+    long = encoder.encode_document("loft " + " ".join(f"word{i}" for i in range(50)))
+    assert long.values[long.indices.index(loft)] < short.values[short.indices.index(loft)]
@@ -0,0 +1,78 @@
+# /backend/tests/test_thumbnails.py
+import os
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image
+from thumbnails import THUMBNAIL_SIZES, ThumbnailCache
+
+
+def cached_file(cache_dir, name, size, mtime):
+    path = os.path.join(cache_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_evict_removes_least_recently_served_down_to_low_water(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1000, low_water=0.5)
+    paths = [cached_file(str(tmp_path), f"{i}.jpg", 300, 1_000_000 + i) for i in range(5)]
+    cache.evict()
+    assert [os.path.exists(path) for path in paths] == [False, False, False, False, True]
+    assert cache.stats()["bytes"] == 300
+    assert cache.evictions == 4
+
+
+def test_evict_keeps_everything_under_the_watermark(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1000, low_water=0.9)
+    paths = [cached_file(str(tmp_path), f"{i}.jpg", 300, 1_000_000 + i) for i in range(3)]
+    cache.evict()
+    assert all(os.path.exists(path) for path in paths)
+    assert cache.evictions == 0
+
+
+def test_adding_past_max_bytes_triggers_eviction(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1000, low_water=0.5)
+    cached_file(str(tmp_path), "old.jpg", 600, 1_000_000)
+    cache._add_bytes(0)  # first call scans the directory
+    assert cache.stats()["bytes"] == 600
+    newest = cached_file(str(tmp_path), "new.jpg", 450, 2_000_000)
+    cache._add_bytes(450)
+    assert not os.path.exists(os.path.join(str(tmp_path), "old.jpg"))
+    assert os.path.exists(newest)
+    assert cache.stats()["bytes"] == 450
+
+
+def test_render_once_then_serve_from_cache(tmp_path):
+    source = str(tmp_path / "photo.png")
+    Image.new("RGB", (1000, 500), "red").save(source)
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=10 ** 8)
+    first = cache.get(source, "small", "jpeg")
+    second = cache.get(source, "small", "jpeg")
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert first.etag == second.etag == cache.etag(source, "small", "jpeg")
+    with Image.open(first.path) as thumbnail:
+        assert max(thumbnail.size) == THUMBNAIL_SIZES["small"]
+    with pytest.raises(ValueError):
+        cache.get(source, "huge", "jpeg")
+
+
+def test_changed_source_gets_a_new_etag(tmp_path):
+    source = str(tmp_path / "photo.png")
+    Image.new("RGB", (200, 100), "red").save(source)
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=10 ** 8)
+    before = cache.etag(source, "small", "webp")
+    Image.new("RGB", (200, 100), "blue").save(source)
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 1_000_000_000))
+    assert cache.etag(source, "small", "webp") != before
+
+
+def test_thumbnail_url_only_when_images_are_served(monkeypatch):
+    app = pytest.importorskip("app")
+    monkeypatch.setattr(app, "IMAGE_ROOT", None)
+    assert app.thumbnail_url("a", "loft/a.jpg") is None
+    monkeypatch.setattr(app, "IMAGE_ROOT", "/photos")
+    assert app.thumbnail_url("a", "") is None
+    assert app.thumbnail_url("a", "loft/a.jpg") == "/images/a?size=small"
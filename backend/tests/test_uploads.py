@@ -0,0 +1,46 @@
+# /backend/tests/test_uploads.py
+import asyncio
+import io
+import pytest
+
+app = pytest.importorskip("app")
+
+from fastapi import HTTPException, UploadFile
+
+
+def upload(data: bytes, name: str = "photo.jpg") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=name)
+
+
+def read(files):
+    return asyncio.run(app.read_images(files))
+
+
+def test_reads_every_upload_in_order_and_drops_empty_ones():
+    assert read([upload(b"first"), upload(b""), upload(b"second")]) == [b"first", b"second"]
+    assert read(None) == []
+
+
+def test_per_image_limit(monkeypatch):
+    monkeypatch.setattr(app, "MAX_IMAGE_BYTES", 10)
+    with pytest.raises(HTTPException) as error:
+        read([upload(b"small"), upload(b"x" * 11, "big.jpg")])
+    assert error.value.status_code == 413
+    assert "big.jpg" in error.value.detail
+
+
+def test_total_limit_across_concurrent_reads(monkeypatch):
+    monkeypatch.setattr(app, "MAX_IMAGE_BYTES", 10)
+    monkeypatch.setattr(app, "MAX_CHAT_IMAGE_BYTES", 15)
+    assert read([upload(b"x" * 8), upload(b"y" * 7)]) == [b"x" * 8, b"y" * 7]
+    with pytest.raises(HTTPException) as error:
+        read([upload(b"x" * 8), upload(b"y" * 8)])
+    assert error.value.status_code == 413
+    assert "in total" in error.value.detail
+
+
+def test_image_count_limit(monkeypatch):
+    monkeypatch.setattr(app, "MAX_CHAT_IMAGES", 2)
+    with pytest.raises(HTTPException) as error:
+        read([upload(b"a"), upload(b"b"), upload(b"c")])
+    assert error.value.status_code == 413
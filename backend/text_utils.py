@@ -0,0 +1,33 @@
+# /backend/text_utils.py
+import re
+
+# Enhanced Emoji Filter Pattern
+EMOJI_PATTERN = re.compile(
+    "["
+    u"\U0001F600-\U0001F64F"  # emoticons
+    u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+    u"\U0001F680-\U0001F6FF"  # transport & map symbols
+    u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    u"\U00002500-\U00002BEF"  # chinese symbols
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    u"\U0001f926-\U0001f937"
+    u"\U00010000-\U0010ffff"
+    u"\u2640-\u2642"
+    u"\u2600-\u2B55"
+    u"\u200d"
+    u"\u23cf"
+    u"\u23e9"
+    u"\u231a"
+    u"\ufe0f"
+    u"\u3030"
+    "]+", flags=re.UNICODE
+)
+
+def sanitize_text(text: str) -> str:
+    """Remove emojis and normalize text for processing"""
+    if not text:
+        return ""
+    cleaned = EMOJI_PATTERN.sub('', text)
+    cleaned = ' '.join(cleaned.split())
+    return cleaned.strip()
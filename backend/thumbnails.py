@@ -0,0 +1,203 @@
+# /backend/thumbnails.py
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image, ImageOps
+from manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels for each named size
+THUMBNAIL_SIZES = {"small": 160, "medium": 320, "large": 640}
+# Format name -> (Pillow format, media type, file extension)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+
+@dataclass
+class Thumbnail:
+    path: str
+    media_type: str
+    etag: str
+    relative_path: str  # inside the cache directory, for X-Accel-Redirect
+
+
+class ThumbnailCache:
+    """Resized copies of location photos in a content-addressed, size-bounded directory.
+
+    Files are named after the SHA-256 of the source photo plus size and
+    format, so a changed photo gets a new name (and ETag) and stale
+    thumbnails simply age out. Source hashes are remembered per
+    (path, size, mtime), so a cached hit costs one ``stat``. When the
+    directory grows past ``max_bytes`` the least recently served files are
+    deleted until it is back under ``low_water`` of the limit.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, quality: int = 80, low_water: float = 0.9):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.low_water = low_water
+        self._source_hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._render_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def source_hash(self, source_path: str) -> str:
+        """Content hash of a source photo, recomputed only when its size or mtime changes"""
+        stat = os.stat(source_path)
+        known = self._source_hashes.get(source_path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = file_sha256(source_path)
+        with self._lock:
+            self._source_hashes[source_path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def _variant(self, source_path: str, size: str, fmt: str) -> Tuple[str, str]:
+        """(relative cache path, etag) for one size and format of a photo"""
+        if size not in THUMBNAIL_SIZES:
+            raise ValueError(f"Unknown thumbnail size '{size}', expected one of {list(THUMBNAIL_SIZES)}")
+        if fmt not in THUMBNAIL_FORMATS:
+            raise ValueError(f"Unknown thumbnail format '{fmt}', expected one of {list(THUMBNAIL_FORMATS)}")
+        digest = self.source_hash(source_path)
+        name = f"{digest}-{THUMBNAIL_SIZES[size]}.{THUMBNAIL_FORMATS[fmt][2]}"
+        return os.path.join(digest[:2], name), f'"{digest[:32]}-{THUMBNAIL_SIZES[size]}-{fmt}"'
+
+    def etag(self, source_path: str, size: str, fmt: str) -> str:
+        """ETag of a thumbnail without rendering it"""
+        return self._variant(source_path, size, fmt)[1]
+
+    def get(self, source_path: str, size: str, fmt: str) -> Thumbnail:
+        """Cached thumbnail for a photo, rendered on first request; blocking, run off the event loop"""
+        relative_path, etag = self._variant(source_path, size, fmt)
+        path = os.path.join(self.cache_dir, relative_path)
+        thumbnail = Thumbnail(path, THUMBNAIL_FORMATS[fmt][1], etag, relative_path)
+        if self._touch(path):
+            self.hits += 1
+            return thumbnail
+        with self._lock:
+            render_lock = self._render_locks.setdefault(relative_path, threading.Lock())
+        # One render per variant; concurrent requests for it wait and reuse the file
+        with render_lock:
+            if self._touch(path):
+                self.hits += 1
+                return thumbnail
+            self.misses += 1
+            written = self._render(source_path, path, THUMBNAIL_SIZES[size], THUMBNAIL_FORMATS[fmt][0])
+        with self._lock:
+            self._render_locks.pop(relative_path, None)
+        self._add_bytes(written)
+        return thumbnail
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Mark a cached file as recently served; False when it is missing"""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _render(self, source_path: str, path: str, max_side: int, pillow_format: str) -> int:
+        with Image.open(source_path) as image:
+            # Reduced-size JPEG decode; never smaller than requested
+            image.draft("RGB", (max_side, max_side))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        options = {"method": 4} if pillow_format == "WEBP" else {"optimize": True, "progressive": True}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp_path, format=pillow_format, quality=self.quality, **options)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return os.path.getsize(path)
+
+    def pregenerate(self, source_path: str, sizes=None, formats=None):
+        """Render every size and format of a photo ahead of the first request"""
+        for size in sizes or THUMBNAIL_SIZES:
+            for fmt in formats or THUMBNAIL_FORMATS:
+                self.get(source_path, size, fmt)
+
+    def _scan(self) -> list:
+        """(mtime, size, path) for every cached file"""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _add_bytes(self, written: int):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += written
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently served thumbnails until under low_water of max_bytes"""
+        if not self._evict_lock.acquire(blocking=False):
+            return  # another thread is already evicting
+        try:
+            started = time.perf_counter()
+            files = sorted(self._scan())
+            total = sum(size for _, size, _ in files)
+            target = self.max_bytes * self.low_water
+            removed = 0
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            with self._lock:
+                self._total_bytes = total
+                self.evictions += removed
+            logger.info(f"Evicted {removed} thumbnails in {time.perf_counter() - started:.2f}s, {total} bytes cached")
+        finally:
+            self._evict_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Global instance
+thumbnail_cache = ThumbnailCache(
+    cache_dir=os.getenv(
+        "THUMBNAIL_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage", "thumbnails")
+    ),
+    max_bytes=int(os.getenv("THUMBNAIL_CACHE_MAX_MB", 1024)) * 1024 * 1024,
+    quality=int(os.getenv("THUMBNAIL_QUALITY", 80)),
+)
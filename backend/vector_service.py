@@ -1,163 +1,1753 @@
 import os
+import time
+import uuid
+import asyncio
+import functools
+import contextvars
 import logging
+import threading
 import numpy as np
-from typing import List, Dict, Any, Optional, Union
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue
-from sentence_transformers import SentenceTransformer
+from typing import Awaitable, List, Dict, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    Filter, PointStruct, VectorParams, Distance, PointIdsList,
+    Prefetch, FusionQuery, Fusion, QueryRequest, SearchParams, QuantizationSearchParams,
+    HnswConfigDiff, VectorParamsDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig, Disabled, SparseVector, SparseVectorParams, Modifier,
+    RecommendQuery, RecommendInput, RecommendStrategy, ExtendedPointId
+)
 import torch
-from PIL import Image
-import open_clip
+from PIL import Image, ImageOps
 import io
 from dotenv import load_dotenv
+from batching import MicroBatcher
+from concurrency import StageLimiter
+from metrics import stage
+from cache import TTLCache
+from text_utils import sanitize_text
+from model_registry import registry, RERANK_ENABLED
+from filters import PAYLOAD_INDEXES, build_filter, filter_cache_key
+from projection import Projection, FULL_PROJECTION
+from sparse import SparseEncoder
+from reranker import Reranker
+from imaging import ImagePreprocessor
+import hashlib
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Named vectors stored per point
+TEXT_VECTOR = "text"                # BGE embedding of location, description and features
+IMAGE_VECTOR = "clip_image"         # CLIP image embedding of the photo
+CLIP_TEXT_VECTOR = "clip_text"      # optional CLIP text-tower embedding of the description
+SPARSE_VECTOR = "text_sparse"       # BM25 term weights of the same text as TEXT_VECTOR
+
+FUSION_METHODS = ("weighted", "rrf", "dbsf")
+QDRANT_MODES = ("server", "embedded")
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+# Search results can be collapsed to the best hit per near-duplicate cluster or per location
+COLLAPSE_FIELDS = {"cluster": "cluster_id", "location": "location"}
+# Payload fields the cross-encoder reads for each candidate (see point_text)
+RERANK_FIELDS = ("location", "description", "features")
+# Stored vectors that "more like this" queries can compare, and how examples are combined
+STORED_VECTORS = {"image": IMAGE_VECTOR, "text": TEXT_VECTOR}
+RECOMMEND_STRATEGIES = ("average_vector", "best_score")
+# Several reference photos are searched as their centroid ("mean") or one sub-query each ("fuse")
+MULTI_IMAGE_MODES = ("mean", "fuse")
+# Side collection holding one point whose payload changes on every write to the main collection
+CACHE_VERSION_SUFFIX = "_cache_version"
+CACHE_VERSION_POINT_ID = "00000000-0000-0000-0000-000000000001"
+DEFAULT_QDRANT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qdrant_data")
+
+def _env_flag(name: str) -> Optional[bool]:
+    """True/False from an environment variable, None when unset"""
+    value = os.getenv(name)
+    return value.lower() == "true" if value else None
+
+def _env_number(name: str, cast=int):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
 class VectorSearchService:
     def __init__(self):
         self.qdrant_host = os.getenv("QDRANT_HOST", "localhost")
         self.qdrant_port = int(os.getenv("QDRANT_PORT", 6333))
         self.collection_name = os.getenv("QDRANT_COLLECTION_NAME", "film_locations")
         self.api_key = os.getenv("QDRANT_API_KEY")
+        self.qdrant_mode = os.getenv("QDRANT_MODE", "server").lower()
+        self.qdrant_path = os.getenv("QDRANT_PATH", DEFAULT_QDRANT_PATH)
         
         # Initialize Qdrant client
-        self.client = QdrantClient(
-            host=self.qdrant_host,
-            port=self.qdrant_port,
-            api_key=self.api_key if self.api_key else None
+        if self.qdrant_mode == "embedded":
+            # In-process local mode. It holds an exclusive lock on the directory,
+            # so there is no second async client: async calls run the sync client
+            # on the executor instead.
+            self.client = QdrantClient(path=self.qdrant_path)
+            self.async_client = None
+        elif self.qdrant_mode == "server":
+            self.client = QdrantClient(
+                host=self.qdrant_host,
+                port=self.qdrant_port,
+                api_key=self.api_key if self.api_key else None
+            )
+            self.async_client = AsyncQdrantClient(
+                host=self.qdrant_host,
+                port=self.qdrant_port,
+                api_key=self.api_key if self.api_key else None
+            )
+        else:
+            raise ValueError(f"Unknown QDRANT_MODE '{self.qdrant_mode}', expected one of {QDRANT_MODES}")
+        
+        # Bounded executors for unbatched inference and for image decoding (Pillow
+        # releases the GIL while decoding), plus per-stage concurrency limits
+        # and timeouts for async callers
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 4)),
+            thread_name_prefix="inference"
         )
+        self.decode_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("IMAGE_DECODE_WORKERS", os.cpu_count() or 4)),
+            thread_name_prefix="image-decode"
+        )
+        self.fast_image_preprocess = os.getenv("FAST_IMAGE_PREPROCESS", "true").lower() == "true"
+        self._image_preprocessor: Any = None
+        self.encode_limiter = StageLimiter.from_env("encode", default_concurrency=32, default_timeout=30.0)
+        self.search_limiter = StageLimiter.from_env("search", default_concurrency=16, default_timeout=10.0)
+        
+        # Embedding models come from the shared registry and load on first use
+        self.models = registry
+        self.store_clip_text = os.getenv("STORE_CLIP_TEXT", "false").lower() == "true"
+        self.combined_prefetch_factor = int(os.getenv("COMBINED_PREFETCH_FACTOR", 4))
+        self.collapse_overfetch = int(os.getenv("COLLAPSE_OVERFETCH", 4))
         
-        # Initialize embedding models
-        self.text_model = SentenceTransformer('BAAI/bge-small-en-v1.5')
+        # Hybrid text search: a sparse BM25 channel fused with the dense text vector
+        self.hybrid_enabled = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+        self.hybrid_fusion = os.getenv("HYBRID_FUSION", "rrf").lower()
+        if self.hybrid_fusion not in ("rrf", "dbsf"):
+            raise ValueError(f"Unknown HYBRID_FUSION '{self.hybrid_fusion}', expected 'rrf' or 'dbsf'")
+        self.sparse_encoder = SparseEncoder(
+            k1=float(os.getenv("SPARSE_BM25_K1", 1.2)),
+            b=float(os.getenv("SPARSE_BM25_B", 0.75)),
+            avg_doc_length=float(os.getenv("SPARSE_AVG_DOC_LENGTH", 24))
+        )
+        self._has_sparse: Optional[bool] = None  # whether the collection stores SPARSE_VECTOR
         
-        # Initialize CLIP for image embeddings
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.clip_model, _, self.clip_preprocess = open_clip.create_model_and_transforms(
-            'ViT-B-32', 
-            pretrained='openai',
-            device=self.device
+        # Optional cross-encoder re-ranking of over-fetched text search candidates
+        self.rerank_enabled = RERANK_ENABLED
+        self.reranker = Reranker(
+            lambda: self.models.get("reranker"),
+            self.point_text,
+            candidates=int(os.getenv("RERANK_CANDIDATES", 20)),
+            budget_ms=float(os.getenv("RERANK_BUDGET_MS", 150)),
+            batch_size=int(os.getenv("RERANK_BATCH_SIZE", 32)),
+            workers=int(os.getenv("RERANK_WORKERS", 2))
         )
         
-        logger.info(f"VectorSearchService initialized with Qdrant at {self.qdrant_host}:{self.qdrant_port}")
-        logger.info(f"Using device: {self.device}")
+        # Collection layout, applied by ensure_collection; unset values keep Qdrant's defaults
+        self.hnsw_m = _env_number("HNSW_M")
+        self.hnsw_ef_construct = _env_number("HNSW_EF_CONSTRUCT")
+        self.hnsw_on_disk = _env_flag("HNSW_ON_DISK")
+        self.vectors_on_disk = _env_flag("VECTORS_ON_DISK")
+        self.quantization = os.getenv("QUANTIZATION", "").lower() or None
+        self.quantization_always_ram = os.getenv("QUANTIZATION_ALWAYS_RAM", "true").lower() == "true"
+        if self.quantization and self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown QUANTIZATION '{self.quantization}', expected one of {QUANTIZATION_MODES}")
+        
+        # Search-time defaults, overridable per call
+        self.default_hnsw_ef = _env_number("SEARCH_HNSW_EF")
+        self.default_exact = os.getenv("SEARCH_EXACT", "false").lower() == "true"
+        self.default_rescore = _env_flag("SEARCH_RESCORE")
+        self.default_oversampling = _env_number("SEARCH_OVERSAMPLING", float)
+        
+        # Micro-batching: concurrent single-query encodes share one forward pass
+        self.batching_enabled = os.getenv("EMBED_BATCHING", "true").lower() == "true"
+        self.text_batcher = None
+        self.image_batcher = None
+        if self.batching_enabled:
+            max_batch_size = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))
+            max_wait_ms = float(os.getenv("EMBED_BATCH_WAIT_MS", 5.0))
+            self.text_batcher = MicroBatcher(
+                "text-encoder", self._encode_text_batch,
+                max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+            )
+            self.image_batcher = MicroBatcher(
+                "image-encoder", self.encode_image_tensors,
+                max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+            )
+        
+        # Two-level cache: query embeddings, then search results per query vector
+        self.embedding_cache = TTLCache(
+            maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", 2048)),
+            ttl=float(os.getenv("EMBEDDING_CACHE_TTL", 3600))
+        )
+        self.search_cache = TTLCache(
+            maxsize=int(os.getenv("SEARCH_CACHE_SIZE", 1024)),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", 300))
+        )
+        # Point ID -> image_path, for serving thumbnails without a Qdrant round trip
+        self.image_path_cache = TTLCache(
+            maxsize=int(os.getenv("IMAGE_PATH_CACHE_SIZE", 4096)),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", 300))
+        )
+        self.invalidate_on_update = os.getenv("SEARCH_CACHE_INVALIDATE_ON_UPDATE", "true").lower() == "true"
+        # Search cache keys include the collection version, re-read at most every CACHE_VERSION_TTL
+        # seconds, so writes from other workers and from the ingest/dedup CLIs invalidate them too
+        self.cache_version_ttl = float(os.getenv("CACHE_VERSION_TTL", 2))
+        self._cache_version: Optional[str] = None
+        self._cache_version_checked: Optional[float] = None
+        self._cache_version_refreshing = False
+        self._cache_version_lock = threading.Lock()
+        
+        if self.qdrant_mode == "embedded":
+            logger.info(f"VectorSearchService initialized with embedded Qdrant at {self.qdrant_path}")
+        else:
+            logger.info(f"VectorSearchService initialized with Qdrant at {self.qdrant_host}:{self.qdrant_port}")
+
+    @property
+    def device(self) -> str:
+        return self.models.device
+
+    @property
+    def text_model(self):
+        return self.models.get("text")
+
+    @property
+    def clip_model(self):
+        return self.models.get("clip")[0]
+
+    @property
+    def clip_preprocess(self):
+        return self.models.get("clip_preprocess")
+
+    @property
+    def text_encoder(self):
+        return self.models.get("text_encoder")
+
+    @property
+    def image_preprocessor(self) -> Optional[ImagePreprocessor]:
+        """Reduced-size decode and batched normalization matching clip_preprocess, or None to use it directly"""
+        if self._image_preprocessor is None:
+            preprocessor = ImagePreprocessor.from_transform(self.clip_preprocess) if self.fast_image_preprocess else None
+            self._image_preprocessor = preprocessor or False
+        return self._image_preprocessor or None
+
+    @property
+    def image_encoder(self):
+        return self.models.get("image_encoder")
+
+    @property
+    def clip_tokenizer(self):
+        return self.models.get("clip")[2]
+
+    @staticmethod
+    def _text_cache_key(text: str) -> tuple:
+        return ("text", sanitize_text(text))
+
+    @staticmethod
+    def _image_cache_key(image_data: Union[bytes, Image.Image]) -> Optional[tuple]:
+        # Only raw uploads are content-addressable; decoded images are not cached
+        if isinstance(image_data, bytes):
+            return ("image", hashlib.sha256(image_data).hexdigest())
+        return None
+
+    def _search_cache_key(self, query_vector: Union[List[float], RecommendQuery], *params) -> tuple:
+        version = self.cache_version()
+        if isinstance(query_vector, RecommendQuery):
+            # Example point IDs; their stored vectors are looked up by Qdrant
+            return (version, repr(query_vector)) + params
+        vector_hash = hashlib.blake2b(
+            np.asarray(query_vector, dtype=np.float32).tobytes(), digest_size=16
+        ).hexdigest()
+        return (version, vector_hash) + params
+
+    def _encode_text_batch(self, texts: List[str]) -> List[List[float]]:
+        """Run one text encoder forward pass over a batch of texts"""
+        return self.text_encoder.encode(texts).tolist()
+
+    def encode_image_tensors(self, image_inputs: Union[List[torch.Tensor], torch.Tensor]) -> List[List[float]]:
+        """Run one CLIP image encoder forward pass over a batch of preprocessed tensors"""
+        batch = image_inputs if isinstance(image_inputs, torch.Tensor) else torch.stack(image_inputs)
+        return self.image_encoder.encode(batch).tolist()
+
+    def encode_loaded_images(self, images: List[Union[np.ndarray, torch.Tensor]]) -> List[List[float]]:
+        """Batch and normalize load_image outputs, then encode them; blocking, run off the event loop"""
+        return self.encode_image_tensors(self.images_to_tensor(images))
+
+    def encode_clip_texts(self, texts: List[str]) -> List[List[float]]:
+        """Run one CLIP text-tower forward pass over a batch of texts"""
+        tokens = self.clip_tokenizer(texts).to(self.device)
+        with torch.no_grad():
+            text_features = self.clip_model.encode_text(tokens)
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        return text_features.cpu().numpy().tolist()
+
+    def load_image(self, image_data: Union[bytes, Image.Image]) -> Union[np.ndarray, torch.Tensor]:
+        """Decode an image upright and resize/crop it to the CLIP input (not yet normalized)"""
+        preprocessor = self.image_preprocessor
+        with stage("decode"):
+            if preprocessor:
+                image = preprocessor.decode(image_data)
+            else:
+                image = Image.open(io.BytesIO(image_data)) if isinstance(image_data, bytes) else image_data
+                image = ImageOps.exif_transpose(image).convert("RGB")
+        with stage("preprocess"):
+            return preprocessor.resize_crop(image) if preprocessor else self.clip_preprocess(image)
+
+    def images_to_tensor(self, images: List[Union[np.ndarray, torch.Tensor]]) -> torch.Tensor:
+        """Batch tensor from load_image outputs, converted and normalized in one vectorized step"""
+        if isinstance(images[0], torch.Tensor):
+            return torch.stack(images)
+        with stage("preprocess"):
+            return self.image_preprocessor.to_tensor(images)
+
+    def preprocess_image(self, image_data: Union[bytes, Image.Image]) -> torch.Tensor:
+        """Decode an image and apply the CLIP preprocessing transform"""
+        return self.images_to_tensor([self.load_image(image_data)])[0]
+
+    def preprocess_images(self, images: List[Union[bytes, Image.Image]]) -> torch.Tensor:
+        """Decode images in parallel on the decode pool and preprocess them as one batch"""
+        return self.images_to_tensor(list(self.decode_executor.map(self.load_image, images)))
 
     def encode_text(self, text: str) -> List[float]:
         """Generate text embeddings using sentence transformer"""
         try:
-            embedding = self.text_model.encode([text])
-            return embedding[0].tolist()
+            cache_key = self._text_cache_key(text)
+            embedding = self.embedding_cache.get(cache_key)
+            if embedding is not None:
+                return embedding
+            if self.text_batcher:
+                embedding = self.text_batcher(cache_key[1])
+            else:
+                embedding = self._encode_text_batch([cache_key[1]])[0]
+            self.embedding_cache.set(cache_key, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Error encoding text: {e}")
             raise
 
+    def encode_texts(self, texts: List[str]) -> List[List[float]]:
+        """Generate text embeddings for many texts in a single forward pass"""
+        if not texts:
+            return []
+        try:
+            cache_keys = [self._text_cache_key(text) for text in texts]
+            embeddings = [self.embedding_cache.get(key) for key in cache_keys]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                computed = self._encode_text_batch([cache_keys[i][1] for i in missing])
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = embedding
+                    self.embedding_cache.set(cache_keys[i], embedding)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error encoding {len(texts)} texts: {e}")
+            raise
+
     def encode_image(self, image_data: Union[bytes, Image.Image]) -> List[float]:
         """Generate image embeddings using open_clip"""
         try:
-            if isinstance(image_data, bytes):
-                image = Image.open(io.BytesIO(image_data)).convert("RGB")
+            cache_key = self._image_cache_key(image_data)
+            if cache_key:
+                embedding = self.embedding_cache.get(cache_key)
+                if embedding is not None:
+                    return embedding
+            image_input = self.preprocess_image(image_data)
+            if self.image_batcher:
+                embedding = self.image_batcher(image_input)
             else:
-                image = image_data.convert("RGB")
-            image_input = self.clip_preprocess(image).unsqueeze(0).to(self.device)
-            with torch.no_grad():
-                image_features = self.clip_model.encode_image(image_input)
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            return image_features.cpu().numpy().flatten().tolist()
+                embedding = self.encode_image_tensors([image_input])[0]
+            if cache_key:
+                self.embedding_cache.set(cache_key, embedding)
+            return embedding
         except Exception as e:
             logger.error(f"Error encoding image: {e}")
             raise
 
+    def encode_images(self, images: List[Union[bytes, Image.Image]]) -> List[List[float]]:
+        """Generate image embeddings for many images in a single forward pass"""
+        if not images:
+            return []
+        try:
+            cache_keys = [self._image_cache_key(image) for image in images]
+            embeddings = [self.embedding_cache.get(key) if key else None for key in cache_keys]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                computed = self.encode_image_tensors(self.preprocess_images([images[i] for i in missing]))
+                for i, embedding in zip(missing, computed):
+                    embeddings[i] = embedding
+                    if cache_keys[i]:
+                        self.embedding_cache.set(cache_keys[i], embedding)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error encoding {len(images)} images: {e}")
+            raise
+
+    def batching_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch size and wait time metrics for the encoders"""
+        if not self.batching_enabled:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "text": self.text_batcher.stats(),
+            "image": self.image_batcher.stats(),
+        }
+
+    def _build_filter(
+        self,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Filter]:
+        """Prepare a Qdrant filter from a location and/or structured filters (see filters.build_filter)"""
+        return build_filter(location_filter, filters)
+
+    def _format_results(self, search_results, projection: Projection = FULL_PROJECTION) -> List[Dict[str, Any]]:
+        """Convert Qdrant scored points into API result dictionaries with the projected fields"""
+        formatted_results = projection.format(search_results)
+        logger.info(f"Found {len(formatted_results)} similar locations")
+        return formatted_results
+
+    @staticmethod
+    def _required_fields(collapse: Optional[str]) -> List[str]:
+        """Payload fields a search reads itself, fetched whatever the projection"""
+        return [COLLAPSE_FIELDS[collapse]] if collapse in COLLAPSE_FIELDS else []
+
+    def _fetch_limit(self, limit: int, collapse: Optional[str], offset: int = 0) -> int:
+        """Points to fetch so that ``limit`` remain after collapsing"""
+        if offset < 0:
+            raise ValueError(f"offset must be non-negative, got {offset}")
+        if collapse is None:
+            return limit
+        if offset:
+            raise ValueError("collapse cannot be combined with offset; collapsed results are not pageable")
+        if collapse not in COLLAPSE_FIELDS:
+            raise ValueError(f"Unknown collapse '{collapse}', expected one of {sorted(COLLAPSE_FIELDS)}")
+        return limit * self.collapse_overfetch
+
+    @staticmethod
+    def _collapse(points: List[Any], collapse: Optional[str], limit: int) -> List[Any]:
+        """Keep the best-scoring point per cluster or location (points are sorted by score)"""
+        if collapse is None:
+            return points
+        field = COLLAPSE_FIELDS[collapse]
+        seen = set()
+        kept = []
+        for point in points:
+            # Points not yet assigned to a cluster form their own group
+            key = (point.payload or {}).get(field) or point.id
+            if key in seen:
+                continue
+            seen.add(key)
+            kept.append(point)
+            if len(kept) >= limit:
+                break
+        return kept
+
+    def search_params(
+        self,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None
+    ) -> Optional[SearchParams]:
+        """Per-request HNSW and quantization settings, falling back to the SEARCH_* defaults"""
+        hnsw_ef = hnsw_ef if hnsw_ef is not None else self.default_hnsw_ef
+        exact = exact if exact is not None else self.default_exact
+        rescore = rescore if rescore is not None else self.default_rescore
+        oversampling = oversampling if oversampling is not None else self.default_oversampling
+        quantization = None
+        if rescore is not None or oversampling is not None:
+            quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+        if hnsw_ef is None and not exact and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+    def _combined_channels(
+        self,
+        text_vector: List[float],
+        image_vector: Optional[List[float]],
+        text_weight: float,
+        image_weight: float
+    ) -> List[tuple]:
+        """(vector name, query vector, weight) for each sub-query of a combined search"""
+        channels = [(TEXT_VECTOR, text_vector, text_weight)]
+        if image_vector is not None:
+            channels += self._image_channels([image_vector], image_weight)
+        return channels
+
+    def _image_channels(self, image_vectors: List[List[float]], image_weight: float, multi_image: str = "mean") -> List[tuple]:
+        """Image sub-queries sharing image_weight: the centroid of the photos, or one per photo"""
+        self._check_multi_image(multi_image)
+        if multi_image == "mean" and len(image_vectors) > 1:
+            image_vectors = [self._centroid(image_vectors)]
+        weight = image_weight / len(image_vectors)
+        channels = []
+        for image_vector in image_vectors:
+            if self.store_clip_text:
+                # The image also queries the CLIP text embeddings of the descriptions
+                channels.append((IMAGE_VECTOR, image_vector, weight / 2))
+                channels.append((CLIP_TEXT_VECTOR, image_vector, weight / 2))
+            else:
+                channels.append((IMAGE_VECTOR, image_vector, weight))
+        return channels
+
+    @staticmethod
+    def _check_multi_image(multi_image: str):
+        if multi_image not in MULTI_IMAGE_MODES:
+            raise ValueError(f"Unknown multi-image mode '{multi_image}', expected one of {MULTI_IMAGE_MODES}")
+
+    @staticmethod
+    def _centroid(vectors: List[List[float]]) -> List[float]:
+        """Re-normalized mean of unit vectors, i.e. the cosine centroid of several photos"""
+        mean = np.mean(np.asarray(vectors, dtype=np.float32), axis=0)
+        norm = np.linalg.norm(mean)
+        return (mean / norm if norm else mean).tolist()
+
+    @staticmethod
+    def _image_list(image_data: Union[bytes, List[bytes], None]) -> List[bytes]:
+        if not image_data:
+            return []
+        return [image_data] if isinstance(image_data, bytes) else [image for image in image_data if image]
+
+    def _batch_requests(
+        self,
+        channels: List[tuple],
+        limit: int,
+        search_filter: Optional[Filter],
+        params: Optional[SearchParams] = None,
+        sparse_vector: Optional[SparseVector] = None,
+        with_payload: Any = True
+    ) -> List[QueryRequest]:
+        # Each channel over-fetches so points ranked lower in one modality can still surface
+        fetch_limit = limit * self.combined_prefetch_factor
+        requests = []
+        for using, vector, _ in channels:
+            prefetch = None
+            if using == TEXT_VECTOR and sparse_vector is not None:
+                # Hybrid text channel: dense and sparse candidates, re-scored by the dense
+                # vector so the channel score stays a cosine similarity the weights can mix
+                prefetch = [
+                    Prefetch(query=vector, using=TEXT_VECTOR, filter=search_filter, params=params, limit=fetch_limit),
+                    Prefetch(query=sparse_vector, using=SPARSE_VECTOR, filter=search_filter, limit=fetch_limit),
+                ]
+            requests.append(QueryRequest(
+                prefetch=prefetch,
+                query=vector,
+                using=using,
+                filter=search_filter,
+                params=params,
+                limit=fetch_limit,
+                with_payload=with_payload
+            ))
+        return requests
+
+    def _fusion_query_kwargs(
+        self,
+        channels: List[tuple],
+        fusion: str,
+        limit: int,
+        score_threshold: Optional[float],
+        search_filter: Optional[Filter],
+        params: Optional[SearchParams] = None,
+        sparse_vector: Optional[SparseVector] = None,
+        offset: int = 0,
+        with_payload: Any = True
+    ) -> Dict[str, Any]:
+        """Arguments for a single prefetch + server-side fusion query_points call"""
+        prefetch = [
+            Prefetch(
+                query=vector,
+                using=using,
+                filter=search_filter,
+                params=params,
+                limit=(offset + limit) * self.combined_prefetch_factor,
+                score_threshold=score_threshold
+            )
+            for using, vector, _ in channels
+        ]
+        if sparse_vector is not None:
+            # BM25 scores are not on the cosine scale, so the threshold only applies to dense channels
+            prefetch.append(Prefetch(
+                query=sparse_vector,
+                using=SPARSE_VECTOR,
+                filter=search_filter,
+                limit=(offset + limit) * self.combined_prefetch_factor
+            ))
+        return {
+            "collection_name": self.collection_name,
+            "prefetch": prefetch,
+            "query": FusionQuery(fusion=Fusion.RRF if fusion == "rrf" else Fusion.DBSF),
+            "limit": limit,
+            "offset": offset or None,
+            "with_payload": with_payload,
+        }
+
+    def _hybrid_query_kwargs(
+        self,
+        query_vector: List[float],
+        sparse_vector: SparseVector,
+        limit: int,
+        score_threshold: Optional[float],
+        search_filter: Optional[Filter],
+        params: Optional[SearchParams] = None,
+        offset: int = 0,
+        with_payload: Any = True
+    ) -> Dict[str, Any]:
+        """Arguments for a hybrid text query_points call.
+
+        Dense and sparse candidates are fused server-side (HYBRID_FUSION) only
+        to pick the candidate set, which is then re-scored by the dense vector:
+        scores stay cosine similarities and score_threshold applies to every
+        hit, including BM25-only matches.
+        """
+        candidates = (offset + limit) * self.combined_prefetch_factor
+        return {
+            "collection_name": self.collection_name,
+            "prefetch": [Prefetch(
+                prefetch=[
+                    Prefetch(query=query_vector, using=TEXT_VECTOR, filter=search_filter, params=params, limit=candidates),
+                    Prefetch(query=sparse_vector, using=SPARSE_VECTOR, filter=search_filter, limit=candidates),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF if self.hybrid_fusion == "rrf" else Fusion.DBSF),
+                limit=candidates
+            )],
+            "query": query_vector,
+            "using": TEXT_VECTOR,
+            "score_threshold": score_threshold,
+            "limit": limit,
+            "offset": offset or None,
+            "with_payload": with_payload,
+        }
+
+    def _hybrid_cache_key(
+        self,
+        query_vector: List[float],
+        sparse_vector: SparseVector,
+        limit: int,
+        score_threshold: Optional[float],
+        location_filter: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        params: Optional[SearchParams],
+        collapse: Optional[str],
+        offset: int,
+        projection: Projection
+    ) -> tuple:
+        return self._fused_cache_key(
+            [(TEXT_VECTOR, query_vector, 1.0)], f"hybrid-{self.hybrid_fusion}", sparse_vector, limit, score_threshold,
+            location_filter, filters, params, collapse, offset, projection
+        )
+
+    def _fused_cache_key(
+        self,
+        channels: List[tuple],
+        fusion: str,
+        sparse_vector: Optional[SparseVector],
+        limit: int,
+        score_threshold: Optional[float],
+        location_filter: Optional[str],
+        filters: Optional[Dict[str, Any]],
+        params: Optional[SearchParams],
+        collapse: Optional[str],
+        offset: int,
+        projection: Projection
+    ) -> tuple:
+        return self._search_cache_key(
+            [value for _, vector, _ in channels for value in vector],
+            tuple((using, weight) for using, _, weight in channels),
+            tuple(sparse_vector.indices) if sparse_vector is not None else None,
+            fusion, limit, score_threshold, location_filter, filter_cache_key(filters), repr(params), collapse,
+            offset, projection
+        )
+
+    @staticmethod
+    def _fuse_weighted(
+        responses,
+        weights: List[float],
+        limit: int,
+        score_threshold: Optional[float]
+    ) -> List[Any]:
+        """Weighted score fusion of per-channel results (missing scores count as 0)"""
+        total_weight = sum(weights) or 1.0
+        scores: Dict[Any, float] = {}
+        points: Dict[Any, Any] = {}
+        for response, weight in zip(responses, weights):
+            for point in response.points:
+                scores[point.id] = scores.get(point.id, 0.0) + weight * point.score
+                points.setdefault(point.id, point)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        fused = []
+        for point_id, score in ranked:
+            score /= total_weight
+            if score_threshold is not None and score < score_threshold:
+                break
+            fused.append(points[point_id].model_copy(update={"score": score}))
+            if len(fused) >= limit:
+                break
+        return fused
+
     def search_similar_locations(
         self, 
-        query_vector: List[float], 
+        query_vector: Union[List[float], RecommendQuery], 
         limit: int = 5,
         score_threshold: float = 0.7,
-        location_filter: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Search for similar locations in Qdrant"""
-        try:
-            # Prepare filter if location is specified
-            search_filter = None
-            if location_filter:
-                search_filter = Filter(
-                    must=[
-                        FieldCondition(
-                            key="location",
-                            match=MatchValue(value=location_filter)
-                        )
-                    ]
-                )
-            
-            # Perform similarity search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                query_filter=search_filter,
-                limit=limit,
-                score_threshold=score_threshold
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        using: str = TEXT_VECTOR,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Search for similar locations in Qdrant against one named vector.
+
+        ``query_vector`` may also be a recommend query over stored points
+        (see recommend_query), which needs no model inference. ``offset``
+        skips that many results (for paging), and ``projection`` selects the
+        payload fields fetched and returned per result.
+        """
+        try:
+            params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+            fetch_limit = self._fetch_limit(limit, collapse, offset)
+            cache_key = self._search_cache_key(
+                query_vector, using, limit, score_threshold, location_filter, filter_cache_key(filters), repr(params), collapse,
+                offset, projection
             )
-            
-            # Format results
-            formatted_results = []
-            for result in search_results:
-                formatted_result = {
-                    "id": result.id,
-                    "score": result.score,
-                    "payload": result.payload,
-                    "location": result.payload.get("location", "Unknown"),
-                    "description": result.payload.get("description", ""),
-                    "image_path": result.payload.get("image_path", ""),
-                    "features": result.payload.get("features", [])
-                }
-                formatted_results.append(formatted_result)
-            
-            logger.info(f"Found {len(formatted_results)} similar locations")
-            return formatted_results
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            search_results = self.client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                using=using,
+                query_filter=self._build_filter(location_filter, filters),
+                search_params=params,
+                limit=fetch_limit,
+                offset=offset or None,
+                score_threshold=score_threshold,
+                with_payload=projection.selector(self._required_fields(collapse))
+            ).points
+            formatted_results = self._format_results(self._collapse(search_results, collapse, limit), projection)
+            self.search_cache.set(cache_key, formatted_results)
+            return list(formatted_results)
             
         except Exception as e:
             logger.error(f"Error searching similar locations: {e}")
             raise
 
-    def search_by_text(self, text_query: str, **kwargs) -> List[Dict[str, Any]]:
-        """Search locations by text description"""
+    def _set_sparse_state(self, info):
+        self._has_sparse = SPARSE_VECTOR in (info.config.params.sparse_vectors or {})
+        if self.hybrid_enabled and not self._has_sparse:
+            logger.warning(
+                f"Collection '{self.collection_name}' has no '{SPARSE_VECTOR}' sparse vector; text search "
+                f"stays dense-only until the photos are ingested into a new collection"
+            )
+
+    def _hybrid_ready(self) -> bool:
+        """Whether hybrid search is enabled and the collection stores the sparse vector"""
+        if self.hybrid_enabled and self._has_sparse is None:
+            try:
+                self._set_sparse_state(self.client.get_collection(self.collection_name))
+            except Exception as e:
+                logger.warning(f"Could not check for sparse vectors: {e}")
+                return False
+        return self.hybrid_enabled and bool(self._has_sparse)
+
+    def _sparse_query(self, text_query: str) -> Optional[SparseVector]:
+        """Sparse query vector when hybrid search is enabled and the collection supports it"""
+        if not self._hybrid_ready():
+            return None
+        sparse_vector = self.sparse_encoder.encode_query(text_query)
+        return sparse_vector if sparse_vector.indices else None
+
+    def _search_text_vector(
+        self,
+        query_vector: List[float],
+        sparse_vector: Optional[SparseVector],
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        if sparse_vector is not None:
+            # Dense and sparse candidates in one request, scored by the dense vector
+            return self._search_hybrid(query_vector, sparse_vector, **kwargs)
+        return self.search_similar_locations(query_vector, using=TEXT_VECTOR, **kwargs)
+
+    def _search_hybrid(
+        self,
+        query_vector: List[float],
+        sparse_vector: SparseVector,
+        limit: int = 5,
+        score_threshold: Optional[float] = 0.7,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Hybrid dense + sparse text search (see _hybrid_query_kwargs)"""
+        params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+        fetch_limit = self._fetch_limit(limit, collapse, offset)
+        cache_key = self._hybrid_cache_key(
+            query_vector, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+            offset, projection
+        )
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        points = self.client.query_points(
+            **self._hybrid_query_kwargs(
+                query_vector, sparse_vector, fetch_limit, score_threshold,
+                self._build_filter(location_filter, filters), params, offset,
+                projection.selector(self._required_fields(collapse))
+            )
+        ).points
+        formatted_results = self._format_results(self._collapse(points, collapse, limit), projection)
+        self.search_cache.set(cache_key, formatted_results)
+        return list(formatted_results)
+
+    def _widen_for_rerank(self, rerank: Optional[bool], kwargs: Dict[str, Any]) -> Optional[int]:
+        """Raise the search limit to the re-rank candidate count; returns the caller's limit,
+        or None when this request is not re-ranked"""
+        if kwargs.get("offset"):
+            # Later pages continue the vector order, so only an unranked first page pages cleanly
+            if rerank:
+                raise ValueError("rerank applies to the first page only and cannot be combined with offset")
+            return None
+        if not (self.rerank_enabled if rerank is None else rerank):
+            return None
+        limit = kwargs.get("limit", 5)
+        kwargs["limit"] = self.reranker.candidate_limit(limit)
+        kwargs["projection"] = kwargs.get("projection", FULL_PROJECTION).with_fields(RERANK_FIELDS)
+        return limit
+
+    def search_by_text(
+        self,
+        text_query: str,
+        rerank: Optional[bool] = None,
+        timings: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Search locations by text description (hybrid dense + sparse when available).
+
+        With rerank (default RERANK_ENABLED) the top RERANK_CANDIDATES are
+        re-scored by a cross-encoder; ``timings`` receives rerank_ms.
+        """
+        final_limit = self._widen_for_rerank(rerank, kwargs)
         query_vector = self.encode_text(text_query)
-        return self.search_similar_locations(query_vector, **kwargs)
+        results = self._search_text_vector(query_vector, self._sparse_query(text_query), **kwargs)
+        if final_limit is None:
+            return results
+        return self.reranker.rerank(text_query, results, final_limit, timings)
 
     def search_by_image(self, image_data: bytes, **kwargs) -> List[Dict[str, Any]]:
         """Search locations by image similarity"""
         query_vector = self.encode_image(image_data)
-        return self.search_similar_locations(query_vector, **kwargs)
+        return self.search_similar_locations(query_vector, using=IMAGE_VECTOR, **kwargs)
+
+    def search_by_images(
+        self,
+        images: List[bytes],
+        multi_image: str = "mean",
+        fusion: str = "weighted",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Search by several reference photos (e.g. a mood board), encoded in one forward pass.
+
+        multi_image="mean" searches once with the photos' centroid; "fuse"
+        searches each photo and fuses the rankings with ``fusion``. With
+        STORE_CLIP_TEXT each photo also queries the CLIP text vectors.
+        """
+        self._check_multi_image(multi_image)
+        if len(images) == 1:
+            return self.search_by_image(images[0], **kwargs)
+        channels = self._image_channels(self.encode_images(images), 1.0, multi_image)
+        if len(channels) == 1:
+            _, query_vector, _ = channels[0]
+            return self.search_similar_locations(query_vector, using=IMAGE_VECTOR, **kwargs)
+        return self._search_fused(channels, fusion, **kwargs)
+
+    @staticmethod
+    def recommend_query(
+        positive: List[ExtendedPointId],
+        negative: Optional[List[ExtendedPointId]] = None,
+        strategy: str = "average_vector"
+    ) -> RecommendQuery:
+        """Query from liked and disliked point IDs; the examples themselves are never returned.
+
+        "average_vector" searches near the mean of the liked vectors minus the
+        disliked ones; "best_score" ranks by the closest liked example and
+        also accepts only disliked examples.
+        """
+        positive, negative = list(positive or []), list(negative or [])
+        if strategy not in RECOMMEND_STRATEGIES:
+            raise ValueError(f"Unknown recommend strategy '{strategy}', expected one of {RECOMMEND_STRATEGIES}")
+        if not positive and (strategy == "average_vector" or not negative):
+            raise ValueError(f"At least one positive example is required for the {strategy} strategy")
+        return RecommendQuery(
+            recommend=RecommendInput(positive=positive, negative=negative, strategy=RecommendStrategy(strategy))
+        )
+
+    @staticmethod
+    def stored_vector(vector: str) -> str:
+        """Named vector for "image" or "text" similarity between stored points"""
+        if vector not in STORED_VECTORS:
+            raise ValueError(f"Unknown vector '{vector}', expected one of {tuple(STORED_VECTORS)}")
+        return STORED_VECTORS[vector]
+
+    def recommend_locations(
+        self,
+        positive: List[ExtendedPointId],
+        negative: Optional[List[ExtendedPointId]] = None,
+        strategy: str = "average_vector",
+        vector: str = "image",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Locations like the positive examples (and unlike the negative ones) from their
+        stored vectors: one Qdrant call and no model inference"""
+        query = self.recommend_query(positive, negative, strategy)
+        return self.search_similar_locations(query, using=self.stored_vector(vector), **kwargs)
+
+    def _search_fused(
+        self,
+        channels: List[tuple],
+        fusion: str,
+        sparse_vector: Optional[SparseVector] = None,
+        limit: int = 5,
+        score_threshold: Optional[float] = 0.7,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Run all channels in one Qdrant request and merge them"""
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method '{fusion}', expected one of {FUSION_METHODS}")
+        params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+        fetch_limit = self._fetch_limit(limit, collapse, offset)
+        cache_key = self._fused_cache_key(
+            channels, fusion, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+            offset, projection
+        )
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        search_filter = self._build_filter(location_filter, filters)
+        with_payload = projection.selector(self._required_fields(collapse))
+        if fusion == "weighted":
+            # Fused client-side, so every channel fetches the pages before this one too
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._batch_requests(
+                    channels, offset + fetch_limit, search_filter, params, sparse_vector, with_payload
+                )
+            )
+            weights = [weight for _, _, weight in channels]
+            points = self._fuse_weighted(responses, weights, offset + fetch_limit, score_threshold)[offset:]
+        else:
+            points = self.client.query_points(
+                **self._fusion_query_kwargs(
+                    channels, fusion, fetch_limit, score_threshold, search_filter, params, sparse_vector,
+                    offset, with_payload
+                )
+            ).points
+        formatted_results = self._format_results(self._collapse(points, collapse, limit), projection)
+        self.search_cache.set(cache_key, formatted_results)
+        return list(formatted_results)
 
     def search_combined(
         self, 
         text_query: str, 
-        image_data: Optional[bytes] = None,
+        image_data: Union[bytes, List[bytes], None] = None,
         text_weight: float = 0.7,
         image_weight: float = 0.3,
+        fusion: str = "weighted",
+        multi_image: str = "mean",
+        rerank: Optional[bool] = None,
+        timings: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> List[Dict[str, Any]]:
-        """Search using both text and image with weighted combination"""
-        try:
-            # Get text embedding
-            text_vector = np.array(self.encode_text(text_query))
-            if image_data:
-                # Get image embedding
-                image_vector = np.array(self.encode_image(image_data))
-                # Ensure vectors have the same dimension (pad with zeros if needed)
-                if len(text_vector) != len(image_vector):
-                    max_len = max(len(text_vector), len(image_vector))
-                    text_vector = np.pad(text_vector, (0, max_len - len(text_vector)))
-                    image_vector = np.pad(image_vector, (0, max_len - len(image_vector)))
-                # Combine vectors with weights
-                combined_vector = (text_weight * text_vector + image_weight * image_vector)
-                combined_vector = combined_vector / np.linalg.norm(combined_vector)
+        """Search text and image vectors in one request and fuse the rankings.
+
+        fusion="weighted" combines per-channel scores using text_weight and
+        image_weight; "rrf" and "dbsf" fuse server-side and ignore the weights.
+        Several images share image_weight as described in search_by_images.
+        Re-ranking works as in search_by_text, on the text query.
+        """
+        try:
+            final_limit = self._widen_for_rerank(rerank, kwargs)
+            images = self._image_list(image_data)
+            text_vector = self.encode_text(text_query)
+            image_vectors = [self.encode_image(images[0])] if len(images) == 1 else self.encode_images(images)
+            sparse_vector = self._sparse_query(text_query)
+            if not image_vectors:
+                results = self._search_text_vector(text_vector, sparse_vector, **kwargs)
+            else:
+                channels = [(TEXT_VECTOR, text_vector, text_weight)]
+                channels += self._image_channels(image_vectors, image_weight, multi_image)
+                results = self._search_fused(channels, fusion, sparse_vector=sparse_vector, **kwargs)
+            if final_limit is None:
+                return results
+            return self.reranker.rerank(text_query, results, final_limit, timings)
+        except Exception as e:
+            logger.error(f"Error in combined search: {e}")
+            raise
+
+    def _prepare_batch(
+        self,
+        queries: List[Dict[str, Any]],
+        text_vectors: List[Optional[List[float]]],
+        image_vectors: List[Optional[List[float]]],
+        sparse_vectors: List[Optional[SparseVector]]
+    ) -> tuple:
+        """Cached results, QueryRequests and a plan for merging responses back per query.
+
+        Text-only and image-only queries become one request each (a hybrid
+        prefetch + dense re-score request for text when sparse vectors are available);
+        combined queries become one request per channel (weighted fusion) or a
+        single prefetch + fusion request (rrf/dbsf). Cache keys match the
+        single-query search methods, so both paths share cached results.
+        """
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+        requests: List[QueryRequest] = []
+        plan = []  # (query index, cache key, first request, request count, weights, limits, score_threshold, collapse, projection)
+        for i, (query, text_vector, image_vector, sparse_vector) in enumerate(
+            zip(queries, text_vectors, image_vectors, sparse_vectors)
+        ):
+            limit = query.get("limit", 5)
+            score_threshold = query.get("score_threshold", 0.7)
+            location_filter = query.get("location_filter")
+            filters = query.get("filters")
+            collapse = query.get("collapse")
+            projection = query.get("projection", FULL_PROJECTION)
+            fetch_limit = self._fetch_limit(limit, collapse)
+            with_payload = projection.selector(self._required_fields(collapse))
+            params = self.search_params(
+                query.get("hnsw_ef"), query.get("exact"), query.get("rescore"), query.get("oversampling")
+            )
+            search_filter = self._build_filter(location_filter, filters)
+            start = len(requests)
+            weights = None
+            if text_vector is not None and image_vector is None and sparse_vector is not None:
+                # Hybrid text-only query, as in _search_hybrid
+                cache_key = self._hybrid_cache_key(
+                    text_vector, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+                    0, projection
+                )
+                hybrid_kwargs = self._hybrid_query_kwargs(
+                    text_vector, sparse_vector, fetch_limit, score_threshold, search_filter, params,
+                    with_payload=with_payload
+                )
+                hybrid_kwargs.pop("collection_name")
+                new_requests = [QueryRequest(**hybrid_kwargs)]
+            elif image_vector is not None and text_vector is not None:
+                fusion = query.get("fusion", "weighted")
+                if fusion not in FUSION_METHODS:
+                    raise ValueError(f"Unknown fusion method '{fusion}', expected one of {FUSION_METHODS}")
+                channels = self._combined_channels(
+                    text_vector, image_vector, query.get("text_weight", 0.7), query.get("image_weight", 0.3)
+                )
+                cache_key = self._fused_cache_key(
+                    channels, fusion, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+                    0, projection
+                )
+                if fusion == "weighted":
+                    new_requests = self._batch_requests(
+                        channels, fetch_limit, search_filter, params, sparse_vector, with_payload
+                    )
+                    weights = [weight for _, _, weight in channels]
+                else:
+                    fusion_kwargs = self._fusion_query_kwargs(
+                        channels, fusion, fetch_limit, score_threshold, search_filter, params, sparse_vector,
+                        with_payload=with_payload
+                    )
+                    fusion_kwargs.pop("collection_name")
+                    new_requests = [QueryRequest(**fusion_kwargs)]
+            elif text_vector is not None or image_vector is not None:
+                vector, using = (text_vector, TEXT_VECTOR) if text_vector is not None else (image_vector, IMAGE_VECTOR)
+                cache_key = self._search_cache_key(
+                    vector, using, limit, score_threshold, location_filter, filter_cache_key(filters), repr(params), collapse,
+                    0, projection
+                )
+                new_requests = [QueryRequest(
+                    query=vector,
+                    using=using,
+                    filter=search_filter,
+                    params=params,
+                    limit=fetch_limit,
+                    score_threshold=score_threshold,
+                    with_payload=with_payload
+                )]
+            else:
+                raise ValueError(f"Query {i} has neither text nor image")
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                results[i] = list(cached)
+                continue
+            requests.extend(new_requests)
+            plan.append((
+                i, cache_key, start, len(new_requests), weights, (limit, fetch_limit), score_threshold, collapse, projection
+            ))
+        return results, requests, plan
+
+    def _collect_batch(self, results: List[Optional[List[Dict[str, Any]]]], responses, plan) -> List[List[Dict[str, Any]]]:
+        """Fill in results for the planned queries from a query_batch_points response"""
+        for i, cache_key, start, count, weights, (limit, fetch_limit), score_threshold, collapse, projection in plan:
+            if weights is None:
+                points = responses[start].points
             else:
-                combined_vector = text_vector
-            return self.search_similar_locations(combined_vector.tolist(), **kwargs)
+                points = self._fuse_weighted(responses[start:start + count], weights, fetch_limit, score_threshold)
+            formatted_results = self._format_results(self._collapse(points, collapse, limit), projection)
+            self.search_cache.set(cache_key, formatted_results)
+            results[i] = list(formatted_results)
+        return results
+
+    @staticmethod
+    def _split_batch(queries: List[Dict[str, Any]]) -> tuple:
+        """Indices of the queries that carry text and images"""
+        text_indices = [i for i, query in enumerate(queries) if query.get("text")]
+        image_indices = [i for i, query in enumerate(queries) if query.get("image")]
+        return text_indices, image_indices
+
+    @staticmethod
+    def _spread(count: int, indices: List[int], values: List[Any]) -> List[Any]:
+        spread = [None] * count
+        for i, value in zip(indices, values):
+            spread[i] = value
+        return spread
+
+    def search_batch(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Run many text, image or combined queries with batched encoding and one Qdrant call.
+
+        Each query is a dict with ``text`` and/or ``image`` (bytes) and
+        optional limit, score_threshold, location_filter, filters, text_weight,
+        image_weight, fusion, collapse and search parameters. Results come back in
+        input order.
+        """
+        try:
+            text_indices, image_indices = self._split_batch(queries)
+            text_vectors = self.encode_texts([queries[i]["text"] for i in text_indices])
+            image_vectors = self.encode_images([queries[i]["image"] for i in image_indices])
+            sparse_vectors = [self._sparse_query(queries[i]["text"]) for i in text_indices]
+            results, requests, plan = self._prepare_batch(
+                queries,
+                self._spread(len(queries), text_indices, text_vectors),
+                self._spread(len(queries), image_indices, image_vectors),
+                self._spread(len(queries), text_indices, sparse_vectors)
+            )
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests
+            ) if requests else []
+            return self._collect_batch(results, responses, plan)
+        except Exception as e:
+            logger.error(f"Error in batch search of {len(queries)} queries: {e}")
+            raise
+
+    # Async path: inference runs on the batcher/executor threads and searches go
+    # through AsyncQdrantClient (or the executor in embedded mode), so the event
+    # loop is never blocked.
+
+    async def _run_in_executor(self, func, *args, executor: Optional[ThreadPoolExecutor] = None):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so stage timings reach its request trace
+        return await loop.run_in_executor(executor or self.executor, contextvars.copy_context().run, func, *args)
+
+    def _qdrant_call(self, method: str, *args, **kwargs) -> Awaitable:
+        """Awaitable Qdrant call: the async client in server mode, the executor in embedded mode"""
+        if self.async_client is not None:
+            return getattr(self.async_client, method)(*args, **kwargs)
+        return self._run_in_executor(functools.partial(getattr(self.client, method), *args, **kwargs))
+
+    async def aencode_text(self, text: str) -> List[float]:
+        """Async variant of encode_text"""
+        cache_key = self._text_cache_key(text)
+        embedding = self.embedding_cache.get(cache_key)
+        if embedding is not None:
+            return embedding
+        if self.text_batcher:
+            work = asyncio.wrap_future(self.text_batcher.submit(cache_key[1]))
+        else:
+            work = self._run_in_executor(self._encode_text_batch, [cache_key[1]])
+        embedding = await self.encode_limiter.run(work)
+        if not self.text_batcher:
+            embedding = embedding[0]
+        self.embedding_cache.set(cache_key, embedding)
+        return embedding
+
+    async def aencode_image(self, image_data: Union[bytes, Image.Image]) -> List[float]:
+        """Async variant of encode_image"""
+        cache_key = self._image_cache_key(image_data)
+        if cache_key:
+            embedding = self.embedding_cache.get(cache_key)
+            if embedding is not None:
+                return embedding
+
+        async def encode():
+            image_input = await self._run_in_executor(self.preprocess_image, image_data, executor=self.decode_executor)
+            if self.image_batcher:
+                return await asyncio.wrap_future(self.image_batcher.submit(image_input))
+            return (await self._run_in_executor(self.encode_image_tensors, [image_input]))[0]
+        embedding = await self.encode_limiter.run(encode())
+        if cache_key:
+            self.embedding_cache.set(cache_key, embedding)
+        return embedding
+
+    async def asearch_similar_locations(
+        self,
+        query_vector: Union[List[float], RecommendQuery],
+        limit: int = 5,
+        score_threshold: float = 0.7,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        using: str = TEXT_VECTOR,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_similar_locations"""
+        try:
+            params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+            fetch_limit = self._fetch_limit(limit, collapse, offset)
+            cache_key = self._search_cache_key(
+                query_vector, using, limit, score_threshold, location_filter, filter_cache_key(filters), repr(params), collapse,
+                offset, projection
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+            response = await self.search_limiter.run(
+                self._qdrant_call(
+                    "query_points",
+                    collection_name=self.collection_name,
+                    query=query_vector,
+                    using=using,
+                    query_filter=self._build_filter(location_filter, filters),
+                    search_params=params,
+                    limit=fetch_limit,
+                    offset=offset or None,
+                    score_threshold=score_threshold,
+                    with_payload=projection.selector(self._required_fields(collapse))
+                )
+            )
+            formatted_results = self._format_results(self._collapse(response.points, collapse, limit), projection)
+            self.search_cache.set(cache_key, formatted_results)
+            return list(formatted_results)
+        except Exception as e:
+            logger.error(f"Error searching similar locations: {e}")
+            raise
+
+    async def _ahybrid_ready(self) -> bool:
+        """Async variant of _hybrid_ready"""
+        if self.hybrid_enabled and self._has_sparse is None:
+            try:
+                self._set_sparse_state(await self._qdrant_call("get_collection", self.collection_name))
+            except Exception as e:
+                logger.warning(f"Could not check for sparse vectors: {e}")
+                return False
+        return self.hybrid_enabled and bool(self._has_sparse)
+
+    async def _asparse_query(self, text_query: str) -> Optional[SparseVector]:
+        """Async variant of _sparse_query"""
+        if not await self._ahybrid_ready():
+            return None
+        return self._sparse_query(text_query)
+
+    async def _asearch_text_vector(
+        self,
+        query_vector: List[float],
+        sparse_vector: Optional[SparseVector],
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        if sparse_vector is not None:
+            return await self._asearch_hybrid(query_vector, sparse_vector, **kwargs)
+        return await self.asearch_similar_locations(query_vector, using=TEXT_VECTOR, **kwargs)
+
+    async def _asearch_hybrid(
+        self,
+        query_vector: List[float],
+        sparse_vector: SparseVector,
+        limit: int = 5,
+        score_threshold: Optional[float] = 0.7,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _search_hybrid"""
+        params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+        fetch_limit = self._fetch_limit(limit, collapse, offset)
+        cache_key = self._hybrid_cache_key(
+            query_vector, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+            offset, projection
+        )
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        response = await self.search_limiter.run(
+            self._qdrant_call(
+                "query_points",
+                **self._hybrid_query_kwargs(
+                    query_vector, sparse_vector, fetch_limit, score_threshold,
+                    self._build_filter(location_filter, filters), params, offset,
+                    projection.selector(self._required_fields(collapse))
+                )
+            )
+        )
+        formatted_results = self._format_results(self._collapse(response.points, collapse, limit), projection)
+        self.search_cache.set(cache_key, formatted_results)
+        return list(formatted_results)
+
+    async def asearch_by_text(
+        self,
+        text_query: str,
+        rerank: Optional[bool] = None,
+        timings: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_by_text"""
+        final_limit = self._widen_for_rerank(rerank, kwargs)
+        query_vector, sparse_vector = await asyncio.gather(
+            self.aencode_text(text_query),
+            self._asparse_query(text_query)
+        )
+        results = await self._asearch_text_vector(query_vector, sparse_vector, **kwargs)
+        if final_limit is None:
+            return results
+        return await self.reranker.arerank(text_query, results, final_limit, timings)
+
+    async def asearch_by_image(self, image_data: bytes, **kwargs) -> List[Dict[str, Any]]:
+        """Async variant of search_by_image"""
+        query_vector = await self.aencode_image(image_data)
+        return await self.asearch_similar_locations(query_vector, using=IMAGE_VECTOR, **kwargs)
+
+    async def aencode_images(self, images: List[bytes]) -> List[List[float]]:
+        """Async variant of encode_images: uncached photos are decoded in parallel, then encoded in one forward pass"""
+        if len(images) == 1:
+            return [await self.aencode_image(images[0])]
+        cache_keys = [self._image_cache_key(image) for image in images]
+        embeddings = [self.embedding_cache.get(key) if key else None for key in cache_keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            async def encode():
+                loaded = await asyncio.gather(
+                    *(self._run_in_executor(self.load_image, images[i], executor=self.decode_executor) for i in missing)
+                )
+                return await self._run_in_executor(self.encode_loaded_images, list(loaded))
+            computed = await self.encode_limiter.run(encode())
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+                if cache_keys[i]:
+                    self.embedding_cache.set(cache_keys[i], embedding)
+        return embeddings
+
+    async def asearch_by_images(
+        self,
+        images: List[bytes],
+        multi_image: str = "mean",
+        fusion: str = "weighted",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_by_images"""
+        self._check_multi_image(multi_image)
+        if len(images) == 1:
+            return await self.asearch_by_image(images[0], **kwargs)
+        channels = self._image_channels(await self.aencode_images(images), 1.0, multi_image)
+        if len(channels) == 1:
+            _, query_vector, _ = channels[0]
+            return await self.asearch_similar_locations(query_vector, using=IMAGE_VECTOR, **kwargs)
+        return await self._asearch_fused(channels, fusion, **kwargs)
+
+    async def arecommend_locations(
+        self,
+        positive: List[ExtendedPointId],
+        negative: Optional[List[ExtendedPointId]] = None,
+        strategy: str = "average_vector",
+        vector: str = "image",
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Async variant of recommend_locations"""
+        query = self.recommend_query(positive, negative, strategy)
+        return await self.asearch_similar_locations(query, using=self.stored_vector(vector), **kwargs)
+
+    async def _asearch_fused(
+        self,
+        channels: List[tuple],
+        fusion: str,
+        sparse_vector: Optional[SparseVector] = None,
+        limit: int = 5,
+        score_threshold: Optional[float] = 0.7,
+        location_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        collapse: Optional[str] = None,
+        offset: int = 0,
+        projection: Projection = FULL_PROJECTION
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _search_fused"""
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method '{fusion}', expected one of {FUSION_METHODS}")
+        params = self.search_params(hnsw_ef, exact, rescore, oversampling)
+        fetch_limit = self._fetch_limit(limit, collapse, offset)
+        cache_key = self._fused_cache_key(
+            channels, fusion, sparse_vector, limit, score_threshold, location_filter, filters, params, collapse,
+            offset, projection
+        )
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        search_filter = self._build_filter(location_filter, filters)
+        with_payload = projection.selector(self._required_fields(collapse))
+        if fusion == "weighted":
+            responses = await self.search_limiter.run(
+                self._qdrant_call(
+                    "query_batch_points",
+                    collection_name=self.collection_name,
+                    requests=self._batch_requests(
+                        channels, offset + fetch_limit, search_filter, params, sparse_vector, with_payload
+                    )
+                )
+            )
+            weights = [weight for _, _, weight in channels]
+            points = self._fuse_weighted(responses, weights, offset + fetch_limit, score_threshold)[offset:]
+        else:
+            response = await self.search_limiter.run(
+                self._qdrant_call(
+                    "query_points",
+                    **self._fusion_query_kwargs(
+                        channels, fusion, fetch_limit, score_threshold, search_filter, params, sparse_vector,
+                        offset, with_payload
+                    )
+                )
+            )
+            points = response.points
+        formatted_results = self._format_results(self._collapse(points, collapse, limit), projection)
+        self.search_cache.set(cache_key, formatted_results)
+        return list(formatted_results)
+
+    async def asearch_combined(
+        self,
+        text_query: str,
+        image_data: Union[bytes, List[bytes], None] = None,
+        text_weight: float = 0.7,
+        image_weight: float = 0.3,
+        fusion: str = "weighted",
+        multi_image: str = "mean",
+        rerank: Optional[bool] = None,
+        timings: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search_combined; text and images are encoded concurrently"""
+        try:
+            images = self._image_list(image_data)
+            if not images:
+                return await self.asearch_by_text(text_query, rerank=rerank, timings=timings, **kwargs)
+            final_limit = self._widen_for_rerank(rerank, kwargs)
+            text_vector, image_vectors, sparse_vector = await asyncio.gather(
+                self.aencode_text(text_query),
+                self.aencode_images(images),
+                self._asparse_query(text_query)
+            )
+            channels = [(TEXT_VECTOR, text_vector, text_weight)]
+            channels += self._image_channels(image_vectors, image_weight, multi_image)
+            results = await self._asearch_fused(channels, fusion, sparse_vector=sparse_vector, **kwargs)
+            if final_limit is None:
+                return results
+            return await self.reranker.arerank(text_query, results, final_limit, timings)
         except Exception as e:
             logger.error(f"Error in combined search: {e}")
             raise
 
+    async def asearch_batch(self, queries: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Async variant of search_batch; texts and images are encoded concurrently"""
+        try:
+            text_indices, image_indices = self._split_batch(queries)
+            text_vectors, image_vectors = await self.encode_limiter.run(asyncio.gather(
+                self._run_in_executor(self.encode_texts, [queries[i]["text"] for i in text_indices]),
+                self._run_in_executor(self.encode_images, [queries[i]["image"] for i in image_indices])
+            ))
+            sparse_vectors = []
+            if await self._ahybrid_ready():
+                sparse_vectors = [self._sparse_query(queries[i]["text"]) for i in text_indices]
+            results, requests, plan = self._prepare_batch(
+                queries,
+                self._spread(len(queries), text_indices, text_vectors),
+                self._spread(len(queries), image_indices, image_vectors),
+                self._spread(len(queries), text_indices, sparse_vectors)
+            )
+            responses = await self.search_limiter.run(
+                self._qdrant_call(
+                    "query_batch_points",
+                    collection_name=self.collection_name,
+                    requests=requests
+                )
+            ) if requests else []
+            return self._collect_batch(results, responses, plan)
+        except Exception as e:
+            logger.error(f"Error in batch search of {len(queries)} queries: {e}")
+            raise
+
+    @property
+    def image_vector_size(self) -> int:
+        return self.image_encoder.dimension
+
+    @property
+    def text_vector_size(self) -> int:
+        return self.text_encoder.dimension
+
+    def vectors_config(self) -> Dict[str, VectorParams]:
+        """Named vectors stored for every point"""
+        on_disk = self.vectors_on_disk
+        config = {
+            TEXT_VECTOR: VectorParams(size=self.text_vector_size, distance=Distance.COSINE, on_disk=on_disk),
+            IMAGE_VECTOR: VectorParams(size=self.image_vector_size, distance=Distance.COSINE, on_disk=on_disk),
+        }
+        if self.store_clip_text:
+            config[CLIP_TEXT_VECTOR] = VectorParams(size=self.image_vector_size, distance=Distance.COSINE, on_disk=on_disk)
+        return config
+
+    def sparse_vectors_config(self) -> Optional[Dict[str, SparseVectorParams]]:
+        """Sparse vectors stored for every point; Qdrant applies the BM25 IDF at query time"""
+        if not self.hybrid_enabled:
+            return None
+        return {SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)}
+
+    def hnsw_config(self) -> Optional[HnswConfigDiff]:
+        """HNSW graph settings from HNSW_M, HNSW_EF_CONSTRUCT and HNSW_ON_DISK"""
+        values = {"m": self.hnsw_m, "ef_construct": self.hnsw_ef_construct, "on_disk": self.hnsw_on_disk}
+        values = {key: value for key, value in values.items() if value is not None}
+        return HnswConfigDiff(**values) if values else None
+
+    def quantization_config(self) -> Optional[Union[ScalarQuantization, BinaryQuantization]]:
+        """int8 scalar or 1-bit binary quantization, per QUANTIZATION"""
+        if self.quantization == "scalar":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8, quantile=0.99, always_ram=self.quantization_always_ram
+            ))
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=self.quantization_always_ram))
+        return None
+
+    @staticmethod
+    def _quantization_state(config) -> tuple:
+        if isinstance(config, ScalarQuantization):
+            return "scalar", bool(config.scalar.always_ram)
+        if isinstance(config, BinaryQuantization):
+            return "binary", bool(config.binary.always_ram)
+        return ("none", None) if config is None else ("other", None)
+
+    def ensure_payload_indexes(self, info=None) -> List[str]:
+        """Create any missing payload indexes from filters.PAYLOAD_INDEXES; returns the created fields"""
+        info = info or self.client.get_collection(self.collection_name)
+        existing = info.payload_schema or {}
+        created = []
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field in existing:
+                continue
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=schema,
+                wait=True
+            )
+            created.append(field)
+        if created:
+            logger.info(f"Created payload indexes on '{self.collection_name}': {created}")
+        return created
+
+    def apply_collection_tuning(self, info=None) -> bool:
+        """Migrate an existing collection to the configured HNSW, quantization and on-disk settings.
+
+        Only settings given in the environment are compared. Qdrant rebuilds
+        the affected indexes in the background while searches keep working.
+        Returns True if an update was sent.
+        """
+        info = info or self.client.get_collection(self.collection_name)
+        updates = {}
+        hnsw = self.hnsw_config()
+        if hnsw is not None:
+            current = info.config.hnsw_config
+            if any(getattr(current, key) != value for key, value in hnsw.model_dump(exclude_none=True).items()):
+                updates["hnsw_config"] = hnsw
+        if self.quantization is not None:
+            wanted = (self.quantization, self.quantization_always_ram if self.quantization != "none" else None)
+            if self._quantization_state(info.config.quantization_config) != wanted:
+                updates["quantization_config"] = self.quantization_config() or Disabled.DISABLED
+        if self.vectors_on_disk is not None:
+            vectors_diff = {
+                name: VectorParamsDiff(on_disk=self.vectors_on_disk)
+                for name, params in info.config.params.vectors.items()
+                if bool(params.on_disk) != self.vectors_on_disk
+            }
+            if vectors_diff:
+                updates["vectors_config"] = vectors_diff
+        if not updates:
+            return False
+        self.client.update_collection(collection_name=self.collection_name, **updates)
+        logger.info(f"Updated collection '{self.collection_name}' settings: {sorted(updates)}")
+        self.notify_collection_updated()
+        return True
+
+    def ensure_collection(self) -> bool:
+        """Create the collection if it does not exist, else migrate its settings; True if created"""
+        expected = self.vectors_config()
+        if self.client.collection_exists(self.collection_name):
+            info = self.client.get_collection(self.collection_name)
+            vectors = info.config.params.vectors
+            if not isinstance(vectors, dict):
+                raise ValueError(
+                    f"Collection '{self.collection_name}' uses a single unnamed vector; named vectors "
+                    f"{sorted(expected)} are required. Ingest into a new collection "
+                    f"(QDRANT_COLLECTION_NAME) with --full and switch over once it is populated."
+                )
+            for name, params in expected.items():
+                if name not in vectors or vectors[name].size != params.size:
+                    raise ValueError(
+                        f"Collection '{self.collection_name}' is missing vector '{name}' "
+                        f"({params.size}-dim); re-create it or ingest into a new collection"
+                    )
+            self._set_sparse_state(info)
+            self.apply_collection_tuning(info)
+            self.ensure_payload_indexes(info)
+            return False
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=expected,
+            sparse_vectors_config=self.sparse_vectors_config(),
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_config()
+        )
+        logger.info(f"Created collection '{self.collection_name}' with vectors {sorted(expected)}")
+        self._has_sparse = self.hybrid_enabled
+        self.ensure_payload_indexes()
+        return True
+
+    @staticmethod
+    def point_text(payload: Dict[str, Any]) -> str:
+        """Text embedded for a point: location, description and features"""
+        parts = [payload.get("location", ""), payload.get("description", "")]
+        features = payload.get("features") or []
+        if features:
+            parts.append(", ".join(features))
+        return ". ".join(part for part in parts if part)
+
+    def point_vectors(
+        self,
+        image_inputs: List[torch.Tensor],
+        payloads: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Compute every named vector for a batch of points (bypasses the query caches)"""
+        texts = [self.point_text(payload) for payload in payloads]
+        image_vectors = self.encode_image_tensors(image_inputs)
+        text_vectors = self._encode_text_batch(texts)
+        vectors = [
+            {TEXT_VECTOR: text_vector, IMAGE_VECTOR: image_vector}
+            for text_vector, image_vector in zip(text_vectors, image_vectors)
+        ]
+        if self.store_clip_text:
+            for point, clip_text_vector in zip(vectors, self.encode_clip_texts(texts)):
+                point[CLIP_TEXT_VECTOR] = clip_text_vector
+        if self._hybrid_ready():
+            for point, text in zip(vectors, texts):
+                sparse_vector = self.sparse_encoder.encode_document(text)
+                if sparse_vector.indices:
+                    point[SPARSE_VECTOR] = sparse_vector
+        return vectors
+
+    def build_point(self, point_id: str, vectors: Dict[str, Any], payload: Dict[str, Any]) -> PointStruct:
+        """Assemble a point for upsert from its named vectors and metadata"""
+        return PointStruct(id=point_id, vector=vectors, payload=payload)
+
+    def upsert_points(self, points: List[PointStruct], wait: bool = True):
+        """Write points to the collection"""
+        try:
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+        except Exception as e:
+            logger.error(f"Error upserting {len(points)} points: {e}")
+            raise
+
+    def get_payloads(self, point_ids: List[str], fields: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Selected payload fields of stored points, keyed by point ID (missing points are omitted)"""
+        if not point_ids:
+            return {}
+        try:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=point_ids,
+                with_payload=fields,
+                with_vectors=False
+            )
+            return {str(point.id): point.payload or {} for point in points}
+        except Exception as e:
+            logger.error(f"Error retrieving payloads for {len(point_ids)} points: {e}")
+            raise
+
+    def overwrite_payload(self, point_id: str, payload: Dict[str, Any], wait: bool = True):
+        """Replace a point's payload without touching its vector"""
+        try:
+            self.client.overwrite_payload(
+                collection_name=self.collection_name,
+                payload=payload,
+                points=[point_id],
+                wait=wait
+            )
+        except Exception as e:
+            logger.error(f"Error updating payload for point {point_id}: {e}")
+            raise
+
+    def delete_points(self, point_ids: List[str], wait: bool = True):
+        """Remove points from the collection by ID"""
+        if not point_ids:
+            return
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=point_ids),
+                wait=wait
+            )
+        except Exception as e:
+            logger.error(f"Error deleting {len(point_ids)} points: {e}")
+            raise
+
+    async def aget_image_path(self, point_id: str) -> Optional[str]:
+        """image_path payload of a stored point, or None if it does not exist"""
+        image_path = self.image_path_cache.get(point_id)
+        if image_path is not None:
+            return image_path
+        points = await self.search_limiter.run(self._qdrant_call(
+            "retrieve",
+            collection_name=self.collection_name,
+            ids=[point_id],
+            with_payload=["image_path"],
+            with_vectors=False
+        ))
+        if not points or not (points[0].payload or {}).get("image_path"):
+            return None
+        image_path = points[0].payload["image_path"]
+        self.image_path_cache.set(point_id, image_path)
+        return image_path
+
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection"""
         try:
@@ -173,5 +1763,113 @@ class VectorSearchService:
             logger.error(f"Error getting collection info: {e}")
             return {"error": str(e)}
 
+    async def aget_collection_info(self) -> Dict[str, Any]:
+        """Async variant of get_collection_info"""
+        try:
+            collection_info = await self.search_limiter.run(
+                self._qdrant_call("get_collection", self.collection_name)
+            )
+            return {
+                "name": self.collection_name,
+                "vectors_count": collection_info.vectors_count,
+                "indexed_vectors_count": collection_info.indexed_vectors_count,
+                "points_count": collection_info.points_count,
+                "status": collection_info.status
+            }
+        except Exception as e:
+            logger.error(f"Error getting collection info: {e}")
+            return {"error": str(e)}
+
+    def invalidate_caches(self, embeddings: bool = False):
+        """Drop cached search results (and optionally cached query embeddings)"""
+        self.search_cache.clear()
+        self.image_path_cache.clear()
+        if embeddings:
+            self.embedding_cache.clear()
+        logger.info(f"Invalidated search cache{' and embedding cache' if embeddings else ''}")
+
+    def notify_collection_updated(self):
+        """Called by write paths after points are upserted or deleted"""
+        if self.invalidate_on_update:
+            self.invalidate_caches()
+            self.bump_cache_version()
+
+    @property
+    def cache_version_collection(self) -> str:
+        return f"{self.collection_name}{CACHE_VERSION_SUFFIX}"
+
+    def cache_version(self) -> Optional[str]:
+        """Last seen collection version; never blocks, a stale value is refreshed on the executor"""
+        with self._cache_version_lock:
+            checked = self._cache_version_checked
+            stale = checked is None or time.monotonic() - checked >= self.cache_version_ttl
+            if stale and not self._cache_version_refreshing:
+                self._cache_version_refreshing = True
+                self.executor.submit(self._refresh_cache_version)
+            return self._cache_version
+
+    def _refresh_cache_version(self):
+        try:
+            points = self.client.retrieve(
+                self.cache_version_collection, ids=[CACHE_VERSION_POINT_ID], with_payload=True, with_vectors=False
+            )
+            version = points[0].payload.get("version") if points else None
+        except Exception as e:
+            # No version collection until the first write; keep the last known version
+            logger.debug(f"Could not read the cache version: {e}")
+            version = self._cache_version
+        with self._cache_version_lock:
+            changed = version != self._cache_version
+            self._cache_version = version
+            self._cache_version_checked = time.monotonic()
+            self._cache_version_refreshing = False
+        if changed:
+            # Entries under the old version can no longer be hit; free them now
+            self.invalidate_caches()
+
+    def bump_cache_version(self):
+        """Publish a new collection version, invalidating cached searches in every process"""
+        version = uuid.uuid4().hex
+        try:
+            if not self.client.collection_exists(self.cache_version_collection):
+                try:
+                    self.client.create_collection(
+                        collection_name=self.cache_version_collection,
+                        vectors_config=VectorParams(size=1, distance=Distance.DOT)
+                    )
+                except Exception:
+                    # Another process may have created it first
+                    if not self.client.collection_exists(self.cache_version_collection):
+                        raise
+            self.client.upsert(
+                collection_name=self.cache_version_collection,
+                points=[PointStruct(id=CACHE_VERSION_POINT_ID, vector=[1.0], payload={"version": version})]
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish cache version, other processes keep cached results until TTL: {e}")
+            return
+        with self._cache_version_lock:
+            self._cache_version = version
+            self._cache_version_checked = time.monotonic()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the embedding and search caches"""
+        return {
+            "embeddings": self.embedding_cache.stats(),
+            "search": self.search_cache.stats(),
+            "image_paths": self.image_path_cache.stats(),
+        }
+
+    def concurrency_stats(self) -> Dict[str, Any]:
+        """Slot usage for the encode and search stages"""
+        return {
+            "encode": self.encode_limiter.stats(),
+            "search": self.search_limiter.stats(),
+        }
+
+    def rerank_stats(self) -> Dict[str, Any]:
+        """Re-ranking settings, fallback count and latency"""
+        return {"enabled": self.rerank_enabled, **self.reranker.stats()}
+
 # Global instance
 vector_service = VectorSearchService()